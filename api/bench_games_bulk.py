@@ -0,0 +1,80 @@
+"""
+Benchmark for the NDJSON bulk import and export endpoints.
+
+Imports a synthetic catalog through POST /api/games/bulk into each storage
+backend, then exports it again through GET /api/games/export, and reports
+the wall time of both. With --memory, peak Python memory is traced too,
+which makes every run several times slower.
+
+Usage:
+    python -m api.bench_games_bulk --games 100000 [--memory]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from api import main
+from api.games_store import open_games_store
+
+def make_body(count: int, lines_per_chunk: int = 1000):
+    lines = []
+    for i in range(count):
+        game = {
+            "name": f"Game {i}",
+            "category": ["Action", "Racing", "Puzzle", "Sports"][i % 4],
+            "link": f"game_{i}.html",
+            "description": f"Description for game number {i}.",
+            "rating": (i % 50) / 10,
+            "player_count": i * 7,
+        }
+        lines.append(json.dumps(game) + "\n")
+        if len(lines) == lines_per_chunk or i == count - 1:
+            yield "".join(lines).encode()
+            lines = []
+
+def measure(operation, memory: bool):
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = operation()
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+def count_export_lines(client: TestClient, headers: dict) -> int:
+    with client.stream("GET", "/api/games/export", headers=headers) as response:
+        return sum(1 for _ in response.iter_lines())
+
+def run(backend: str, path: str, count: int, memory: bool):
+    store = open_games_store(backend, path)
+    client = TestClient(main.app)
+    headers = {"X-API-Key": "test-api-key"}
+    with patch.object(main, "games_store", store):
+        response, imported, import_peak = measure(
+            lambda: client.post("/api/games/bulk", content=make_body(count), headers=headers), memory
+        )
+        assert response.status_code == 200, response.text
+        lines, exported, export_peak = measure(lambda: count_export_lines(client, headers), memory)
+    print(f"{backend:>6}: import {imported:6.2f} s, export {exported:6.2f} s, {lines} lines")
+    if memory:
+        print(f"{'':>6}  peak memory: import {import_peak:6.1f} MiB, export {export_peak:6.1f} MiB")
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--memory", action="store_true", help="Trace peak Python memory")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        run("json", os.path.join(tmp_dir, "games.json"), args.games, args.memory)
+        run("sqlite", os.path.join(tmp_dir, "games.db"), args.games, args.memory)
+
+if __name__ == "__main__":
+    main_cli()
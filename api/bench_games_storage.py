@@ -0,0 +1,98 @@
+"""
+Benchmark comparing the JSON and SQLite games catalog backends.
+
+Loads the same synthetic catalog into both backends and reports search,
+sorted page and update latency.
+
+Usage:
+    python -m api.bench_games_storage --games 100000 --operations 500
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from api.games_sqlite import migrate
+from api.games_store import open_games_store
+
+WORDS = [
+    "space", "racer", "kart", "kings", "puzzle", "planet", "dragon", "quest",
+    "legend", "shadow", "city", "builder", "soccer", "league", "zombie", "farm",
+    "ninja", "castle", "pirate", "island", "galaxy", "tower", "defense", "rally",
+]
+CATEGORIES = ["Action", "Racing", "Puzzle", "Sports", "Strategy", "Simulation"]
+
+def make_catalog(path: str, count: int, rng: random.Random):
+    games = [
+        {
+            "name": f"{' '.join(rng.sample(WORDS, 2))} {i}",
+            "category": rng.choice(CATEGORIES),
+            "link": f"game_{i}.html",
+            "description": " ".join(rng.choices(WORDS, k=10)),
+            "rating": round(rng.uniform(0, 5), 1),
+            "player_count": rng.randint(0, 100000),
+        }
+        for i in range(count)
+    ]
+    with open(path, "w") as f:
+        json.dump(games, f)
+    return games
+
+def timed(operation, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        operation(i)
+    return (time.perf_counter() - start) / count * 1000
+
+def measure(store, games, queries, count: int) -> dict:
+    results = {
+        "search": timed(lambda i: store.page(queries[i % len(queries)], limit=20), count),
+        "sorted page": timed(lambda i: store.page(sort="-rating", limit=20), count),
+    }
+
+    def update(i):
+        game = dict(games[i % len(games)], rating=i % 5)
+        game.pop("version", None)
+        store.replace(game["name"], game)
+
+    results["update"] = timed(update, count)
+    store.flush()
+    return results
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--operations", type=int, default=500)
+    args = parser.parse_args()
+    rng = random.Random(42)
+    queries = [" ".join(rng.sample(WORDS, 2)) for _ in range(100)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, "games.json")
+        db_path = os.path.join(tmp_dir, "games.db")
+        games = make_catalog(json_path, args.games, rng)
+
+        start = time.perf_counter()
+        migrate(json_path, db_path)
+        migration = time.perf_counter() - start
+
+        json_store = open_games_store("json", json_path)
+        start = time.perf_counter()
+        json_store.all()
+        json_load = time.perf_counter() - start
+        json_results = measure(json_store, games, queries, args.operations)
+
+        sqlite_store = open_games_store("sqlite", db_path)
+        sqlite_results = measure(sqlite_store, games, queries, args.operations)
+        sqlite_store.close()
+
+    print(f"catalog size:    {args.games} games")
+    print(f"json load+index: {json_load:8.2f} s")
+    print(f"sqlite migrate:  {migration:8.2f} s")
+    print(f"{'operation':<14} {'json ms':>10} {'sqlite ms':>10}")
+    for operation in json_results:
+        print(f"{operation:<14} {json_results[operation]:10.3f} {sqlite_results[operation]:10.3f}")
+
+if __name__ == "__main__":
+    main_cli()
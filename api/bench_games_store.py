@@ -0,0 +1,104 @@
+"""
+Benchmark for the /api/games/search endpoint.
+
+Compares requests/sec of the in-memory GamesStore against the previous
+behaviour of opening and parsing games.json on every request, and the
+latency of a journaled update against rewriting the whole file.
+
+Usage:
+    python -m api.bench_games_store --games 5000 --requests 500
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from api import main
+from api.games_store import GamesStore
+
+class PerRequestParseStore(GamesStore):
+    """
+    Reproduces the old get_games(): a full json.load and a linear
+    substring scan on every request.
+    """
+
+    def all(self):
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def search(self, query, limit=None, offset=0):
+        q = query.lower()
+        results = [
+            game for game in self.all()
+            if q in game["name"].lower() or q in game["category"].lower()
+        ]
+        end = offset + limit if limit is not None else None
+        return len(results), results[offset:end]
+
+def make_catalog(path: str, count: int):
+    games = [
+        {
+            "name": f"Game {i}",
+            "category": ["Action", "Racing", "Puzzle", "Sports"][i % 4],
+            "link": f"game_{i}.html",
+            "description": f"Description for game number {i}.",
+            "rating": (i % 50) / 10,
+            "player_count": i * 7,
+        }
+        for i in range(count)
+    ]
+    with open(path, "w") as f:
+        json.dump(games, f, indent=4)
+
+def run(store: GamesStore, requests: int, query: str) -> float:
+    client = TestClient(main.app)
+    headers = {"X-API-Key": "test-api-key"}
+    with patch.object(main, "games_store", store):
+        client.get("/api/games/search", params={"q": query}, headers=headers)
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get("/api/games/search", params={"q": query}, headers=headers)
+        elapsed = time.perf_counter() - start
+    return requests / elapsed
+
+def update_latency(path: str, count: int, journaled: bool) -> float:
+    store = GamesStore(path, compaction_threshold=count + 1)
+    games = store.all()
+    start = time.perf_counter()
+    for i in range(count):
+        game = dict(games[i % len(games)], rating=i % 5)
+        if journaled:
+            store.replace(game["name"], game)
+        else:
+            # The old save_games(): rewrite the full catalog per mutation.
+            with open(path, "w") as f:
+                json.dump(games, f, indent=4)
+    store.flush()
+    return (time.perf_counter() - start) / count
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--query", default="game 42")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "games.json")
+        make_catalog(path, args.games)
+        baseline = run(PerRequestParseStore(path), args.requests, args.query)
+        cached = run(GamesStore(path), args.requests, args.query)
+        rewrite = update_latency(path, 50, journaled=False)
+        journaled = update_latency(path, 50, journaled=True)
+
+    print(f"catalog size:        {args.games} games")
+    print(f"per-request parse:   {baseline:10.1f} req/s")
+    print(f"in-memory store:     {cached:10.1f} req/s")
+    print(f"speedup:             {cached / baseline:10.2f}x")
+    print(f"update, full rewrite: {rewrite * 1000:9.3f} ms")
+    print(f"update, journaled:    {journaled * 1000:9.3f} ms")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,70 @@
+"""
+Benchmark for the games full-text index.
+
+Builds an InvertedIndex over a synthetic catalog and reports build time and
+per-query latency for a page of BM25-ranked results.
+
+Usage:
+    python -m api.bench_search_index --games 100000 --queries 1000
+"""
+import argparse
+import itertools
+import random
+import time
+from api.games_store import SEARCH_FIELDS
+from api.search_index import InvertedIndex
+
+SYLLABLES = ["ka", "ro", "mi", "zen", "tor", "la", "vex", "qua", "dri", "sol", "ny", "bo"]
+CATEGORIES = ["Action", "Racing", "Puzzle", "Sports", "Strategy", "Simulation"]
+
+def make_vocabulary(size: int, rng: random.Random):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+def make_docs(count: int, words, weights, rng: random.Random):
+    # Word frequencies follow a Zipf-like distribution, as in real titles.
+    for i in range(count):
+        name = " ".join(rng.choices(words, cum_weights=weights, k=2)) + f" {i}"
+        yield name, {
+            "name": name,
+            "category": rng.choice(CATEGORIES),
+            "description": " ".join(rng.choices(words, cum_weights=weights, k=12)),
+        }
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(42)
+    words = make_vocabulary(5000, rng)
+    weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+
+    index = InvertedIndex(SEARCH_FIELDS)
+    start = time.perf_counter()
+    index.rebuild(make_docs(args.games, words, weights, rng))
+    build = time.perf_counter() - start
+
+    queries = [
+        " ".join(rng.choices(words, cum_weights=weights, k=2)) + " " + rng.choice(CATEGORIES).lower()
+        for _ in range(args.queries)
+    ]
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, limit=args.limit)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    median = latencies[len(latencies) // 2]
+    p95 = latencies[int(len(latencies) * 0.95)]
+
+    print(f"catalog size:   {args.games} games")
+    print(f"index build:    {build:8.2f} s")
+    print(f"query p50:      {median * 1000:8.3f} ms (limit={args.limit})")
+    print(f"query p95:      {p95 * 1000:8.3f} ms")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,101 @@
+"""
+Load test for the shared async upstream client.
+
+Starts a local stub upstream that answers every request after a fixed
+delay, points /api/mmo_games at it and fires concurrent requests at the
+app. The same load is run against the previous implementation, a blocking
+requests.get inside the async handler, which holds the event loop for the
+whole round-trip so requests are served one at a time.
+
+Usage:
+    python -m api.bench_upstream --requests 200 --concurrency 50 --delay 0.05
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+import httpx
+import requests
+from api import main, mmo_games
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    delay = 0.05
+    connections = 0
+    body = json.dumps([{"id": i, "title": f"Game {i}"} for i in range(20)]).encode()
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub(delay: float) -> ThreadingHTTPServer:
+    StubHandler.delay = delay
+    StubHandler.connections = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+async def blocking_get_all_games():
+    """
+    The pre-async implementation: a blocking call inside a coroutine.
+    """
+    response = requests.get(mmo_games.MMO_GAMES_URL)
+    response.raise_for_status()
+    return response.json()
+
+async def fire(count: int, concurrency: int) -> float:
+    limit = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+        async def one():
+            async with limit:
+                response = await client.get("/api/mmo_games", headers={"X-API-Key": "test-api-key"})
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(count)))
+        elapsed = time.perf_counter() - start
+    await main.http_client.client.aclose()
+    return elapsed
+
+def run(label: str, count: int, concurrency: int, delay: float, blocking: bool):
+    server = start_stub(delay)
+    url = f"http://127.0.0.1:{server.server_port}/api1/games"
+    try:
+        with patch.object(mmo_games, "MMO_GAMES_URL", url):
+            if blocking:
+                with patch.object(mmo_games, "get_all_games", blocking_get_all_games):
+                    elapsed = asyncio.run(fire(count, concurrency))
+            else:
+                elapsed = asyncio.run(fire(count, concurrency))
+    finally:
+        server.shutdown()
+    print(f"{label:>9}: {elapsed:6.2f} s, {count / elapsed:7.1f} req/s, {StubHandler.connections} upstream connections")
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.05, help="Stub upstream latency in seconds")
+    args = parser.parse_args()
+
+    run("blocking", args.requests, args.concurrency, args.delay, blocking=True)
+    run("async", args.requests, args.concurrency, args.delay, blocking=False)
+
+if __name__ == "__main__":
+    main_cli()
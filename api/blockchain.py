@@ -1,6 +1,5 @@
 import json
 import base64
-from web3 import Web3
 
 # In a real application, you would get this from your compiled smart contract
 MOCKED_NFT_CONTRACT_ABI = json.dumps([
@@ -32,7 +31,9 @@ MOCKED_ETHEREUM_NODE_URL = "https://mainnet.infura.io/v3/your-infura-project-id"
 
 class BlockchainManager:
     def __init__(self, node_url=MOCKED_ETHEREUM_NODE_URL, contract_address=MOCKED_CONTRACT_ADDRESS, contract_abi=MOCKED_NFT_CONTRACT_ABI):
-        # In a real application, you would connect to a real node
+        # In a real application, you would connect to a real node. web3 is
+        # slow to import, so import it here rather than at module level:
+        # from web3 import Web3
         # self.w3 = Web3(Web3.HTTPProvider(node_url))
         # self.contract = self.w3.eth.contract(address=contract_address, abi=contract_abi)
 
@@ -0,0 +1,204 @@
+import os
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, Query
+from api import data_files
+from api.auth import get_api_key
+from api.search_index import InvertedIndex
+from api import palm_store
+from api import tencent_games
+from api import geforce_now
+from api import playstation
+from api import amazon_luna
+from api import redbull
+from api import rival
+from api import motogp
+from api import junglee_games
+from api import nintendo
+
+router = APIRouter()
+
+# Data files of the provider modules by source. Their records keep their
+# own categories and the files are skipped by the category scan below.
+PROVIDER_FEEDS: Dict[str, str] = {
+    "palm_store": palm_store.GAMES_FILE,
+    "tencent_games": tencent_games.GAMES_FILE,
+    "geforce_now": geforce_now.GAMES_FILE,
+    "playstation": playstation.GAMES_FILE,
+    "amazon_luna": amazon_luna.GAMES_FILE,
+    "redbull": redbull.GAMES_FILE,
+    "rival": rival.GAMES_FILE,
+    "motogp": motogp.GAMES_FILE,
+    "junglee_games": junglee_games.GAMES_FILE,
+    "nintendo": nintendo.GAMES_FILE,
+}
+
+# Files under frontend/data that are not game lists. games.json is the
+# editable catalog behind /api/games and has its own index.
+NON_GAME_FILES = {
+    "games.json", "alibaba_products.json", "amazon_products.json", "shopify_products.json",
+    "shopline_products.json", "coupons.json", "dropshipping.json", "kickstarter_projects.json",
+    "marketplace_items.json", "patreon_campaigns.json", "patreon_patrons.json",
+    "pronostics.json", "twitch_games.json", "twitch_streams.json",
+}
+
+# Relative weight of each normalized field when ranking search results.
+CATALOG_FIELDS = {"name": 3.0, "category": 2.0, "description": 1.0, "developer": 1.0, "publisher": 1.0}
+
+FACETS = ("source", "category")
+
+def feed_label(feed: str) -> str:
+    """
+    Human readable label for a feed id, e.g. "power_all_games" -> "Power All".
+    """
+    words = feed.split("_")
+    if len(words) > 1 and words[-1] == "games":
+        words = words[:-1]
+    return " ".join(word.capitalize() for word in words)
+
+def normalize(record: dict, source: str, default_category: Optional[str] = None) -> dict:
+    """
+    Map a feed record onto the common catalog schema.
+    """
+    return {
+        "name": record.get("name") or record.get("title") or "",
+        "description": record.get("description") or record.get("blurb") or "",
+        "link": record.get("link") or record.get("download_link"),
+        "category": record.get("category") or record.get("genre") or default_category,
+        "source": source,
+        "developer": record.get("developer"),
+        "publisher": record.get("publisher"),
+        "rating": record.get("rating"),
+        "player_count": record.get("player_count"),
+    }
+
+class CatalogIndex:
+    """
+    Unified, in-memory index over every game feed.
+
+    Records are normalized into one schema, full-text indexed and grouped
+    by facet value, so cross-feed searches with facet filters and counts
+    are answered without touching the feed files.
+    """
+
+    def __init__(self, files: Optional[Dict[str, Any]] = None):
+        """
+        Index feed files given as filename -> records, or the error that
+        kept a file from being read; such a feed is skipped so that one
+        broken file does not take down the whole catalog.
+        """
+        self.records: Dict[int, dict] = {}
+        self.text = InvertedIndex(CATALOG_FIELDS)
+        self.facets: Dict[str, Dict[str, set]] = {facet: defaultdict(set) for facet in FACETS}
+        providers = {filename: source for source, filename in PROVIDER_FEEDS.items()}
+        for filename, records in (files or {}).items():
+            source = providers.get(filename, filename[:-len(".json")])
+            if isinstance(records, Exception):
+                print(f"Skipping catalog feed {source}: {records}")
+                continue
+            default_category = None if filename in providers else feed_label(source)
+            for record in records:
+                self.add(normalize(record, source, default_category))
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, record: dict):
+        doc_id = len(self.records)
+        self.records[doc_id] = record
+        self.text.add(doc_id, record)
+        for facet in FACETS:
+            if record.get(facet):
+                self.facets[facet][record[facet]].add(doc_id)
+
+    def _facet_ids(self, facet: str, value: str) -> set:
+        value = value.lower()
+        ids = set()
+        for label, doc_ids in self.facets[facet].items():
+            if label.lower() == value:
+                ids |= doc_ids
+        return ids
+
+    def search(self, q: str = "", filters: Dict[str, str] = None, limit: int = 20, offset: int = 0) -> dict:
+        """
+        Return one page of matching records plus facet counts over all matches.
+        """
+        if q:
+            scores = self.text.score(q)
+            matches = set(scores)
+        else:
+            scores = None
+            matches = None
+        for facet, value in (filters or {}).items():
+            if value:
+                ids = self._facet_ids(facet, value)
+                matches = ids if matches is None else matches & ids
+
+        if matches is None:
+            counts = {
+                facet: {label: len(ids) for label, ids in values.items()}
+                for facet, values in self.facets.items()
+            }
+            total = len(self.records)
+            page_ids = list(self.records)[offset:offset + limit]
+        else:
+            counts = {facet: defaultdict(int) for facet in FACETS}
+            for doc_id in matches:
+                record = self.records[doc_id]
+                for facet in FACETS:
+                    if record.get(facet):
+                        counts[facet][record[facet]] += 1
+            total = len(matches)
+            if scores is not None:
+                ranked = sorted(matches, key=lambda doc_id: (-scores[doc_id], doc_id))
+            else:
+                ranked = sorted(matches)
+            page_ids = ranked[offset:offset + limit]
+
+        return {
+            "total": total,
+            "results": [self.records[doc_id] for doc_id in page_ids],
+            "facets": {facet: dict(values) for facet, values in counts.items()},
+        }
+
+def feed_files(registry: Optional[data_files.DataFileRegistry] = None) -> List[str]:
+    """
+    The data files of every game feed: the category files in the first
+    data root, then the provider files.
+    """
+    registry = registry or data_files.registry
+    providers = set(PROVIDER_FEEDS.values())
+    try:
+        filenames = sorted(os.listdir(registry.roots[0]))
+    except (IndexError, OSError):
+        filenames = []
+    categories = [
+        filename for filename in filenames
+        if filename.endswith(".json") and filename not in NON_GAME_FILES and filename not in providers
+    ]
+    return categories + list(PROVIDER_FEEDS.values())
+
+def get_catalog_index(registry: Optional[data_files.DataFileRegistry] = None) -> CatalogIndex:
+    """
+    Return the catalog index of the current feed files, built at startup.
+
+    The registry keeps it with the feeds it was built from and rebuilds it
+    only once a feed file is added, removed or changed on disk.
+    """
+    registry = registry or data_files.registry
+    return registry.derive_all("catalog_index", lambda: feed_files(registry), CatalogIndex)
+
+@router.get("/search")
+async def search_catalog(
+    q: str = "",
+    source: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    api_key: str = Depends(get_api_key),
+):
+    """
+    Search every game feed at once, with source and category facets.
+    """
+    index = get_catalog_index()
+    return index.search(q, {"source": source, "category": category}, limit=limit, offset=offset)
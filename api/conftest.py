@@ -1,6 +1,8 @@
 import pytest
 import json
 import os
+from unittest.mock import patch
+import httpx
 
 @pytest.fixture(autouse=True)
 def api_keys_fixture():
@@ -23,3 +25,30 @@ def api_keys_fixture():
     # Clean up the dummy api_keys.json file
     if os.path.exists("api_keys.json"):
         os.remove("api_keys.json")
+
+@pytest.fixture
+def mock_upstream(request):
+    """
+    Returns a factory for patching the shared upstream client:
+    `mock_upstream(handler)` answers every upstream request with
+    `handler(request)` through an httpx.MockTransport and records the
+    requests in `mock_upstream.requests`.
+
+    unittest test cases get it as `self.mock_upstream` with
+    @pytest.mark.usefixtures("mock_upstream").
+    """
+    from api import http_client
+    from api.http_client import UpstreamClient
+
+    def factory(handler):
+        factory.requests = []
+
+        def record(upstream_request):
+            factory.requests.append(upstream_request)
+            return handler(upstream_request)
+        return patch.object(http_client, "client", UpstreamClient(transport=httpx.MockTransport(record)))
+
+    factory.requests = []
+    if request.instance is not None:
+        request.instance.mock_upstream = factory
+    return factory
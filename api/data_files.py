@@ -0,0 +1,256 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+
+# Directories searched for data files, in order. DATA_ROOTS overrides them
+# with an os.pathsep separated list.
+DEFAULT_DATA_ROOTS = [
+    os.path.join(dir_path, "..", "frontend", "data"),
+    os.path.join(dir_path, "..", "data"),
+]
+DATA_ROOTS = [root for root in os.environ.get("DATA_ROOTS", "").split(os.pathsep) if root] or DEFAULT_DATA_ROOTS
+
+# Seconds a cached file is served before it is checked against the disk again.
+REVALIDATE_INTERVAL = float(os.environ.get("DATA_REVALIDATE_INTERVAL", "1.0"))
+
+_MISSING = object()
+
+class EncodedFile:
+    """
+    A data file encoded as a JSON response body, once per file version.
+
+    Besides the plain body it holds gzip and, when the brotli package is
+    installed, brotli variants (only where they are smaller) and a strong
+    ETag for each variant derived from the body's hash.
+    """
+
+    def __init__(self, data: Any):
+        body = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.variants = {"identity": body}
+        compressed = {"gzip": gzip.compress(body, compresslevel=6, mtime=0)}
+        if brotli is not None:
+            compressed["br"] = brotli.compress(body)
+        for encoding, content in compressed.items():
+            if len(content) < len(body):
+                self.variants[encoding] = content
+        self.etags = {
+            encoding: f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+            for encoding in self.variants
+        }
+
+    def choose(self, accept_encoding: Optional[str]) -> str:
+        """
+        Pick the smallest variant the client accepts.
+        """
+        accepted = set()
+        for item in (accept_encoding or "").split(","):
+            coding, _, params = item.partition(";")
+            params = params.replace(" ", "")
+            try:
+                quality = float(params[2:]) if params.startswith("q=") else 1.0
+            except ValueError:
+                quality = 0.0
+            if quality > 0:
+                accepted.add(coding.strip().lower())
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+class _Entry:
+    __slots__ = ("path", "signature", "data", "error", "checked_at", "derived")
+
+    def __init__(self, path, signature, data, error, checked_at):
+        self.path = path
+        self.signature = signature
+        self.data = data
+        self.error = error
+        self.checked_at = checked_at
+        self.derived = {}
+
+class DataFileRegistry:
+    """
+    Parsed JSON data files shared by every module that serves them.
+
+    A file is looked up in each root in turn and parsed once. Later loads
+    are served from memory; at most every `revalidate_interval` seconds the
+    file is stat'ed again and only re-read if its mtime or size changed.
+    `hits` counts loads served from memory and `misses` loads that had to
+    read the disk.
+    """
+
+    def __init__(self, roots: List[str] = None, revalidate_interval: float = REVALIDATE_INTERVAL, clock=time.monotonic):
+        self.roots = list(roots if roots is not None else DATA_ROOTS)
+        self.revalidate_interval = revalidate_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self._paths: Dict[str, str] = {}
+        # name -> (files it was built from, value, checked_at), see derive_all.
+        self._combined: Dict[str, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, filename: str) -> Optional[str]:
+        """
+        Return the path of `filename` in the first root that has it, or None.
+        """
+        for root in self.roots:
+            path = os.path.join(root, filename)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def _signature(self, filename: str):
+        # The root a file was found in is remembered, so revalidation is a
+        # single stat; the roots are only searched again once it is gone.
+        path = self._paths.get(filename)
+        if path is not None:
+            try:
+                stat = os.stat(path)
+                return path, (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                del self._paths[filename]
+        path = self.resolve(filename)
+        if path is None:
+            return None, None
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None, None
+        self._paths[filename] = path
+        return path, (stat.st_mtime_ns, stat.st_size)
+
+    def _read(self, filename: str, now: float) -> _Entry:
+        path, signature = self._signature(filename)
+        data = error = None
+        if path is None:
+            error = FileNotFoundError(f"Data file not found: {filename}")
+        else:
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                error = e
+        return _Entry(path, signature, data, error, now)
+
+    def load(self, filename: str, default: Any = _MISSING, missing: Any = _MISSING) -> Any:
+        """
+        Return the parsed content of `filename`. Every caller gets the same
+        object until the file changes on disk, so callers must not mutate
+        it, and a new object means a new version of the file.
+
+        If the file is missing or not valid JSON, `default` is returned when
+        given and the error is raised otherwise. `missing` is returned only
+        for a file that does not exist; one that cannot be parsed still
+        raises.
+        """
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(filename)
+            if entry is not None and now - entry.checked_at >= self.revalidate_interval:
+                path, signature = self._signature(filename)
+                if (path, signature) == (entry.path, entry.signature):
+                    entry.checked_at = now
+                else:
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                entry = self._entries[filename] = self._read(filename, now)
+            else:
+                self.hits += 1
+        if entry.error is None:
+            return entry.data
+        if default is not _MISSING:
+            return default
+        if missing is not _MISSING and entry.path is None:
+            return missing
+        raise entry.error.with_traceback(None)
+
+    def encoded(self, filename: str, default: Any = _MISSING, missing: Any = _MISSING) -> EncodedFile:
+        """
+        Like load(), but return the file pre-encoded for HTTP responses. The
+        encoding is cached with the parsed file and redone when it changes.
+        """
+        return self.derive(filename, "encoded", EncodedFile, default, missing)
+
+    def derive(self, filename: str, name: str, build: Callable[[Any], Any], default: Any = _MISSING,
+               missing: Any = _MISSING) -> Any:
+        """
+        Return `build(data)` for the current version of `filename`, such as
+        an index over its records. It is built once per file version under
+        `name` and dropped with the parsed data when the file changes. The
+        value is shared like the parsed data and must not be mutated either.
+        """
+        data = self.load(filename, default, missing)
+        with self._lock:
+            entry = self._entries.get(filename)
+        if entry is None or entry.error is not None or entry.data is not data:
+            return build(data)
+        if name not in entry.derived:
+            entry.derived[name] = build(data)
+        return entry.derived[name]
+
+    def derive_all(self, name: str, filenames: Callable[[], List[str]], build: Callable[[Dict[str, Any]], Any]) -> Any:
+        """
+        Like derive(), but for a value built from several files, such as an
+        index over many feeds. `build` gets a filename -> parsed content
+        mapping, holding the error instead for files that cannot be read.
+
+        The value is rebuilt only when `filenames()` or one of the files
+        changed. Between revalidations it is returned without listing or
+        stat'ing any file.
+        """
+        with self._lock:
+            combined = self._combined.get(name)
+            if combined is not None and self._clock() - combined[2] < self.revalidate_interval:
+                return combined[1]
+        files = {}
+        for filename in filenames():
+            try:
+                files[filename] = self.load(filename)
+            except (OSError, json.JSONDecodeError) as e:
+                # A file's error is kept with its cache entry, so it is the
+                # same object until the file changes.
+                files[filename] = e
+        if combined is not None and files.keys() == combined[0].keys() \
+                and all(data is combined[0][filename] for filename, data in files.items()):
+            value = combined[1]
+        else:
+            value = build(files)
+        with self._lock:
+            self._combined[name] = (files, value, self._clock())
+        return value
+
+    def invalidate(self, filename: str = None):
+        """
+        Drop one cached file, or all of them, so the next load re-reads it.
+        """
+        with self._lock:
+            if filename is None:
+                self._entries.clear()
+                self._paths.clear()
+                self._combined.clear()
+            else:
+                self._entries.pop(filename, None)
+                self._paths.pop(filename, None)
+                for name, combined in list(self._combined.items()):
+                    if filename in combined[0]:
+                        del self._combined[name]
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "files": len(self._entries), "roots": self.roots}
+
+registry = DataFileRegistry()
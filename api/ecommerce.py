@@ -1,25 +1,115 @@
-import json
-import os
-from fastapi import APIRouter, Depends
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from api import data_files
 from api.auth import get_api_key
+from api.search_index import InvertedIndex
+from api.sorted_index import SortedIndex
 
 router = APIRouter()
 
-# Setup paths robustly
-CURRENT_DIR = os.path.dirname(os.path.realpath(__file__))
-DATA_DIR_LOCAL = os.path.join(CURRENT_DIR, "..", "frontend", "data")
-DATA_DIR_APP = "/app/frontend/data"
+# Product feed of each retailer, in the order results are tie-broken.
+RETAILER_FILES = {
+    "alibaba": "alibaba_products.json",
+    "amazon": "amazon_products.json",
+    "shopline": "shopline_products.json",
+    "shopify": "shopify_products.json",
+}
+
+# Relative weight of each product field when ranking search results.
+PRODUCT_FIELDS = {"name": 3.0, "category": 2.0, "vendor": 1.0, "store": 1.0}
+
+SORTS = ("relevance", "price_asc", "price_desc")
 
 def load_products_file(filename: str):
     """
-    Helper function to load e-commerce products from JSON file with multiple fallback paths.
+    Helper function to load e-commerce products from the data file registry.
+    """
+    return data_files.registry.load(filename, default=[])
+
+class ProductIndex:
+    """
+    Merged index over the products of every retailer.
+
+    Products are full-text indexed, grouped by retailer and kept sorted by
+    price, so a search is a text lookup intersected with a price range read
+    from the sorted column. `feeds` holds the product lists it was built
+    from; the index is stale once the registry returns different ones.
     """
-    for data_dir in [DATA_DIR_APP, DATA_DIR_LOCAL]:
-        filepath = os.path.join(data_dir, filename)
-        if os.path.exists(filepath):
-            with open(filepath, "r") as f:
-                return json.load(f)
-    return []
+
+    def __init__(self, feeds: Dict[str, List[dict]]):
+        self.feeds = feeds
+        self.products: Dict[str, dict] = {}
+        self.retailers: Dict[str, set] = defaultdict(set)
+        self.text = InvertedIndex(PRODUCT_FIELDS)
+        self.prices = SortedIndex("price")
+        for retailer, products in feeds.items():
+            for position, product in enumerate(products):
+                doc_id = f"{retailer}:{product.get('id', position)}"
+                self.products[doc_id] = {**product, "retailer": retailer}
+                self.retailers[retailer].add(doc_id)
+        self.text.rebuild(self.products.items())
+        self.prices.rebuild(self.products.items())
+
+    def __len__(self):
+        return len(self.products)
+
+    def is_current(self, feeds: Dict[str, List[dict]]) -> bool:
+        return all(feeds[retailer] is self.feeds.get(retailer) for retailer in feeds)
+
+    def search(self, q: str = "", retailers: Optional[List[str]] = None, min_price: Optional[float] = None,
+               max_price: Optional[float] = None, sort: str = "relevance", limit: int = 20, offset: int = 0) -> dict:
+        """
+        Return one page of matching products plus per-retailer counts.
+
+        The retailer counts cover every match of the query and price range,
+        before the retailer filter, so they show what each retailer offers.
+        """
+        scores = self.text.score(q) if q.strip() else None
+        matches = self.prices.filter(None if scores is None else set(scores), self.products, min_price, max_price)
+        counts = {retailer: len(ids & matches) for retailer, ids in self.retailers.items()}
+        if retailers:
+            selected = set()
+            for retailer in retailers:
+                selected |= self.retailers.get(retailer, set())
+            matches &= selected
+
+        if scores is not None and sort == "relevance":
+            ranked = sorted(matches, key=lambda doc_id: (-scores[doc_id], self.prices.key(doc_id, self.products[doc_id])))
+        else:
+            # The price column is already in order; walk its range and keep the matches.
+            ranked = [doc_id for doc_id in self.prices.range(min_price, max_price) if doc_id in matches]
+            if sort == "price_desc":
+                ranked.reverse()
+        return {
+            "total": len(matches),
+            "results": [self.products[doc_id] for doc_id in ranked[offset:offset + limit]],
+            "facets": {"retailer": counts},
+        }
+
+def load_feeds() -> Dict[str, List[dict]]:
+    return {retailer: load_products_file(filename) for retailer, filename in RETAILER_FILES.items()}
+
+_product_index: Optional[ProductIndex] = None
+_product_lock = threading.Lock()
+
+def get_product_index() -> ProductIndex:
+    """
+    Return the process-wide product index, built at startup.
+
+    The feeds come from the data file registry, which only re-reads a file
+    once it changed on disk; the index is rebuilt when that happens.
+    """
+    global _product_index
+    feeds = load_feeds()
+    index = _product_index
+    if index is None or not index.is_current(feeds):
+        with _product_lock:
+            if _product_index is None or not _product_index.is_current(feeds):
+                _product_index = ProductIndex(feeds)
+            index = _product_index
+    return index
 
 @router.get("/alibaba")
 async def get_alibaba_products(api_key: str = Depends(get_api_key)):
@@ -48,3 +138,26 @@ async def get_shopify_products(api_key: str = Depends(get_api_key)):
     Get all Shopify products.
     """
     return load_products_file("shopify_products.json")
+
+@router.get("/search")
+async def search_products(
+    q: str = "",
+    retailer: Optional[List[str]] = Query(None),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    sort: str = "relevance",
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    api_key: str = Depends(get_api_key),
+):
+    """
+    Search the products of every retailer, with a retailer facet and price range.
+    """
+    if sort not in SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(SORTS)}")
+    unknown = [name for name in retailer or [] if name not in RETAILER_FILES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown retailer: {', '.join(unknown)}")
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=400, detail="min_price must not be greater than max_price")
+    return get_product_index().search(q, retailer, min_price, max_price, sort, limit, offset)
@@ -1,15 +1,17 @@
 import json
+import threading
 import time
-from facebook_business.api import FacebookAdsApi
-from facebook_business.adobjects.serverside.user_data import UserData
-from facebook_business.adobjects.serverside.event import Event
-from facebook_business.adobjects.serverside.event_request import EventRequest
-from facebook_business.adobjects.serverside.custom_data import CustomData
+
+# The facebook_business SDK is slow to import, so it is imported and
+# initialized when the first server event is sent rather than at startup.
+_initialized = False
+_init_lock = threading.Lock()
 
 def init_facebook_api():
     """
     Initializes the Facebook Ads API with credentials from api_keys.json.
     """
+    from facebook_business.api import FacebookAdsApi
     try:
         with open('api/api_keys.json') as f:
             keys = json.load(f)
@@ -33,10 +35,24 @@ def init_facebook_api():
         print(f"An error occurred during Facebook API initialization: {e}")
         return None
 
+def ensure_facebook_api():
+    """
+    Initializes the Facebook Ads API once, on first use.
+    """
+    global _initialized
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                init_facebook_api()
+                _initialized = True
+
 def send_server_event(user_data: dict):
     """
     Sends a "CompleteRegistration" server-side event to the Facebook Conversions API.
     """
+    from facebook_business.adobjects.serverside.user_data import UserData
+    from facebook_business.adobjects.serverside.event import Event
+    from facebook_business.adobjects.serverside.event_request import EventRequest
     print(f"Attempting to send 'CompleteRegistration' event for user: {user_data.get('email')}")
 
     # Get Pixel ID
@@ -51,6 +67,8 @@ def send_server_event(user_data: dict):
         print(f"Error reading or parsing api_keys.json: {e}. Aborting event send.")
         return
 
+    ensure_facebook_api()
+
     # Prepare user data from the input dictionary
     email = user_data.get('email')
     full_name = user_data.get('name', '').split(' ')
@@ -1,14 +1,16 @@
-import requests
+import httpx
+from api import response_cache
 
-def get_world_cup_data():
+# Seconds the competition list is served from memory before it is refreshed.
+CACHE_TTL = 60 * 60
+
+async def get_world_cup_data():
     """
     Fetches World Cup qualification data from the football-data.org API.
     """
     url = "https://api.football-data.org/v4/competitions/"
     try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an exception for bad status codes
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return await response_cache.cache.get_json(url, ttl=CACHE_TTL)
+    except httpx.HTTPError as e:
         print(f"Error fetching data from API: {e}")
         return None
@@ -0,0 +1,38 @@
+from typing import Any, Iterable, Optional
+from fastapi import Request, Response
+from api import data_files
+
+def _none_match(header: Optional[str], etags: Iterable[str]) -> bool:
+    """
+    Weak comparison of an If-None-Match header against a file's ETags.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {value.strip()[2:] if value.strip().startswith("W/") else value.strip() for value in header.split(",")}
+    return any(etag in candidates for etag in etags)
+
+def json_file_response(request: Request, filename: str, default: Any = None, missing: Any = None) -> Response:
+    """
+    Serve a data file from the registry's pre-encoded cache.
+
+    The body, its compressed variants and their ETags are computed once per
+    file version, so a request is a cache lookup plus a write. Conditional
+    requests for the current version get a 304 without a body. `default`,
+    if given, is served when the file is missing or malformed, and
+    `missing` only when it is missing.
+    """
+    options = {}
+    if default is not None:
+        options["default"] = default
+    if missing is not None:
+        options["missing"] = missing
+    encoded = data_files.registry.encoded(filename, **options)
+    encoding = encoded.choose(request.headers.get("accept-encoding"))
+    headers = {"ETag": encoded.etags[encoding], "Vary": "Accept-Encoding"}
+    if _none_match(request.headers.get("if-none-match"), encoded.etags.values()):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=encoded.variants[encoding], media_type="application/json", headers=headers)
@@ -0,0 +1,77 @@
+import json
+from typing import AsyncIterator, Iterable, Iterator, List, Tuple, Type
+from pydantic import BaseModel, ValidationError
+
+# Games validated, written or read per batch during bulk imports and exports.
+BULK_CHUNK_SIZE = 1000
+
+# Validation errors reported back before an import is rejected.
+MAX_BULK_ERRORS = 20
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Split a streamed request body into (line number, line) pairs, skipping
+    blank lines. Only one partial line is buffered at a time.
+    """
+    buffer = b""
+    line_number = 0
+    async for data in stream:
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line.decode("utf-8", errors="replace")
+    if buffer.strip():
+        yield line_number + 1, buffer.decode("utf-8", errors="replace")
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+def validate_chunk(model: Type[BaseModel], lines: List[Tuple[int, str]]) -> Tuple[List[dict], List[dict]]:
+    """
+    Parse and validate one chunk of NDJSON lines against `model`.
+
+    Returns the valid records as dicts and an error entry for every
+    invalid line.
+    """
+    records, errors = [], []
+    for line_number, line in lines:
+        try:
+            records.append(dict(model(**json.loads(line))))
+        except json.JSONDecodeError as e:
+            errors.append({"line": line_number, "error": f"Invalid JSON: {e.msg}"})
+        except TypeError:
+            errors.append({"line": line_number, "error": "Expected a JSON object"})
+        except ValidationError as e:
+            errors.append({"line": line_number, "error": _describe(e)})
+    return records, errors
+
+def read_chunks(spool, chunk_size: int = BULK_CHUNK_SIZE) -> Iterator[List[dict]]:
+    """
+    Read records back from a spool file of NDJSON lines, `chunk_size` at a time.
+    """
+    spool.seek(0)
+    chunk = []
+    for line in spool:
+        chunk.append(json.loads(line))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def export_lines(games: Iterable[dict], chunk_size: int = BULK_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Serialize games as NDJSON, yielding `chunk_size` lines per piece.
+    """
+    lines = []
+    for game in games:
+        lines.append(json.dumps(game, separators=(",", ":")))
+        if len(lines) == chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import IO, Callable, Dict, Iterator, List, Optional
+
+# fsync the journal after this many appended records...
+FSYNC_BATCH_SIZE = 32
+# ...or once this many seconds have passed since the last fsync.
+FSYNC_INTERVAL = 0.05
+# Fold the journal into the snapshot once it holds this many records.
+COMPACTION_THRESHOLD = 1000
+
+def _fsync_directory(path: str):
+    """
+    Make a rename inside `path` durable (no-op where directories can't be opened).
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def read_records(path: str) -> Iterator[dict]:
+    """
+    Yield the records of a journal file in order.
+
+    A torn final line, left behind by a crash in the middle of an append,
+    is ignored.
+    """
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    break
+    except FileNotFoundError:
+        return
+
+def snapshot_digest(data: Optional[bytes]) -> Optional[str]:
+    """
+    Identifies one snapshot's content in `superseded` journal records.
+    """
+    return hashlib.sha256(data).hexdigest() if data is not None else None
+
+def live_records(path: str, digest: Optional[str]) -> List[dict]:
+    """
+    The records of a journal file that are not yet part of the snapshot
+    with `digest`: a `superseded` record naming that snapshot drops every
+    record before it.
+    """
+    records = []
+    for record in read_records(path):
+        if record["op"] == "superseded":
+            if digest is not None and record.get("snapshot") == digest:
+                records = []
+        else:
+            records.append(record)
+    return records
+
+def apply_record(games: Dict[str, dict], record: dict):
+    """
+    Apply one journal record to a name -> game mapping.
+    """
+    if record["op"] == "put":
+        games[record["name"]] = record["game"]
+    elif record["op"] == "delete":
+        games.pop(record["name"], None)
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def write_file(path: str, write: Callable[[IO[bytes]], None]) -> str:
+    """
+    Write a uniquely named temporary file next to `path` through
+    `write(f)` and fsync it, so concurrent writers of the same file never
+    share a temporary file.
+
+    Returns the temporary path, to be swapped in with `install_snapshot`.
+    The temporary file is removed if writing fails.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+    return tmp_path
+
+def write_snapshot(path: str, games: list) -> str:
+    """
+    Write and fsync `games` to a temporary file next to the snapshot.
+
+    Returns the temporary path, to be swapped in with `install_snapshot`.
+    """
+    # json.dumps runs the C encoder; json.dump streams through the slow
+    # pure Python one.
+    body = json.dumps(games, separators=(",", ":")).encode("utf-8")
+    return write_file(path, lambda f: f.write(body))
+
+def install_snapshot(tmp_path: str, path: str):
+    """
+    Atomically replace the snapshot with a file from `write_snapshot`.
+
+    os.replace guarantees readers see either the old or the new snapshot,
+    never a truncated one. The temporary file is removed if the swap fails.
+    """
+    try:
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+    _fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+class MutationJournal:
+    """
+    Append-only log of catalog mutations, stored next to the snapshot.
+
+    Each create/update/delete is one JSON line. Lines are flushed to the OS
+    immediately and fsynced in batches (group commit), so the cost of a
+    mutation does not depend on the size of the catalog. `rotate` moves the
+    live journal aside so it can be folded into a new snapshot while new
+    mutations keep going to a fresh file.
+    """
+
+    def __init__(self, snapshot_path: str):
+        self.path = f"{snapshot_path}.journal"
+        self.compacting_path = f"{snapshot_path}.journal.compacting"
+        self._file = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+        self._truncate_torn_tail()
+        self.records = sum(1 for _ in read_records(self.path))
+
+    def _truncate_torn_tail(self):
+        """
+        Cut off a partial last line so new records start on a line of their own.
+        """
+        try:
+            with open(self.path, "rb+") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)
+        except FileNotFoundError:
+            pass
+
+    def append(self, record: dict):
+        """
+        Append a record, fsyncing once the batch size or interval is reached.
+        """
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a")
+            self._file.write(line)
+            self._file.flush()
+            self.records += 1
+            self._pending += 1
+            if self._pending >= FSYNC_BATCH_SIZE or time.monotonic() - self._last_sync >= FSYNC_INTERVAL:
+                self._sync()
+
+    def _sync(self):
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        """
+        Force pending records to disk.
+        """
+        with self._lock:
+            self._sync()
+
+    def rotate(self) -> Optional[str]:
+        """
+        Move the live journal aside for compaction and start a new one.
+
+        Returns the path of the rotated file, or None if there is nothing
+        to compact.
+        """
+        with self._lock:
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if not os.path.exists(self.path):
+                return self.compacting_path if os.path.exists(self.compacting_path) else None
+            if os.path.exists(self.compacting_path):
+                # A previous compaction never finished: keep its records.
+                with open(self.path, "r") as src, open(self.compacting_path, "a") as dst:
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.compacting_path)
+            self.records = 0
+            return self.compacting_path
+
+    def supersede(self, rotated_path: str, digest: str):
+        """
+        Durably mark the records of a rotated journal as contained in the
+        snapshot with `digest`, before that snapshot is swapped in. If the
+        rotated file outlives the swap, loading skips what it covers; if
+        the swap never happens, the marker matches nothing and every
+        record is still replayed.
+        """
+        line = json.dumps({"op": "superseded", "snapshot": digest}, separators=(",", ":")) + "\n"
+        with open(rotated_path, "a") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def close(self):
+        with self._lock:
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,385 @@
+import argparse
+import json
+import sqlite3
+import threading
+from typing import Iterable, Iterator, List, Optional, Tuple
+from api.games_store import (
+    HISTOGRAM_BUCKETS,
+    SEARCH_FIELDS,
+    GamesStorage,
+    GamesStore,
+    NameConflict,
+    VersionMismatch,
+    bucket_labels,
+    games_db_path,
+    games_path,
+)
+from api.search_index import DEFAULT_SIMILARITY, TrigramIndex, tokenize
+
+# Columns of the games table; any other field of a game is kept in `extra`.
+COLUMNS = ("name", "category", "link", "description", "rating", "player_count", "version")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    name TEXT PRIMARY KEY,
+    category TEXT,
+    link TEXT,
+    description TEXT,
+    rating REAL,
+    player_count INTEGER,
+    version INTEGER NOT NULL DEFAULT 1,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS games_rating ON games (rating, name);
+CREATE INDEX IF NOT EXISTS games_player_count ON games (player_count, name);
+CREATE VIRTUAL TABLE IF NOT EXISTS games_fts USING fts5 (
+    name, category, description, content='games', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS games_fts_insert AFTER INSERT ON games BEGIN
+    INSERT INTO games_fts (rowid, name, category, description)
+    VALUES (new.rowid, new.name, new.category, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS games_fts_delete AFTER DELETE ON games BEGIN
+    INSERT INTO games_fts (games_fts, rowid, name, category, description)
+    VALUES ('delete', old.rowid, old.name, old.category, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS games_fts_update AFTER UPDATE ON games BEGIN
+    INSERT INTO games_fts (games_fts, rowid, name, category, description)
+    VALUES ('delete', old.rowid, old.name, old.category, old.description);
+    INSERT INTO games_fts (rowid, name, category, description)
+    VALUES (new.rowid, new.name, new.category, new.description);
+END;
+"""
+
+# bm25() weights in the column order of games_fts.
+BM25_WEIGHTS = ", ".join(str(SEARCH_FIELDS[field]) for field in ("name", "category", "description"))
+
+def fts_query(query: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 query where every token must match as a prefix.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+def _row_values(game: dict) -> tuple:
+    extra = {key: value for key, value in game.items() if key not in COLUMNS}
+    return tuple(game.get(column) for column in COLUMNS) + (json.dumps(extra) if extra else None,)
+
+def _row_to_game(row: sqlite3.Row) -> dict:
+    game = {column: row[column] for column in COLUMNS}
+    if row["extra"]:
+        game.update(json.loads(row["extra"]))
+    return game
+
+class SqliteGamesStore(GamesStorage):
+    """
+    Games catalog stored in SQLite.
+
+    The database runs in WAL mode so readers are not blocked by writers.
+    rating and player_count are indexed together with the name, so sorted
+    keyset pages are index range scans, and an external-content FTS5 table
+    kept in sync by triggers serves full-text search ranked with bm25().
+    Only a trigram index of game names is kept in memory, for fuzzy search.
+    """
+
+    def __init__(self, path: str = games_db_path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._trigrams = TrigramIndex()
+        self._trigrams.rebuild((row[0], row[0]) for row in self._query("SELECT name FROM games"))
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def all(self) -> List[dict]:
+        return [_row_to_game(row) for row in self._query("SELECT * FROM games ORDER BY rowid")]
+
+    def get(self, name: str) -> Optional[dict]:
+        rows = self._query("SELECT * FROM games WHERE name = ?", (name,))
+        return _row_to_game(rows[0]) if rows else None
+
+    def count(self) -> int:
+        return self._query("SELECT COUNT(*) FROM games")[0][0]
+
+    def search(self, query: str, limit: int = None, offset: int = 0) -> Tuple[int, List[dict]]:
+        total, games, _ = self.page(query, limit=limit, offset=offset)
+        return total, games
+
+    def _match_clause(self, query: str, filters: Optional[dict], fuzzy: bool, similarity: float):
+        """
+        Translate a query and filters into (source, conditions, params, scores)
+        over the games table aliased as g. Returns None if the query cannot
+        match anything.
+        """
+        source, conditions, params, scores = "games g", [], [], None
+        if query and fuzzy:
+            scores = self._trigrams.score(query, similarity)
+            if not scores:
+                return None
+            conditions.append("g.name IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(list(scores)))
+        elif query:
+            match = fts_query(query)
+            if match is None:
+                return None
+            source = "games_fts JOIN games g ON g.rowid = games_fts.rowid"
+            conditions.append("games_fts MATCH ?")
+            params.append(match)
+        filters = filters or {}
+        if filters.get("category"):
+            conditions.append("g.category = ? COLLATE NOCASE")
+            params.append(filters["category"])
+        for key, condition in (("min_rating", "g.rating >= ?"), ("max_rating", "g.rating <= ?"), ("min_players", "g.player_count >= ?")):
+            if filters.get(key) is not None:
+                conditions.append(condition)
+                params.append(filters[key])
+        return source, conditions, tuple(params), scores
+
+    @staticmethod
+    def _where(conditions: List[str]) -> str:
+        return f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    def page(self, query: str = "", sort: str = None, limit: int = None, after=None, offset: int = 0,
+             fuzzy: bool = False, similarity: float = DEFAULT_SIMILARITY, filters: dict = None):
+        field, descending = self._parse_page_args(sort, after)
+        direction = "DESC" if descending else "ASC"
+        sql_limit = -1 if limit is None else limit + 1
+        clause = self._match_clause(query, filters, fuzzy, similarity)
+        if clause is None:
+            return 0, [], None
+        source, conditions, params, scores = clause
+        total = self._query(f"SELECT COUNT(*) FROM {source} {self._where(conditions)}", params)[0][0]
+
+        if not query and field is not None and (after is None or isinstance(after, list)):
+            keyset, keyset_params = list(conditions), params
+            if after is not None:
+                keyset.append(f"(g.{field}, g.name) {'<' if descending else '>'} (?, ?)")
+                keyset_params += tuple(after)
+            rows = self._query(
+                f"SELECT g.* FROM games g {self._where(keyset)} "
+                f"ORDER BY g.{field} {direction}, g.name {direction} LIMIT ? OFFSET ?",
+                keyset_params + (sql_limit, offset),
+            )
+            has_more = limit is not None and len(rows) > limit
+            rows = rows[:limit] if limit is not None else rows
+            next_position = [rows[-1][field], rows[-1]["name"]] if has_more else None
+            return total, [_row_to_game(row) for row in rows], next_position
+
+        start = (after if isinstance(after, int) else 0) + offset
+        if scores is not None:
+            return self._fuzzy_page(source, conditions, params, scores, field, descending, limit, start, total)
+        if field:
+            order = f"g.{field} {direction}, g.name {direction}"
+        elif query:
+            order = f"bm25(games_fts, {BM25_WEIGHTS}), g.name"
+        elif conditions:
+            order = "g.name"
+        else:
+            order = "g.rowid"
+        rows = self._query(
+            f"SELECT g.* FROM {source} {self._where(conditions)} ORDER BY {order} LIMIT ? OFFSET ?",
+            params + (sql_limit, start),
+        )
+        has_more = limit is not None and len(rows) > limit
+        rows = rows[:limit] if limit is not None else rows
+        return total, [_row_to_game(row) for row in rows], start + limit if has_more else None
+
+    def _fuzzy_page(self, source, conditions, params, scores, field, descending, limit, start, total):
+        rows = self._query(f"SELECT g.* FROM {source} {self._where(conditions)}", params)
+        if field is None:
+            rows.sort(key=lambda row: (-scores[row["name"]], row["name"]))
+        else:
+            rows.sort(key=lambda row: (row[field] or 0, row["name"]), reverse=descending)
+        end = None if limit is None else start + limit
+        has_more = end is not None and total > end
+        return total, [_row_to_game(row) for row in rows[start:end]], end if has_more else None
+
+    def facets(self, query: str = "", filters: dict = None, fuzzy: bool = False,
+               similarity: float = DEFAULT_SIMILARITY) -> dict:
+        """
+        Category counts with GROUP BY and histogram buckets as conditional
+        sums, both in a single pass over the matching rows.
+        """
+        clause = self._match_clause(query, filters, fuzzy, similarity)
+        if clause is None:
+            result = {"total": 0, "category": {}}
+            for field, bounds in HISTOGRAM_BUCKETS.items():
+                result[field] = dict.fromkeys(bucket_labels(bounds), 0)
+            return result
+        source, conditions, params, _ = clause
+        where = self._where(conditions)
+        categories = self._query(f"SELECT g.category, COUNT(*) FROM {source} {where} GROUP BY g.category", params)
+        sums, bucket_params = [], []
+        for field, bounds in HISTOGRAM_BUCKETS.items():
+            for low, high in zip(bounds, bounds[1:]):
+                sums.append(f"SUM(g.{field} >= ? AND g.{field} < ?)")
+                bucket_params += [low, high]
+            sums.append(f"SUM(g.{field} >= ?)")
+            bucket_params.append(bounds[-1])
+        row = self._query(f"SELECT COUNT(*), {', '.join(sums)} FROM {source} {where}", tuple(bucket_params) + params)[0]
+        result = {"total": row[0], "category": {category: count for category, count in categories}}
+        counts = iter(row[1:])
+        for field, bounds in HISTOGRAM_BUCKETS.items():
+            result[field] = {label: next(counts) or 0 for label in bucket_labels(bounds)}
+        return result
+
+    def add(self, game: dict) -> dict:
+        game = dict(game, version=1)
+        with self._lock:
+            try:
+                self._conn.execute(
+                    f"INSERT INTO games ({', '.join(COLUMNS)}, extra) VALUES ({', '.join('?' * (len(COLUMNS) + 1))})",
+                    _row_values(game),
+                )
+            except sqlite3.IntegrityError:
+                raise NameConflict(game["name"])
+            self._trigrams.add(game["name"], game["name"])
+        return game
+
+    def replace(self, name: str, game: dict, expected_version: int = None) -> Optional[dict]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute("SELECT version FROM games WHERE name = ?", (name,)).fetchall()
+                if not rows:
+                    self._conn.execute("ROLLBACK")
+                    return None
+                if expected_version is not None and rows[0]["version"] != expected_version:
+                    raise VersionMismatch(name)
+                game = dict(game, version=rows[0]["version"] + 1)
+                assignments = ", ".join(f"{column} = ?" for column in COLUMNS)
+                self._conn.execute(
+                    f"UPDATE games SET {assignments}, extra = ? WHERE name = ?",
+                    _row_values(game) + (name,),
+                )
+                self._conn.execute("COMMIT")
+                if game["name"] != name:
+                    self._trigrams.remove(name)
+                    self._trigrams.add(game["name"], game["name"])
+            except sqlite3.IntegrityError:
+                self._conn.execute("ROLLBACK")
+                raise NameConflict(game["name"])
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return game
+
+    def remove(self, name: str, expected_version: int = None) -> bool:
+        with self._lock:
+            if expected_version is None:
+                cursor = self._conn.execute("DELETE FROM games WHERE name = ?", (name,))
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM games WHERE name = ? AND version = ?", (name, expected_version)
+                )
+            if cursor.rowcount:
+                self._trigrams.remove(name)
+                return True
+            if expected_version is None:
+                return False
+            if self.get(name) is not None:
+                raise VersionMismatch(name)
+            return False
+
+    def put_many(self, chunks: Iterable[List[dict]]) -> Tuple[int, int]:
+        """
+        Upsert games chunk by chunk inside a single transaction, so memory
+        is bounded by the chunk size and the import commits or rolls back
+        as a whole.
+        """
+        columns = ", ".join(COLUMNS)
+        assignments = ", ".join(f"{column} = excluded.{column}" for column in COLUMNS[1:])
+        upsert = (
+            f"INSERT INTO games ({columns}, extra) VALUES ({', '.join('?' * (len(COLUMNS) + 1))}) "
+            f"ON CONFLICT (name) DO UPDATE SET {assignments}, extra = excluded.extra"
+        )
+        created = []
+        updated = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for chunk in chunks:
+                    names = json.dumps([game["name"] for game in chunk])
+                    versions = dict(self._conn.execute(
+                        "SELECT name, version FROM games WHERE name IN (SELECT value FROM json_each(?))", (names,)
+                    ).fetchall())
+                    rows = []
+                    for game in chunk:
+                        version = versions.get(game["name"])
+                        if version is None:
+                            created.append(game["name"])
+                        else:
+                            updated += 1
+                        versions[game["name"]] = version = (version or 0) + 1
+                        rows.append(_row_values(dict(game, version=version)))
+                    self._conn.executemany(upsert, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            for name in created:
+                self._trigrams.add(name, name)
+        return len(created), updated
+
+    def iter_games(self, chunk_size: int = 1000) -> Iterator[dict]:
+        """
+        Yield every game in rowid order, one short query per chunk so that
+        writers are not held up by a long export.
+        """
+        last = 0
+        while True:
+            rows = self._query("SELECT rowid, * FROM games WHERE rowid > ? ORDER BY rowid LIMIT ?", (last, chunk_size))
+            if not rows:
+                return
+            for row in rows:
+                yield _row_to_game(row)
+            last = rows[-1]["rowid"]
+
+    def compact(self):
+        """
+        Checkpoint the WAL into the main database file and truncate it.
+        """
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def migrate(source: str, target: str) -> int:
+    """
+    Copy every game from a JSON catalog (snapshot plus journal) into an
+    SQLite catalog in a single transaction. Returns the number of games.
+    """
+    games = GamesStore(source).all()
+    store = SqliteGamesStore(target)
+    with store._lock:
+        conn = store._conn
+        conn.execute("BEGIN")
+        conn.execute("DELETE FROM games")
+        conn.executemany(
+            f"INSERT INTO games ({', '.join(COLUMNS)}, extra) VALUES ({', '.join('?' * (len(COLUMNS) + 1))})",
+            (_row_values(game) for game in games),
+        )
+        conn.execute("COMMIT")
+    store.compact()
+    store.close()
+    return len(games)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate the games catalog from games.json to SQLite.")
+    parser.add_argument("--source", default=games_path, help="Path to games.json")
+    parser.add_argument("--target", default=games_db_path, help="Path to the SQLite database")
+
+    args = parser.parse_args()
+
+    count = migrate(source=args.source, target=args.target)
+    print(f"Successfully migrated {count} games from {args.source} to {args.target}")
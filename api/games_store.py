@@ -0,0 +1,638 @@
+import base64
+import binascii
+import bisect
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from api.games_journal import (
+    COMPACTION_THRESHOLD,
+    MutationJournal,
+    apply_record,
+    install_snapshot,
+    live_records,
+    snapshot_digest,
+    write_snapshot,
+)
+from api.search_index import DEFAULT_SIMILARITY, InvertedIndex, TrigramIndex
+from api.sorted_index import SortedIndex, page_keys
+
+# Build the path relative to the current file
+dir_path = os.path.dirname(os.path.realpath(__file__))
+games_path = os.path.join(dir_path, "..", "frontend", "data", "games.json")
+
+# Relative weight of each field when ranking search results.
+SEARCH_FIELDS = {"name": 3.0, "category": 2.0, "description": 1.0}
+
+# Fields the catalog can be listed by, each backed by a presorted index.
+SORT_FIELDS = ("rating", "player_count")
+
+# Filters accepted by page() and facets().
+FILTERS = ("category", "min_rating", "max_rating", "min_players")
+
+# Lower bounds of the histogram buckets returned by facets().
+HISTOGRAM_BUCKETS = {
+    "rating": (0, 1, 2, 3, 4, 5),
+    "player_count": (0, 10, 100, 1000, 10000, 100000, 1000000),
+}
+
+class VersionMismatch(Exception):
+    """
+    Raised when a write expects a different version of a game than the stored one.
+    """
+
+class NameConflict(Exception):
+    """
+    Raised when a write would overwrite another game with the same name.
+    """
+
+def encode_cursor(position) -> str:
+    """
+    Turn a page position into an opaque cursor string.
+    """
+    data = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """
+    Turn a cursor string back into a page position. Raises ValueError if
+    the cursor is malformed.
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+def bucket_labels(bounds: Sequence[float]) -> List[str]:
+    """
+    Labels for histogram buckets, e.g. (0, 10, 100) -> ["0-10", "10-100", "100+"].
+    """
+    return [f"{low}-{high}" for low, high in zip(bounds, bounds[1:])] + [f"{bounds[-1]}+"]
+
+def has_filters(filters: Optional[dict]) -> bool:
+    return any(value is not None and value != "" for value in (filters or {}).values())
+
+# Which GamesStorage implementation open_games_store() returns by default.
+GAMES_STORAGE_BACKEND = os.environ.get("GAMES_STORAGE_BACKEND", "json")
+games_db_path = os.environ.get("GAMES_DB_PATH", os.path.join(dir_path, "..", "frontend", "data", "games.db"))
+
+class GamesStorage:
+    """
+    Interface shared by the games catalog backends.
+
+    Records are game dicts keyed by their unique `name` and carry a
+    `version` that is bumped on every update. Writers may pass the version
+    they read as `expected_version` to get compare-and-swap semantics.
+    """
+
+    def all(self) -> List[dict]:
+        """
+        Return every game in the catalog.
+        """
+        raise NotImplementedError
+
+    def get(self, name: str) -> Optional[dict]:
+        """
+        Return a single game by its name, or None.
+        """
+        raise NotImplementedError
+
+    def search(self, query: str, limit: int = None, offset: int = 0) -> Tuple[int, List[dict]]:
+        """
+        Return the number of matching games and one page of them, best first.
+        """
+        raise NotImplementedError
+
+    def page(self, query: str = "", sort: str = None, limit: int = None, after=None, offset: int = 0,
+             fuzzy: bool = False, similarity: float = DEFAULT_SIMILARITY, filters: dict = None):
+        """
+        Return one page of games as (total, games, next_position).
+
+        `sort` is one of SORT_FIELDS, optionally prefixed with "-" for
+        descending order. Without a query, sorted pages are keyset pages and
+        `after` is the last (value, name) key of the previous page; an int
+        `after` is an offset into the result list, as it is otherwise. `next_position`
+        is None on the last page.
+
+        With `fuzzy`, the query is matched against game names by trigram
+        similarity instead of full-text search, so misspelled titles still
+        match; `similarity` is the share of query trigrams a name must share.
+
+        `filters` maps FILTERS to values: an exact, case-insensitive
+        category and inclusive rating / player count bounds. Filtered pages
+        without a query or sort are ordered by name.
+        """
+        raise NotImplementedError
+
+    def facets(self, query: str = "", filters: dict = None, fuzzy: bool = False,
+               similarity: float = DEFAULT_SIMILARITY) -> dict:
+        """
+        Count the games matching a query and filters per category and per
+        HISTOGRAM_BUCKETS bucket of rating and player count.
+        """
+        raise NotImplementedError
+
+    def add(self, game: dict) -> dict:
+        """
+        Add a new game to the catalog and return the stored record.
+
+        Raises NameConflict if a game with the same name already exists.
+        """
+        raise NotImplementedError
+
+    def replace(self, name: str, game: dict, expected_version: int = None) -> Optional[dict]:
+        """
+        Replace the game called `name` and return the stored record, or None
+        if it does not exist.
+
+        Raises VersionMismatch if `expected_version` is given and differs from
+        the stored version, and NameConflict if the game is renamed onto
+        another existing game.
+        """
+        raise NotImplementedError
+
+    def remove(self, name: str, expected_version: int = None) -> bool:
+        """
+        Delete the game called `name`. Returns False if it does not exist.
+
+        Raises VersionMismatch if `expected_version` is given and differs from
+        the stored version.
+        """
+        raise NotImplementedError
+
+    def put_many(self, chunks: Iterable[List[dict]]) -> Tuple[int, int]:
+        """
+        Create or replace every game in `chunks` (lists of games) as one
+        batch that is committed at the end, and return (created, updated).
+        Replaced games get their version bumped; later duplicates win.
+        """
+        raise NotImplementedError
+
+    def iter_games(self) -> Iterator[dict]:
+        """
+        Yield every game in the catalog, for exports.
+        """
+        yield from self.all()
+
+    def compact(self):
+        """
+        Reclaim space used by superseded writes.
+        """
+
+    def flush(self):
+        """
+        Make every acknowledged write durable.
+        """
+
+    @staticmethod
+    def _parse_page_args(sort: Optional[str], after):
+        """
+        Validate `sort` and `after` for page(); returns (field, descending).
+        """
+        descending = bool(sort) and sort.startswith("-")
+        field = sort.lstrip("-") if sort else None
+        if field is not None and field not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {sort}")
+        if isinstance(after, list) and not (
+            len(after) == 2 and isinstance(after[0], (int, float)) and isinstance(after[1], str)
+        ):
+            raise ValueError("Invalid cursor")
+        return field, descending
+
+def open_games_store(backend: str = None, path: str = None) -> GamesStorage:
+    """
+    Open the catalog with the configured storage backend ("json" or "sqlite").
+    """
+    backend = backend or GAMES_STORAGE_BACKEND
+    if backend == "json":
+        return GamesStore(path or games_path)
+    if backend == "sqlite":
+        from api.games_sqlite import SqliteGamesStore
+        return SqliteGamesStore(path or games_db_path)
+    raise ValueError(f"Unknown games storage backend: {backend}")
+
+class GamesStore(GamesStorage):
+    """
+    Process-wide, in-memory copy of the games catalog, stored as JSON.
+
+    The catalog lives on disk as a JSON snapshot plus an append-only
+    journal of mutations. Both are read once and the records are kept in
+    memory; every access does a cheap `os.stat` and the files are only
+    re-read when they have changed since the last load. A full-text index
+    over name, category and description is rebuilt on load and updated in
+    place by add/replace/remove, as are presorted indexes on SORT_FIELDS.
+
+    Every game carries a `version` that starts at 1 and is bumped on each
+    update; writers can pass the version they read to get compare-and-swap
+    semantics.
+
+    Mutations append one journal record instead of rewriting the snapshot.
+    Once the journal reaches `compaction_threshold` records, a background
+    thread folds it into a new snapshot that is swapped in atomically.
+    """
+
+    def __init__(self, path: str = games_path, compaction_threshold: int = COMPACTION_THRESHOLD):
+        self.path = path
+        self.compaction_threshold = compaction_threshold
+        self._lock = threading.RLock()
+        self._by_name: Dict[str, dict] = {}
+        self._games: Optional[List[dict]] = []
+        self._index = InvertedIndex(SEARCH_FIELDS)
+        self._sorted = {field: SortedIndex(field) for field in SORT_FIELDS}
+        self._trigrams = TrigramIndex()
+        self._categories: Dict[str, Set[str]] = defaultdict(set)
+        self._journal = MutationJournal(path)
+        self._compactor: Optional[threading.Thread] = None
+        self._signature = None
+        self._loaded = False
+        self.loads = 0
+
+    def _stat_signature(self):
+        signature = []
+        for path in (self.path, self._journal.compacting_path, self._journal.path):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                signature.append(None)
+            else:
+                signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _load(self, signature):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = None
+        games = json.loads(data) if data is not None else []
+        digest = snapshot_digest(data)
+        by_name = {game["name"]: game for game in games}
+        for game in by_name.values():
+            game.setdefault("version", 1)
+        for path in (self._journal.compacting_path, self._journal.path):
+            for record in live_records(path, digest):
+                apply_record(by_name, record)
+        self._install(by_name)
+        self._signature = signature
+        self._loaded = True
+        self.loads += 1
+
+    def _install(self, by_name: Dict[str, dict]):
+        self._by_name = by_name
+        self._games = None
+        self._index.rebuild(by_name.items())
+        self._trigrams.rebuild((name, name) for name in by_name)
+        self._categories = defaultdict(set)
+        for name, game in by_name.items():
+            self._categories[game.get("category")].add(name)
+        for index in self._sorted.values():
+            index.rebuild(by_name.items())
+
+    def refresh(self):
+        """
+        Reload the catalog if the files on disk have changed.
+        """
+        signature = self._stat_signature()
+        if self._loaded and signature == self._signature:
+            return
+        with self._lock:
+            if self._loaded and signature == self._signature:
+                return
+            self._load(signature)
+
+    def all(self) -> List[dict]:
+        """
+        Return every game in the catalog.
+        """
+        self.refresh()
+        games = self._games
+        if games is None:
+            games = self._games = list(self._by_name.values())
+        return games
+
+    def get(self, name: str) -> Optional[dict]:
+        """
+        Return a single game by its name, or None.
+        """
+        self.refresh()
+        return self._by_name.get(name)
+
+    def search(self, query: str, limit: int = None, offset: int = 0) -> Tuple[int, List[dict]]:
+        """
+        Return the number of matching games and one page of them, best first.
+        """
+        self.refresh()
+        total, names = self._index.search(query, limit=limit, offset=offset)
+        return total, [self._by_name[name] for name in names]
+
+    def _matches(self, query: str, filters: Optional[dict], fuzzy: bool, similarity: float):
+        """
+        Return (scores, names) for a query and filters. scores is None
+        without a query and names is None when nothing narrows the catalog.
+
+        The text matches are intersected with the category postings and
+        with bisected ranges of the presorted rating and player count
+        indexes, so no filter scans the whole catalog.
+        """
+        scores = names = None
+        if query:
+            scores = self._trigrams.score(query, similarity) if fuzzy else self._index.score(query)
+            names = set(scores)
+        filters = filters or {}
+        category = filters.get("category")
+        if category:
+            category = category.lower()
+            matching = set()
+            for value, members in self._categories.items():
+                if value is not None and value.lower() == category:
+                    matching |= members
+            names = matching if names is None else names & matching
+        if filters.get("min_rating") is not None or filters.get("max_rating") is not None:
+            names = self._sorted["rating"].filter(names, self._by_name, filters.get("min_rating"), filters.get("max_rating"))
+        if filters.get("min_players") is not None:
+            names = self._sorted["player_count"].filter(names, self._by_name, filters["min_players"])
+        return scores, names
+
+    def page(self, query: str = "", sort: str = None, limit: int = None, after=None, offset: int = 0,
+             fuzzy: bool = False, similarity: float = DEFAULT_SIMILARITY, filters: dict = None):
+        """
+        Return one page of games as (total, games, next_position).
+
+        Sorted pages without a query are read straight from the presorted
+        index, so they cost O(log n + limit) when unfiltered.
+        """
+        self.refresh()
+        field, descending = self._parse_page_args(sort, after)
+        filtered = has_filters(filters)
+        if not query and field is not None:
+            # An offset cursor pages the same presorted keys by position.
+            by_offset = isinstance(after, int)
+            if by_offset:
+                offset, after = offset + after, None
+            # Read one key past the page to learn whether there is a next one.
+            fetch = offset + limit + 1 if limit is not None else None
+            index = self._sorted[field]
+            if filtered:
+                _, names = self._matches(query, filters, fuzzy, similarity)
+                total = len(names)
+                keys = sorted(index.key(name, self._by_name[name]) for name in names)
+                keys = page_keys(keys, fetch, after=after, descending=descending)[offset:]
+            else:
+                total = len(self._by_name)
+                keys = index.page(fetch, after=after, descending=descending)[offset:]
+            has_more = limit is not None and len(keys) > limit
+            keys = keys[:limit]
+            games = [self._by_name[name] for _, name in keys]
+            if not has_more:
+                return total, games, None
+            return total, games, offset + limit if by_offset else list(keys[-1])
+
+        start = (after if isinstance(after, int) else 0) + offset
+        end = start + limit if limit is not None else None
+        if not query and not filtered:
+            games = self.all()
+            total, page = len(games), games[start:end]
+        elif field is None and not fuzzy and not filtered:
+            total, page = self.search(query, limit=limit, offset=start)
+        else:
+            scores, names = self._matches(query, filters, fuzzy, similarity)
+            total = len(names)
+            if field is not None:
+                names = sorted(names, key=lambda name: self._sorted[field].key(name, self._by_name[name]), reverse=descending)
+            elif scores is not None:
+                names = sorted(names, key=lambda name: (-scores[name], name))
+            else:
+                names = sorted(names)
+            page = [self._by_name[name] for name in names[start:end]]
+        has_more = end is not None and end < total
+        return total, page, end if has_more else None
+
+    def facets(self, query: str = "", filters: dict = None, fuzzy: bool = False,
+               similarity: float = DEFAULT_SIMILARITY) -> dict:
+        """
+        Count the games matching a query and filters per category and per
+        HISTOGRAM_BUCKETS bucket of rating and player count.
+
+        Unfiltered counts come from the category postings and one bisect per
+        bucket bound; otherwise only the matching games are visited.
+        """
+        self.refresh()
+        _, names = self._matches(query, filters, fuzzy, similarity)
+        if names is None:
+            categories = {value: len(members) for value, members in self._categories.items()}
+            histograms = {
+                field: self._sorted[field].histogram(bounds) for field, bounds in HISTOGRAM_BUCKETS.items()
+            }
+            total = len(self._by_name)
+        else:
+            categories = defaultdict(int)
+            histograms = {field: [0] * len(bounds) for field, bounds in HISTOGRAM_BUCKETS.items()}
+            for name in names:
+                game = self._by_name[name]
+                categories[game.get("category")] += 1
+                for field, bounds in HISTOGRAM_BUCKETS.items():
+                    bucket = bisect.bisect_right(bounds, self._sorted[field].key(name, game)[0]) - 1
+                    if bucket >= 0:
+                        histograms[field][bucket] += 1
+            total = len(names)
+        result = {"total": total, "category": dict(categories)}
+        for field, bounds in HISTOGRAM_BUCKETS.items():
+            result[field] = dict(zip(bucket_labels(bounds), histograms[field]))
+        return result
+
+    def add(self, game: dict) -> dict:
+        """
+        Add a new game to the catalog and return the stored record.
+
+        Raises NameConflict if a game with the same name already exists.
+        """
+        with self._lock:
+            self.refresh()
+            if game["name"] in self._by_name:
+                raise NameConflict(game["name"])
+            game = dict(game, version=1)
+            self._write({"op": "put", "name": game["name"], "game": game})
+            self._by_name[game["name"]] = game
+            self._index.add(game["name"], game)
+            self._trigrams.add(game["name"], game["name"])
+            self._categories[game.get("category")].add(game["name"])
+            for index in self._sorted.values():
+                index.add(game["name"], game)
+            self._games = None
+            return game
+
+    def _check_version(self, name: str, expected_version: Optional[int]):
+        if expected_version is not None and self._by_name[name]["version"] != expected_version:
+            raise VersionMismatch(name)
+
+    def replace(self, name: str, game: dict, expected_version: int = None) -> Optional[dict]:
+        """
+        Replace the game called `name` and return the stored record, or None
+        if it does not exist.
+
+        Raises VersionMismatch if `expected_version` is given and differs from
+        the stored version, and NameConflict if the game is renamed onto
+        another existing game.
+        """
+        with self._lock:
+            self.refresh()
+            if name not in self._by_name:
+                return None
+            self._check_version(name, expected_version)
+            if game["name"] != name and game["name"] in self._by_name:
+                raise NameConflict(game["name"])
+            previous = self._by_name[name]
+            game = dict(game, version=previous["version"] + 1)
+            if game["name"] == name:
+                self._write({"op": "put", "name": name, "game": game})
+            else:
+                self._write({"op": "delete", "name": name})
+                self._write({"op": "put", "name": game["name"], "game": game})
+                del self._by_name[name]
+                self._index.remove(name)
+                self._trigrams.remove(name)
+            self._by_name[game["name"]] = game
+            self._index.add(game["name"], game)
+            self._trigrams.add(game["name"], game["name"])
+            self._remove_category(name, previous)
+            self._categories[game.get("category")].add(game["name"])
+            for index in self._sorted.values():
+                index.remove(name, previous)
+                index.add(game["name"], game)
+            self._games = None
+            return game
+
+    def remove(self, name: str, expected_version: int = None) -> bool:
+        """
+        Delete the game called `name`. Returns False if it does not exist.
+
+        Raises VersionMismatch if `expected_version` is given and differs from
+        the stored version.
+        """
+        with self._lock:
+            self.refresh()
+            if name not in self._by_name:
+                return False
+            self._check_version(name, expected_version)
+            self._write({"op": "delete", "name": name})
+            previous = self._by_name.pop(name)
+            self._index.remove(name)
+            self._trigrams.remove(name)
+            self._remove_category(name, previous)
+            for index in self._sorted.values():
+                index.remove(name, previous)
+            self._games = None
+            return True
+
+    def _remove_category(self, name: str, game: dict):
+        names = self._categories.get(game.get("category"))
+        if names is not None:
+            names.discard(name)
+            if not names:
+                del self._categories[game.get("category")]
+
+    def put_many(self, chunks: Iterable[List[dict]]) -> Tuple[int, int]:
+        """
+        Create or replace games in bulk and commit them as a new snapshot.
+
+        The games are applied to a copy of the catalog, which is then
+        written out once and swapped in atomically together with the
+        journal it supersedes; a failed import leaves the catalog as it
+        was. Indexes are rebuilt once at the end rather than per game.
+        """
+        self._lock_idle()
+        try:
+            self.refresh()
+            by_name = dict(self._by_name)
+            created = updated = 0
+            for chunk in chunks:
+                for game in chunk:
+                    previous = by_name.get(game["name"])
+                    if previous is None:
+                        created += 1
+                        by_name[game["name"]] = dict(game, version=1)
+                    else:
+                        updated += 1
+                        by_name[game["name"]] = dict(game, version=previous["version"] + 1)
+            if not created and not updated:
+                return 0, 0
+            rotated = self._journal.rotate()
+            try:
+                tmp_path = write_snapshot(self.path, list(by_name.values()))
+                if rotated is not None:
+                    # Unlike a compaction, this snapshot is newer than the
+                    # rotated journal, which must never be replayed over it.
+                    with open(tmp_path, "rb") as f:
+                        self._journal.supersede(rotated, snapshot_digest(f.read()))
+                install_snapshot(tmp_path, self.path)
+            except OSError:
+                # The rotated journal is replayed on the next load.
+                self._signature = None
+                raise
+            if rotated is not None:
+                os.remove(rotated)
+            self._install(by_name)
+            self._signature = self._stat_signature()
+            return created, updated
+        finally:
+            self._lock.release()
+
+    def _lock_idle(self):
+        """
+        Take the store lock once no background compaction is running, so a
+        bulk snapshot cannot race with one being written.
+        """
+        while True:
+            compactor = self._compactor
+            if compactor is not None:
+                compactor.join()
+            self._lock.acquire()
+            if self._compactor is None or not self._compactor.is_alive():
+                return
+            self._lock.release()
+
+    def _write(self, record: dict):
+        self._journal.append(record)
+        # The store already holds this record; re-stat so refresh() only
+        # reloads for writes made by other processes.
+        self._signature = self._stat_signature()
+        if self._journal.records >= self.compaction_threshold:
+            self._start_compaction()
+
+    def _start_compaction(self):
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self.compact, name="games-compaction", daemon=True)
+        self._compactor.start()
+
+    def compact(self):
+        """
+        Fold the journal into a new snapshot.
+
+        Only the journal rotation and the final swap hold the store lock;
+        the snapshot itself is written while mutations keep flowing into a
+        fresh journal.
+        """
+        with self._lock:
+            self.refresh()
+            rotated = self._journal.rotate()
+            if rotated is None:
+                return
+            games = list(self._by_name.values())
+            self._signature = self._stat_signature()
+        tmp_path = write_snapshot(self.path, games)
+        with self._lock:
+            install_snapshot(tmp_path, self.path)
+            os.remove(rotated)
+            self._signature = self._stat_signature()
+
+    def flush(self):
+        """
+        Wait for a running compaction and fsync any pending journal records.
+        """
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        self._journal.sync()
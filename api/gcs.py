@@ -1,10 +1,11 @@
 import os
-from google.cloud import storage
 from fastapi import UploadFile
 
 GCS_BUCKET_NAME = os.environ.get("GCS_BUCKET_NAME")
 
 def get_storage_client():
+    # Imported on first use: the Cloud Storage SDK is slow to import.
+    from google.cloud import storage
     return storage.Client()
 
 def get_bucket():
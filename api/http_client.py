@@ -0,0 +1,85 @@
+import asyncio
+import os
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import httpx
+
+# Seconds to wait for an upstream API before giving up, and for the
+# connection itself. HTTP_TIMEOUT / HTTP_CONNECT_TIMEOUT override them.
+TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "10"))
+CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+
+# Connection pool shared by every upstream integration.
+MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+KEEPALIVE_EXPIRY = 30.0
+
+# Requests in flight to a single host, so one slow upstream cannot take
+# the whole pool.
+MAX_CONNECTIONS_PER_HOST = int(os.environ.get("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+
+class UpstreamClient:
+    """
+    Shared async HTTP client for the upstream APIs.
+
+    Wraps one httpx.AsyncClient, so connections are pooled and kept alive
+    across requests, and caps the requests in flight per host. The client
+    belongs to the event loop it was first used on and is recreated when
+    called from another one (the test client runs each request on its own
+    loop).
+    """
+
+    def __init__(self, timeout: float = TIMEOUT, connect_timeout: float = CONNECT_TIMEOUT,
+                 max_connections: int = MAX_CONNECTIONS, max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+                 max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        )
+        self.max_connections_per_host = max_connections_per_host
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop = None
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout, limits=self.limits, transport=self.transport, follow_redirects=True,
+            )
+            self._loop = loop
+            self._hosts = {}
+        return self._client
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        slot = self._hosts.get(host)
+        if slot is None:
+            slot = self._hosts[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return slot
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        client = self._get_client()
+        async with self._host_slot(url):
+            return await client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        """
+        Close the pooled connections, if any were opened on this loop.
+        """
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+client = UpstreamClient()
@@ -1,14 +1,9 @@
-import json
-import os
+from api import data_files
+
+GAMES_FILE = "junglee_games.json"
 
 def get_junglee_games():
     """
     Reads the list of Junglee games from the JSON file.
     """
-    dir_path = os.path.dirname(os.path.realpath(__file__))
-    file_path = os.path.join(dir_path, '..', 'frontend', 'data', 'junglee_games.json')
-    try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
+    return data_files.registry.load(GAMES_FILE, missing=[])
@@ -0,0 +1,72 @@
+import threading
+from typing import Callable, Dict, Hashable, List, Optional
+
+class KeyedIndex:
+    """
+    A feed of documents keyed by id, kept in feed order overall and per
+    group, with hooks for derived indexes.
+
+    `refresh` diffs a new copy of the feed against the current one by id
+    and calls `_index` / `_unindex` only for the documents that were
+    added, removed or modified, so subclasses patch their sorted indexes
+    and aggregates instead of rebuilding them. The feed-ordered maps
+    themselves are plain dicts and are rebuilt from the feed, which keeps
+    changed documents in their feed position.
+    """
+
+    def __init__(self, group: Callable[[dict], Hashable] = lambda doc: None, key: str = "id"):
+        self._lock = threading.Lock()
+        self._source = None
+        self._group = group
+        self._key = key
+        self._docs: Dict[Hashable, dict] = {}
+        self._groups: Dict[Hashable, Dict[Hashable, dict]] = {}
+        # Number of documents (re-)indexed so far, for diagnostics.
+        self.indexed = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def refresh(self, docs: List[dict]):
+        """
+        Bring the index in line with the current feed. Passing the same
+        list object again is a no-op.
+        """
+        if docs is self._source:
+            return
+        with self._lock:
+            if docs is self._source:
+                return
+            incoming = {doc[self._key]: doc for doc in docs}
+            for doc_id, doc in self._docs.items():
+                if doc_id not in incoming:
+                    self._unindex(doc_id, doc)
+            for doc_id, doc in incoming.items():
+                current = self._docs.get(doc_id)
+                if current == doc:
+                    continue
+                if current is not None:
+                    self._unindex(doc_id, current)
+                self._index(doc_id, doc)
+                self.indexed += 1
+            groups: Dict[Hashable, Dict[Hashable, dict]] = {}
+            for doc_id, doc in incoming.items():
+                groups.setdefault(self._group(doc), {})[doc_id] = doc
+            self._docs, self._groups = incoming, groups
+            self._source = docs
+
+    def _index(self, doc_id: Hashable, doc: dict):
+        """
+        Called for each added or modified document.
+        """
+
+    def _unindex(self, doc_id: Hashable, doc: dict):
+        """
+        Called for each removed document and the old copy of each modified one.
+        """
+
+    def docs(self, group: Optional[Hashable] = None) -> Dict[Hashable, dict]:
+        """
+        The documents of one group, or all of them, in feed order.
+        """
+        return self._docs if group is None else self._groups.get(group, {})
@@ -1,37 +1,51 @@
-import json
-import os
+from api import data_files
+from api.search_index import DEFAULT_SIMILARITY, TrigramIndex
 
-def get_projects(query: str):
+DEFAULT_PROJECTS = [
+    {
+        "title": "Awesome Game Project",
+        "blurb": "A revolutionary new game that will change everything.",
+        "link": "https://www.kickstarter.com/projects/user/awesome-game-project"
+    },
+    {
+        "title": "Indie RPG Adventure",
+        "blurb": "Explore a vast world in this epic role-playing game.",
+        "link": "https://www.kickstarter.com/projects/user/indie-rpg-adventure"
+    }
+]
+
+PROJECTS_FILE = "kickstarter_projects.json"
+
+def _index_titles(projects: list):
+    # The projects are kept with their index, so scores always refer to
+    # the list the index was built from.
+    index = TrigramIndex()
+    index.rebuild((position, project["title"]) for position, project in enumerate(projects))
+    return projects, index
+
+def get_projects(query: str, fuzzy: bool = False, similarity: float = DEFAULT_SIMILARITY):
     """
     Returns a list of mock Kickstarter projects.
     This is a mock implementation because Kickstarter blocks scraping.
+
+    With `fuzzy`, titles are matched by trigram similarity so that
+    misspelled queries still find their project, closest match first.
     """
-    # Load mock data from a JSON file
-    dir_path = os.path.dirname(os.path.realpath(__file__))
-    data_path = os.path.join(dir_path, "..", "data", "kickstarter_projects.json")
-
-    try:
-        with open(data_path, "r") as f:
-            projects = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        # Return a default list if the file doesn't exist or is empty
-        projects = [
-            {
-                "title": "Awesome Game Project",
-                "blurb": "A revolutionary new game that will change everything.",
-                "link": "https://www.kickstarter.com/projects/user/awesome-game-project"
-            },
-            {
-                "title": "Indie RPG Adventure",
-                "blurb": "Explore a vast world in this epic role-playing game.",
-                "link": "https://www.kickstarter.com/projects/user/indie-rpg-adventure"
-            }
-        ]
+    # Load mock data from a JSON file, or return a default list if the
+    # file doesn't exist or is empty
+    projects = data_files.registry.load(PROJECTS_FILE, default=DEFAULT_PROJECTS)
 
     # Filter projects based on the query
     if not query:
         return projects
 
+    if fuzzy:
+        # The title index is built once per version of the data file.
+        projects, index = data_files.registry.derive(PROJECTS_FILE, "title_trigrams", _index_titles,
+                                                     default=DEFAULT_PROJECTS)
+        scores = index.score(query, similarity)
+        return [projects[i] for i in sorted(scores, key=lambda i: (-scores[i], i))]
+
     query = query.lower()
     return [
         project for project in projects
@@ -1,9 +1,13 @@
 import os
 import json
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Security
+import asyncio
+import tempfile
+import httpx
+from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Security, Query, Header, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import APIKeyHeader
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from typing import List, Optional
 from pydantic import BaseModel
 from api.ai_engine import HockeyAI, PadelAI, InvestigativeAI, ShovelMasterAI, AnimalRunningAI, TreePlantingAI, PapayaPeelingAI, MoneyClimbingAI, AnimalFightingAI, CarpenterAI, SwimmingAI
@@ -40,7 +44,16 @@ from api import marketplace
 from api import twitch
 from api import nintendo
 from api import ecommerce
-from api.auth import get_api_key
+from api import catalog
+from api import data_files
+from api import http_client
+from api import response_cache
+from api import single_flight
+from api.file_responses import json_file_response
+from api.auth import get_api_key, get_api_keys
+from api.games_bulk import BULK_CHUNK_SIZE, MAX_BULK_ERRORS, export_lines, iter_lines, read_chunks, validate_chunk
+from api.games_store import NameConflict, VersionMismatch, decode_cursor, encode_cursor, open_games_store
+from api.search_index import DEFAULT_SIMILARITY
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -61,13 +74,25 @@ app.include_router(marketplace.router, prefix="/api/marketplace", tags=["marketp
 app.include_router(twitch.router, prefix="/api/twitch", tags=["twitch"])
 app.include_router(nintendo.router, prefix="/api/nintendo", tags=["nintendo"])
 app.include_router(ecommerce.router, prefix="/api/ecommerce", tags=["ecommerce"])
+app.include_router(catalog.router, prefix="/api/catalog", tags=["catalog"])
 
 @app.on_event("startup")
 async def startup_event():
     """
-    Initialize the Facebook API on application startup.
+    Build the catalog and product indexes on application startup. The
+    Facebook API is initialized on the first server event instead.
     """
-    fb_business.init_facebook_api()
+    catalog.get_catalog_index()
+    ecommerce.get_product_index()
+    steam.catalog.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Stop background refreshes and close the pooled upstream connections.
+    """
+    await steam.catalog.stop()
+    await http_client.client.aclose()
 
 # --- Models ---
 
@@ -133,6 +158,13 @@ class XCodeRequest(BaseModel):
 
 class UNESCOMLRequest(BaseModel):
     dataset_id: str
+    record_id: Optional[str] = None
+
+class UNESCOBatchRequest(BaseModel):
+    dataset_id: str
+    record_ids: Optional[List[str]] = None
+    records: Optional[List[dict]] = None
+    offset: int = 0
 
 class FacebookUser(BaseModel):
     name: str
@@ -141,74 +173,205 @@ class FacebookUser(BaseModel):
 
 # --- Endpoints ---
 
-def get_games():
-    with open("/app/frontend/data/games.json", "r") as f:
-        return json.load(f)
-
-def save_games(games: List[dict]):
-    with open("/app/frontend/data/games.json", "w") as f:
-        json.dump(games, f, indent=4)
-
-@app.get("/api/games/search", response_model=List[Game], dependencies=[Depends(get_api_key)])
-async def search_games(q: str = ""):
-    """
-    Search for games by name or category.
-    """
-    games = get_games()
-
-    if not q:
-        return games
+games_store = open_games_store()
+# Serializes catalog writers; readers never wait on it.
+games_write_lock = asyncio.Lock()
+
+@app.get("/api/games/search", dependencies=[Depends(get_api_key)])
+async def search_games(
+    response: Response,
+    q: str = "",
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    fuzzy: bool = False,
+    similarity: float = Query(DEFAULT_SIMILARITY, ge=0, le=1),
+    category: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    max_rating: Optional[float] = None,
+    min_players: Optional[int] = None,
+):
+    """
+    Search for games by name, category or description, best matches first.
+
+    Results can be sorted by `rating` or `player_count` (prefix with `-` for
+    descending order) and paginated with `limit`; the cursor for the next
+    page is returned in the X-Next-Cursor header. `fields` is a comma
+    separated list of Game fields to return. With `fuzzy=true` game names
+    are matched by trigram similarity, so misspelled titles still match.
+    `category`, `min_rating`, `max_rating` and `min_players` narrow the
+    results down.
+    """
+    selected = list(Game.__fields__)
+    if fields:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = set(selected) - set(Game.__fields__)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
 
-    q = q.lower()
-    results = [
-        game for game in games
-        if q in game["name"].lower() or q in game["category"].lower()
-    ]
-    return results
+    try:
+        total, games, next_position = games_store.page(
+            q, sort=sort, limit=limit, after=after, offset=offset, fuzzy=fuzzy, similarity=similarity,
+            filters={"category": category, "min_rating": min_rating, "max_rating": max_rating, "min_players": min_players},
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers["X-Total-Count"] = str(total)
+    if next_position is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(next_position)
+    return [{field: game.get(field) for field in selected} for game in games]
+
+@app.get("/api/games/facets", dependencies=[Depends(get_api_key)])
+async def get_game_facets(
+    q: str = "",
+    fuzzy: bool = False,
+    similarity: float = Query(DEFAULT_SIMILARITY, ge=0, le=1),
+    category: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    max_rating: Optional[float] = None,
+    min_players: Optional[int] = None,
+):
+    """
+    Count the games matching a search per category, rating bucket and
+    player count bucket. Takes the same query and filters as /api/games/search.
+    """
+    filters = {"category": category, "min_rating": min_rating, "max_rating": max_rating, "min_players": min_players}
+    return games_store.facets(q, filters=filters, fuzzy=fuzzy, similarity=similarity)
+
+@app.post("/api/games/bulk", dependencies=[Depends(get_api_key)])
+async def bulk_import_games(request: Request):
+    """
+    Create or replace games from an NDJSON body, one Game per line.
+
+    Lines are validated in chunks while the body streams in and spooled to
+    a temporary file, so memory use does not grow with the request. Nothing
+    is written unless every line is valid; the import is then applied as
+    one batch.
+    """
+    errors = []
+    error_count = 0
+    with tempfile.TemporaryFile("w+") as spool:
+        def spool_chunk(chunk):
+            nonlocal error_count
+            records, chunk_errors = validate_chunk(Game, chunk)
+            error_count += len(chunk_errors)
+            errors.extend(chunk_errors[:MAX_BULK_ERRORS - len(errors)])
+            spool.writelines(json.dumps(record) + "\n" for record in records)
+
+        chunk = []
+        async for line in iter_lines(request.stream()):
+            chunk.append(line)
+            if len(chunk) == BULK_CHUNK_SIZE:
+                spool_chunk(chunk)
+                chunk = []
+        spool_chunk(chunk)
+        if error_count:
+            raise HTTPException(
+                status_code=400,
+                detail={"message": f"{error_count} invalid records, nothing was imported.", "errors": errors},
+            )
+        async with games_write_lock:
+            created, updated = await run_in_threadpool(games_store.put_many, read_chunks(spool))
+    return {"created": created, "updated": updated}
+
+@app.get("/api/games/export", dependencies=[Depends(get_api_key)])
+async def export_games():
+    """
+    Stream the whole catalog as NDJSON, one game per line.
+    """
+    return StreamingResponse(export_lines(games_store.iter_games()), media_type="application/x-ndjson")
+
+def game_etag(game: dict) -> str:
+    """
+    Strong ETag for a stored game, derived from its version.
+    """
+    return f'"{game["version"]}"'
+
+def etag_matches(header: str, etag: str) -> bool:
+    """
+    Check an If-Match / If-None-Match header value against an ETag.
+    """
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+def parse_if_match(if_match: Optional[str], game_name: str) -> Optional[int]:
+    """
+    Turn an If-Match header into the version a write expects, or raise 412.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    current = games_store.get(game_name)
+    if current is None or not etag_matches(if_match, game_etag(current)):
+        raise HTTPException(status_code=412, detail="Game has been modified.")
+    return current["version"]
+
+@app.get("/api/games/{game_name}", response_model=Game, dependencies=[Depends(get_api_key)])
+async def get_game(game_name: str, response: Response, if_none_match: Optional[str] = Header(None)):
+    """
+    Get a single game by name.
+    """
+    game = games_store.get(game_name)
+    if game is None:
+        raise HTTPException(status_code=404, detail="Game not found.")
+    etag = game_etag(game)
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return game
 
 @app.post("/api/games", status_code=201, dependencies=[Depends(get_api_key)])
-async def create_game(game: Game):
+async def create_game(game: Game, response: Response):
     """
     Add a new game to the platform.
     """
-    games = get_games()
-    if any(g["name"] == game.name for g in games):
-        raise HTTPException(status_code=409, detail="Game with this name already exists.")
-
-    games.append(game.dict())
-    save_games(games)
+    async with games_write_lock:
+        try:
+            stored = games_store.add(game.dict())
+        except NameConflict:
+            raise HTTPException(status_code=409, detail="Game with this name already exists.")
+    response.headers["ETag"] = game_etag(stored)
     return game
 
 @app.put("/api/games/{game_name}", response_model=Game, dependencies=[Depends(get_api_key)])
-async def update_game(game_name: str, updated_game: Game):
-    """
-    Update an existing game.
-    """
-    games = get_games()
-    for i, game in enumerate(games):
-        if game["name"] == game_name:
-            games[i] = updated_game.dict()
-            save_games(games)
-            return updated_game
-    raise HTTPException(status_code=404, detail="Game not found.")
+async def update_game(game_name: str, updated_game: Game, response: Response, if_match: Optional[str] = Header(None)):
+    """
+    Update an existing game. Send the game's ETag in If-Match to avoid
+    overwriting a concurrent update.
+    """
+    async with games_write_lock:
+        expected_version = parse_if_match(if_match, game_name)
+        try:
+            stored = games_store.replace(game_name, updated_game.dict(), expected_version)
+        except VersionMismatch:
+            raise HTTPException(status_code=412, detail="Game has been modified.")
+        except NameConflict:
+            raise HTTPException(status_code=409, detail="Game with this name already exists.")
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Game not found.")
+    response.headers["ETag"] = game_etag(stored)
+    return updated_game
 
 @app.delete("/api/games/{game_name}", status_code=204, dependencies=[Depends(get_api_key)])
-async def delete_game(game_name: str):
-    """
-    Delete a game from the platform.
-    """
-    games = get_games()
-    game_to_delete = None
-    for game in games:
-        if game["name"] == game_name:
-            game_to_delete = game
-            break
-
-    if not game_to_delete:
+async def delete_game(game_name: str, if_match: Optional[str] = Header(None)):
+    """
+    Delete a game from the platform. Send the game's ETag in If-Match to
+    avoid deleting a concurrent update.
+    """
+    async with games_write_lock:
+        expected_version = parse_if_match(if_match, game_name)
+        try:
+            deleted = games_store.remove(game_name, expected_version)
+        except VersionMismatch:
+            raise HTTPException(status_code=412, detail="Game has been modified.")
+    if not deleted:
         raise HTTPException(status_code=404, detail="Game not found.")
-
-    games.remove(game_to_delete)
-    save_games(games)
     return Response(status_code=204)
 
 def mock_llm_call(prompt: str) -> str:
@@ -272,30 +435,111 @@ async def get_unesco_datasets():
     """
     Get a list of all datasets from the UNESCO API.
     """
-    return unesco.get_datasets()
+    return await unesco.get_datasets()
 
 @app.get("/api/unesco/datasets/{dataset_id}/records", dependencies=[Depends(get_api_key)])
-async def get_unesco_records(dataset_id: str):
+async def get_unesco_records(
+    dataset_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    select: Optional[str] = None,
+    where: List[str] = Query([], description="field:value equality filters"),
+):
+    """
+    Get records from a specific dataset from the UNESCO API. Whole datasets
+    are cached locally and only downloaded again when they change.
+    """
+    fields = [field for field in select.split(",") if field] if select else None
+    filters = {}
+    for condition in where:
+        name, sep, value = condition.partition(":")
+        if not sep or not name:
+            raise HTTPException(status_code=400, detail=f"Invalid filter: {condition}")
+        filters[name] = value
+    try:
+        return await unesco.get_records(dataset_id, limit=limit, offset=offset, fields=fields, where=filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Could not fetch dataset {dataset_id}: {e}")
+
+@app.get("/api/unesco/cache/stats", dependencies=[Depends(get_api_key)])
+async def get_unesco_cache_stats():
     """
-    Get records from a specific dataset from the UNESCO API.
+    Datasets held in the local UNESCO record cache and its download counters.
     """
-    return unesco.get_records(dataset_id)
+    return unesco.get_store().stats()
 
 @app.post("/api/unesco/ml/predict", dependencies=[Depends(get_api_key)])
 async def unesco_ml_predict(request: UNESCOMLRequest):
     """
-    Run a mock prediction on a UNESCO dataset.
+    Predict the target of the dataset's model for one record.
+    """
+    try:
+        return await unesco_ml.predict(request.dataset_id, request.record_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Could not fetch dataset {request.dataset_id}: {e}")
+
+@app.post("/api/unesco/ml/predict_batch", dependencies=[Depends(get_api_key)])
+async def unesco_ml_predict_batch(request: UNESCOBatchRequest):
+    """
+    Predict the target of the dataset's model for many records at once:
+    the `records` given, the cached records in `record_ids`, or the whole
+    dataset a page at a time from `offset`. The response reports how long
+    each stage took.
+    """
+    try:
+        return await unesco_ml.predict_batch(request.dataset_id, request.record_ids, request.records,
+                                             request.offset)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Could not fetch dataset {request.dataset_id}: {e}")
+
+@app.get("/api/unesco/ml/stats", dependencies=[Depends(get_api_key)])
+async def get_unesco_ml_stats():
+    """
+    Feature matrix cache counters.
+    """
+    return unesco_ml.get_features().features.stats()
+
+# --- Data File Endpoints ---
+
+@app.get("/api/data-files/stats", dependencies=[Depends(get_api_key)])
+async def get_data_file_stats():
+    """
+    Hit and miss counters of the shared data file cache.
     """
-    return unesco_ml.predict(request.dataset_id)
+    return data_files.registry.stats()
+
+@app.get("/api/upstream-cache/stats", dependencies=[Depends(get_api_key)])
+async def get_upstream_cache_stats():
+    """
+    Hit, miss and refresh counters of the upstream response cache.
+    """
+    return response_cache.cache.stats()
+
+@app.get("/api/single-flight/stats", dependencies=[Depends(get_api_key)])
+async def get_single_flight_stats():
+    """
+    Upstream calls issued and calls coalesced into one already in flight.
+    """
+    return single_flight.group.stats()
 
 # --- Palm Store Endpoints ---
 
 @app.get("/api/palm/games", dependencies=[Depends(get_api_key)])
-async def get_palm_store_games():
+async def get_palm_store_games(request: Request):
     """
     Get a list of all games from the Palm Store.
     """
-    return palm_store.get_all_games()
+    return json_file_response(request, palm_store.GAMES_FILE)
 
 @app.get("/api/palm/games/{game_id}", dependencies=[Depends(get_api_key)])
 async def get_palm_store_game(game_id: int):
@@ -310,47 +554,72 @@ async def get_palm_store_game(game_id: int):
 # --- Tencent Games Endpoints ---
 
 @app.get("/api/tencent/games", dependencies=[Depends(get_api_key)])
-async def get_tencent_games():
+async def get_tencent_games(request: Request):
     """
     Get a list of all games from Tencent Games.
     """
-    return tencent_games.get_all_games()
+    return json_file_response(request, tencent_games.GAMES_FILE)
 
 # --- GeForce Now Endpoints ---
 
 @app.get("/api/geforce-now/games", dependencies=[Depends(get_api_key)])
-async def get_geforce_now_games():
+async def get_geforce_now_games(request: Request):
     """
     Get a list of all games available on GeForce Now.
     """
-    return geforce_now.get_all_games()
+    return json_file_response(request, geforce_now.GAMES_FILE)
 
 # --- Steam Endpoints ---
 
 @app.get("/api/steam/games", dependencies=[Depends(get_api_key)])
-async def get_steam_games():
+async def get_steam_games(
+    response: Response,
+    q: str = "",
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+):
     """
-    Get a list of all games from Steam.
+    List Steam apps from the local catalog, by app id or, with `q`, by how
+    well their name matches. The cursor for the next page is returned in
+    the X-Next-Cursor header and the number of matches in X-Total-Count.
     """
-    return steam.get_all_games()
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if after is not None and not (isinstance(after, int) or (isinstance(after, list) and len(after) == 1 and isinstance(after[0], int))):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    await steam.catalog.ensure_loaded()
+    total, apps, next_position = steam.catalog.page(q, limit=limit, after=after)
+    response.headers["X-Total-Count"] = str(total)
+    if next_position is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(next_position)
+    return apps
+
+@app.get("/api/steam/catalog/stats", dependencies=[Depends(get_api_key)])
+async def get_steam_catalog_stats():
+    """
+    Size, age and last refresh diff of the local Steam catalog.
+    """
+    return steam.catalog.stats()
 
 # --- PlayStation Endpoints ---
 
 @app.get("/api/playstation/games", dependencies=[Depends(get_api_key)])
-async def get_playstation_games():
+async def get_playstation_games(request: Request):
     """
     Get a list of all games from the PlayStation Store.
     """
-    return playstation.get_all_games()
+    return json_file_response(request, playstation.GAMES_FILE)
 
 # --- Amazon Luna Endpoints ---
 
 @app.get("/api/amazon-luna/games", dependencies=[Depends(get_api_key)])
-async def get_amazon_luna_games():
+async def get_amazon_luna_games(request: Request):
     """
     Get a list of all games from the Amazon Luna store.
     """
-    return amazon_luna.get_all_games()
+    return json_file_response(request, amazon_luna.GAMES_FILE)
 
 # --- Ubisoft Endpoints ---
 
@@ -365,11 +634,11 @@ async def get_ubisoft_games():
 # --- Red Bull Endpoints ---
 
 @app.get("/api/redbull/games", dependencies=[Depends(get_api_key)])
-async def get_redbull_games():
+async def get_redbull_games(request: Request):
     """
     Get a list of all games from Red Bull.
     """
-    return redbull.get_all_games()
+    return json_file_response(request, redbull.GAMES_FILE)
 
 # --- Netflix Games Endpoints ---
 
@@ -378,26 +647,26 @@ async def get_netflix_games():
     """
     Get a list of all games from Netflix.
     """
-    return netflix_games.get_netflix_games()
+    return await netflix_games.get_netflix_games()
 
 
 # --- Junglee Games Endpoints ---
 
 @app.get("/api/junglee/games", dependencies=[Depends(get_api_key)])
-async def get_junglee_games():
+async def get_junglee_games(request: Request):
     """
     Get a list of all games from Junglee Games.
     """
-    return junglee_games.get_junglee_games()
+    return json_file_response(request, junglee_games.GAMES_FILE, missing=[])
 
 # --- Rival Endpoints ---
 
 @app.get("/api/rival/games", dependencies=[Depends(get_api_key)])
-async def get_rival_games():
+async def get_rival_games(request: Request):
     """
     Get a list of all games from Rival.
     """
-    return rival.get_all_games()
+    return json_file_response(request, rival.GAMES_FILE)
 
 # --- MMO Games Endpoints ---
 
@@ -406,7 +675,7 @@ async def get_mmo_games():
     """
     Get a list of all MMO games.
     """
-    return mmo_games.get_all_games()
+    return await mmo_games.get_all_games()
 
 # --- Minecraft Endpoints ---
 
@@ -420,35 +689,69 @@ async def get_minecraft_games():
 # --- WHO Endpoints ---
 
 @app.get("/api/who_data", dependencies=[Depends(get_api_key)])
-async def get_who_data():
+async def get_who_data(
+    filter: Optional[str] = Query(None, alias="$filter"),
+    select: Optional[str] = Query(None, alias="$select"),
+    top: Optional[int] = Query(None, alias="$top", ge=1),
+):
+    """
+    Get a list of indicators from the WHO GHO OData API. The OData $filter,
+    $select and $top options are passed on to the upstream.
+    """
+    try:
+        return await who_api.get_indicators(filter, select, top)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/who_data/indicators/search", dependencies=[Depends(get_api_key)])
+async def search_who_indicators(
+    prefix: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
     """
-    Get a list of all indicators from the WHO GHO OData API.
+    Find indicators whose code or name words start with `prefix`.
     """
-    return who_api.get_indicators()
+    try:
+        index = await who_api.get_indicator_index()
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Could not fetch WHO indicators: {e}")
+    return index.search(prefix, limit, offset)
+
+@app.get("/api/who_data/indicators/{code}", dependencies=[Depends(get_api_key)])
+async def get_who_indicator(code: str):
+    """
+    Look up one indicator by its code.
+    """
+    try:
+        index = await who_api.get_indicator_index()
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Could not fetch WHO indicators: {e}")
+    indicator = index.get(code)
+    if indicator is None:
+        raise HTTPException(status_code=404, detail=f"Unknown indicator: {code}")
+    return indicator
 
 @app.get("/api/web3_games")
-async def get_web3_games():
+async def get_web3_games(request: Request):
     """
     Get a list of all web3 games.
     """
-    with open("/app/frontend/data/web3_games.json", "r") as f:
-        return json.load(f)
+    return json_file_response(request, "web3_games.json")
 
 @app.get("/api/coupons")
-async def get_coupons():
+async def get_coupons(request: Request):
     """
     Get a list of all coupons.
     """
-    with open("/app/frontend/data/coupons.json", "r") as f:
-        return json.load(f)
+    return json_file_response(request, "coupons.json")
 
 @app.get("/api/pronostics")
-async def get_pronostics():
+async def get_pronostics(request: Request):
     """
     Get a list of all pronostics.
     """
-    with open("/app/frontend/data/pronostics.json", "r") as f:
-        return json.load(f)
+    return json_file_response(request, "pronostics.json")
 
 # --- Facebook Integration Endpoints ---
 
@@ -808,25 +1111,76 @@ async def delete_model(model_name: str):
 @app.get("/api/wescore/scores", dependencies=[Depends(get_api_key)])
 async def get_wescore_scores():
     """
-    Get live scores from the WeScore API.
+    Get live scores from the WeScore API. Scores are shared by every caller
+    and only fetched again once the poll interval has passed.
+    """
+    return await wescore.live_scores.current()
+
+@app.get("/api/wescore/scores/stream", dependencies=[Depends(get_api_key)])
+async def stream_wescore_scores():
+    """
+    Stream live score changes as Server-Sent Events: a `snapshot` event
+    with every match, then `update` events with changed and removed matches.
+    """
+    return StreamingResponse(
+        wescore.sse_events(wescore.live_scores),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.websocket("/api/wescore/scores/ws")
+async def wescore_scores_websocket(websocket: WebSocket):
+    """
+    Push live score changes over a WebSocket, as the same snapshot and
+    update messages as the event stream. The API key is read from the
+    X-API-Key header or the api_key query parameter.
+    """
+    api_key = websocket.headers.get("X-API-Key") or websocket.query_params.get("api_key")
+    if api_key not in get_api_keys().values():
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    async with wescore.live_scores.subscription() as queue:
+        async def push():
+            while True:
+                await websocket.send_json(await queue.get())
+
+        # Clients send nothing; reading only notices when they disconnect.
+        sender = asyncio.create_task(push())
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            sender.cancel()
+
+@app.get("/api/wescore/scores/stats", dependencies=[Depends(get_api_key)])
+async def get_wescore_poller_stats():
+    """
+    Subscribers, poll interval and poll counters of the live score poller.
     """
-    return wescore.get_live_scores()
+    return wescore.live_scores.stats()
 
 @app.get("/api/wescore/fixtures", dependencies=[Depends(get_api_key)])
 async def get_wescore_fixtures():
     """
     Get all fixtures from the WeScore API.
     """
-    return wescore.get_all_fixtures()
+    return await wescore.get_all_fixtures()
 
 # --- Kickstarter Endpoints ---
 
 @app.get("/api/kickstarter/projects", dependencies=[Depends(get_api_key)])
-async def get_kickstarter_projects(q: str = ""):
+async def get_kickstarter_projects(
+    q: str = "",
+    fuzzy: bool = False,
+    similarity: float = Query(DEFAULT_SIMILARITY, ge=0, le=1),
+):
     """
     Get a list of all projects from Kickstarter.
     """
-    return kickstarter.get_projects(q)
+    return kickstarter.get_projects(q, fuzzy=fuzzy, similarity=similarity)
 
 # --- Patreon Endpoints ---
 
@@ -844,6 +1198,16 @@ async def get_patreon_patrons(campaign_id: str):
     """
     return patreon.get_patrons(campaign_id)
 
+@app.get("/api/patreon/campaigns/{campaign_id}/stats", dependencies=[Depends(get_api_key)])
+async def get_patreon_campaign_stats(campaign_id: str):
+    """
+    Get the patron count and pledge amount aggregates of a campaign.
+    """
+    stats = patreon.get_campaign_stats(campaign_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return stats
+
 # --- TikTok Endpoints ---
 
 class TikTokTokenRequest(BaseModel):
@@ -855,7 +1219,7 @@ async def get_tiktok_token(request: TikTokTokenRequest):
     Exchange an authorization code for a TikTok access token.
     """
     try:
-        return tiktok.get_access_token(request.code)
+        return await tiktok.get_access_token(request.code)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -865,7 +1229,7 @@ async def get_tiktok_user(access_token: str):
     Get user information from the TikTok API.
     """
     try:
-        return tiktok.get_user_info(access_token)
+        return await tiktok.get_user_info(access_token)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -875,7 +1239,7 @@ async def get_tiktok_videos(access_token: str, max_count: int = 20):
     Get a list of videos from the TikTok API.
     """
     try:
-        return tiktok.get_video_list(access_token, max_count)
+        return await tiktok.get_video_list(access_token, max_count)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -886,7 +1250,7 @@ async def get_fifa_world_cup_data():
     """
     Get World Cup qualification data from the FIFA API.
     """
-    data = fifa.get_world_cup_data()
+    data = await fifa.get_world_cup_data()
     if data is None:
         raise HTTPException(status_code=500, detail="Could not fetch data from FIFA API.")
     return data
@@ -898,7 +1262,7 @@ async def get_makeup_products(brand: str = None, product_type: str = None):
     """
     Get a list of makeup products, optionally filtered by brand or product type.
     """
-    return makeup.get_products(brand=brand, product_type=product_type)
+    return await makeup.get_products(brand=brand, product_type=product_type)
 
 # --- Unicorn Endpoints ---
 
@@ -910,4 +1274,4 @@ async def translate_for_unicorn(request: UnicornRequest):
     """
     Translate text into a unicorn-friendly dialect.
     """
-    return unicorn.translate_text(request.text)
+    return await unicorn.translate_text(request.text)
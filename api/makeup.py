@@ -1,9 +1,12 @@
 # Makeup API integration
-import requests
+from api import response_cache
 
 BASE_URL = "http://makeup-api.herokuapp.com/api/v1/products.json"
 
-def get_products(brand: str = None, product_type: str = None):
+# Seconds a product listing is served from memory before it is refreshed.
+CACHE_TTL = 6 * 60 * 60
+
+async def get_products(brand: str = None, product_type: str = None):
     """
     Get makeup products from the Makeup API.
     """
@@ -13,6 +16,4 @@ def get_products(brand: str = None, product_type: str = None):
     if product_type:
         params["product_type"] = product_type
 
-    response = requests.get(BASE_URL, params=params)
-    response.raise_for_status()
-    return response.json()
+    return await response_cache.cache.get_json(BASE_URL, params=params, ttl=CACHE_TTL)
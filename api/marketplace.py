@@ -1,15 +1,29 @@
 import os
-import json
+import threading
 from fastapi import APIRouter, HTTPException, Depends, Security
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
+from api import data_files
 from api.auth import get_api_key
+from api.games_journal import MutationJournal, install_snapshot, read_records, write_snapshot
 
 router = APIRouter()
 
 # Path to the data file
 DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "frontend", "data", "marketplace_items.json")
 
+# Fold the journal into the snapshot once it holds this many records.
+COMPACTION_THRESHOLD = 1000
+
+# Shared default for a missing snapshot, so it compares identical across loads.
+_NO_ITEMS = ()
+
+def _apply_record(by_id: Dict[int, dict], record: dict):
+    if record["op"] == "put":
+        by_id[record["item"]["id"]] = record["item"]
+    elif record["op"] == "delete":
+        by_id.pop(record["id"], None)
+
 class MarketplaceItem(BaseModel):
     id: Optional[int] = None
     name: str
@@ -18,22 +32,141 @@ class MarketplaceItem(BaseModel):
     description: str
     image: str
 
+class MarketplaceStore:
+    """
+    Marketplace items indexed by id, stored as a JSON snapshot plus an
+    append-only journal.
+
+    The snapshot is read through a DataFileRegistry, so it is parsed once
+    and only re-read when it changes on disk. Adds and deletes append one
+    journal record instead of rewriting the file, and are applied in
+    memory only once the record is written, so a failed write leaves
+    memory and disk in agreement. Once the journal holds
+    `compaction_threshold` records it is folded into a new snapshot.
+
+    New ids come from a monotonic counter kept with the index, so ids of
+    deleted items are never handed out again in this process.
+    """
+
+    def __init__(self, path: str = DATA_FILE, revalidate_interval: float = data_files.REVALIDATE_INTERVAL,
+                 compaction_threshold: int = COMPACTION_THRESHOLD):
+        self.path = path
+        self.compaction_threshold = compaction_threshold
+        self._filename = os.path.basename(path)
+        self._files = data_files.DataFileRegistry([os.path.dirname(os.path.abspath(path))], revalidate_interval)
+        self._journal = MutationJournal(path)
+        self._lock = threading.RLock()
+        self._by_id: Dict[int, dict] = {}
+        self._without_id: List[dict] = []
+        self._items: Optional[List[dict]] = None
+        self._next_id = 1
+        self._snapshot = None
+        self._journal_signature = None
+
+    def _journal_stat(self):
+        signature = []
+        for path in (self._journal.compacting_path, self._journal.path):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                signature.append(None)
+            else:
+                signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def refresh(self):
+        snapshot = self._files.load(self._filename, default=_NO_ITEMS)
+        signature = self._journal_stat()
+        if snapshot is self._snapshot and signature == self._journal_signature:
+            return
+        with self._lock:
+            if snapshot is self._snapshot and signature == self._journal_signature:
+                return
+            by_id = {item["id"]: item for item in snapshot if item.get("id") is not None}
+            for path in (self._journal.compacting_path, self._journal.path):
+                for record in read_records(path):
+                    _apply_record(by_id, record)
+            self._by_id = by_id
+            self._without_id = [item for item in snapshot if item.get("id") is None]
+            self._items = None
+            self._next_id = max(self._by_id, default=0) + 1
+            self._snapshot, self._journal_signature = snapshot, signature
+
+    def all(self) -> List[dict]:
+        self.refresh()
+        items = self._items
+        if items is None:
+            items = self._items = self._without_id + list(self._by_id.values())
+        return items
+
+    def get(self, item_id: int) -> Optional[dict]:
+        self.refresh()
+        return self._by_id.get(item_id)
+
+    def allocate_id(self) -> int:
+        with self._lock:
+            self.refresh()
+            item_id = self._next_id
+            self._next_id += 1
+            return item_id
+
+    def add(self, item: dict) -> bool:
+        """
+        Store a new item. Returns False if its id is already taken and
+        raises OSError, changing nothing, if it cannot be written.
+        """
+        with self._lock:
+            self.refresh()
+            if item["id"] in self._by_id:
+                return False
+            self._write({"op": "put", "item": item})
+            self._by_id[item["id"]] = item
+            self._items = None
+            self._next_id = max(self._next_id, item["id"] + 1)
+            self._compact_if_due()
+            return True
+
+    def remove(self, item_id: int) -> bool:
+        """
+        Delete an item. Returns False if there is none and raises OSError,
+        changing nothing, if the delete cannot be written.
+        """
+        with self._lock:
+            self.refresh()
+            if item_id not in self._by_id:
+                return False
+            self._write({"op": "delete", "id": item_id})
+            del self._by_id[item_id]
+            self._items = None
+            self._compact_if_due()
+            return True
+
+    def _write(self, record: dict):
+        self._journal.append(record)
+        # The in-memory items already include this record; remember the new
+        # journal stat so refresh() does not replay it.
+        self._journal_signature = self._journal_stat()
+
+    def _compact_if_due(self):
+        if self._journal.records < self.compaction_threshold:
+            return
+        rotated = self._journal.rotate()
+        if rotated is None:
+            return
+        try:
+            install_snapshot(write_snapshot(self.path, self._without_id + list(self._by_id.values())), self.path)
+            os.remove(rotated)
+        except OSError as e:
+            # The rotated journal is kept and replayed on the next load.
+            print(f"Error compacting marketplace items: {e}")
+        self._files.invalidate(self._filename)
+        self._snapshot = self._files.load(self._filename, default=_NO_ITEMS)
+        self._journal_signature = self._journal_stat()
+
+store = MarketplaceStore()
+
 def load_items() -> List[dict]:
-    try:
-        if os.path.exists(DATA_FILE):
-            with open(DATA_FILE, "r") as f:
-                return json.load(f)
-        return []
-    except Exception as e:
-        print(f"Error loading items: {e}")
-        return []
-
-def save_items(items: List[dict]):
-    try:
-        with open(DATA_FILE, "w") as f:
-            json.dump(items, f, indent=4)
-    except Exception as e:
-        print(f"Error saving items: {e}")
+    return store.all()
 
 @router.get("/", response_model=List[MarketplaceItem])
 async def list_marketplace_items():
@@ -47,26 +180,25 @@ async def get_marketplace_item(item_id: int):
     """
     Get details of a specific marketplace item.
     """
-    items = load_items()
-    for item in items:
-        if item.get("id") == item_id:
-            return item
-    raise HTTPException(status_code=404, detail="Item not found")
+    item = store.get(item_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return item
 
 @router.post("/", response_model=MarketplaceItem, dependencies=[Depends(get_api_key)])
 async def create_marketplace_item(item: MarketplaceItem):
     """
     Add a new item to the marketplace.
     """
-    items = load_items()
     if not item.id:
-        item.id = max([i.get("id", 0) for i in items]) + 1 if items else 1
+        item.id = store.allocate_id()
 
-    if any(i.get("id") == item.id for i in items):
+    try:
+        added = store.add(item.dict())
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"Could not save the item: {e}")
+    if not added:
         raise HTTPException(status_code=409, detail="Item with this ID already exists")
-
-    items.append(item.dict())
-    save_items(items)
     return item
 
 @router.delete("/{item_id}", status_code=204, dependencies=[Depends(get_api_key)])
@@ -74,12 +206,12 @@ async def delete_marketplace_item(item_id: int):
     """
     Remove an item from the marketplace.
     """
-    items = load_items()
-    new_items = [i for i in items if i.get("id") != item_id]
-    if len(new_items) == len(items):
+    try:
+        removed = store.remove(item_id)
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"Could not delete the item: {e}")
+    if not removed:
         raise HTTPException(status_code=404, detail="Item not found")
-
-    save_items(new_items)
     return {"status": "success"}
 
 @router.get("/offers/dynamic", response_model=List[MarketplaceItem])
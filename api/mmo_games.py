@@ -1,14 +1,17 @@
-import requests
+import httpx
+from api import response_cache
 
-def get_all_games():
+MMO_GAMES_URL = "https://www.mmobomb.com/api1/games"
+
+# Seconds the game list is served from memory before it is refreshed.
+CACHE_TTL = 60 * 60
+
+async def get_all_games():
     """
     Get a list of all MMO games from the MMOBomb API.
     """
-    url = "https://www.mmobomb.com/api1/games"
     try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an exception for bad status codes
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return await response_cache.cache.get_json(MMO_GAMES_URL, ttl=CACHE_TTL)
+    except httpx.HTTPError as e:
         print(f"Error fetching MMO games: {e}")
         return []
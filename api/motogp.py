@@ -1,4 +1,6 @@
-import json
+from api import data_files
+
+GAMES_FILE = "motogp_games.json"
 
 def get_all_games():
     """
@@ -7,5 +9,4 @@ def get_all_games():
     For now, this returns mock data. In the future, this could be updated
     to fetch data from the Sportradar API.
     """
-    with open("/app/frontend/data/motogp_games.json", "r") as f:
-        return json.load(f)
+    return data_files.registry.load(GAMES_FILE)
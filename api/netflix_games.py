@@ -1,20 +1,23 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import httpx
 import json
 import os
+from api import http_client
 
-def get_netflix_games():
+async def get_netflix_games():
     """
     Scrapes the IPVanish website to get a list of Netflix games and their descriptions.
     """
     URL = "https://www.ipvanish.com/blog/best-games-on-netflix/"
     try:
-        response = requests.get(URL)
+        response = await http_client.client.get(URL)
         response.raise_for_status()  # Raise an exception for bad status codes
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Error fetching the URL: {e}")
         return []
 
+    # Imported here so that BeautifulSoup is only loaded when a page is parsed.
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(response.content, 'html.parser')
     games = []
 
@@ -37,7 +40,7 @@ def save_games_to_json():
     """
     Saves the scraped games to a JSON file.
     """
-    games = get_netflix_games()
+    games = asyncio.run(get_netflix_games())
     if games:
         # Build the path relative to the current file
         dir_path = os.path.dirname(os.path.realpath(__file__))
@@ -1,16 +1,15 @@
-import json
-import os
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from api import data_files
 from api.auth import get_api_key
+from api.file_responses import json_file_response
 
 router = APIRouter()
 
-DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "frontend", "data")
+GAMES_FILE = "nintendo_games.json"
+
+def get_all_games():
+    return data_files.registry.load(GAMES_FILE, default=[])
 
 @router.get("/games")
-async def get_nintendo_games(api_key: str = Depends(get_api_key)):
-    path = os.path.join(DATA_PATH, "nintendo_games.json")
-    if not os.path.exists(path):
-        return []
-    with open(path, "r") as f:
-        return json.load(f)
+async def get_nintendo_games(request: Request, api_key: str = Depends(get_api_key)):
+    return json_file_response(request, GAMES_FILE, default=[])
@@ -1,24 +1,21 @@
-import json
-import os
 from typing import List, Dict, Any
+from api import data_files
 
-# Build the path relative to the current file
-dir_path = os.path.dirname(os.path.realpath(__file__))
-games_path = os.path.join(dir_path, "..", "frontend", "data", "palm_store_games.json")
+GAMES_FILE = "palm_store_games.json"
 
 def get_all_games() -> List[Dict[str, Any]]:
     """
     Retrieve all games from the Palm Store.
     """
-    with open(games_path, "r") as f:
-        return json.load(f)
+    return data_files.registry.load(GAMES_FILE)
+
+def _index_by_id(games: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    return {game["id"]: game for game in games}
 
 def get_game_by_id(game_id: int) -> Dict[str, Any]:
     """
     Retrieve a single game from the Palm Store by its ID.
+
+    The id index is built once per version of the data file.
     """
-    games = get_all_games()
-    for game in games:
-        if game["id"] == game_id:
-            return game
-    return None
+    return data_files.registry.derive(GAMES_FILE, "by_id", _index_by_id).get(game_id)
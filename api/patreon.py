@@ -1,5 +1,14 @@
-import json
-import os
+import bisect
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional
+from api import data_files
+from api.keyed_index import KeyedIndex
+
+PATRONS_FILE = "patreon_patrons.json"
+
+# Percentiles of the pledge amounts reported in campaign stats.
+PERCENTILES = (50, 90, 99)
 
 def get_campaigns():
     """
@@ -23,8 +32,21 @@ def get_patrons(campaign_id: str):
     Returns a list of mock patrons for a given campaign.
     This is a mock implementation.
     """
-    # In a real implementation, you would filter patrons by campaign_id
-    return _get_mock_data("patreon_patrons.json", [
+    patron_index.refresh(_get_patron_data())
+    return patron_index.patrons(campaign_id)
+
+def get_campaign_stats(campaign_id: str) -> Optional[dict]:
+    """
+    Returns the pledge aggregates of a campaign, or None if it is unknown.
+    """
+    patron_index.refresh(_get_patron_data())
+    stats = patron_index.stats(campaign_id)
+    if stats["patron_count"] == 0 and not any(c.get("id") == campaign_id for c in get_campaigns()):
+        return None
+    return stats
+
+def _get_patron_data():
+    return _get_mock_data(PATRONS_FILE, [
         {
             "id": "101",
             "type": "pledge",
@@ -32,6 +54,12 @@ def get_patrons(campaign_id: str):
                 "amount_cents": 500
             },
             "relationships": {
+                "campaign": {
+                    "data": {
+                        "id": "1",
+                        "type": "campaign"
+                    }
+                },
                 "patron": {
                     "data": {
                         "id": "201",
@@ -42,13 +70,92 @@ def get_patrons(campaign_id: str):
         }
     ])
 
+def pledge_campaign(pledge: dict) -> Optional[str]:
+    """
+    The id of the campaign a pledge belongs to, from its JSON:API relationships.
+    """
+    campaign = ((pledge.get("relationships") or {}).get("campaign") or {}).get("data") or {}
+    return campaign.get("id")
+
+def pledge_amount(pledge: dict) -> int:
+    return (pledge.get("attributes") or {}).get("amount_cents") or 0
+
+class PledgeStats:
+    """
+    Running aggregates of one campaign's pledge amounts.
+
+    Amounts are kept sorted, so adding or removing a pledge is a bisect
+    and percentiles are read by position without rescanning the pledges.
+    """
+
+    def __init__(self):
+        self.amounts: List[int] = []
+        self.total = 0
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def add(self, amount: int):
+        bisect.insort(self.amounts, amount)
+        self.total += amount
+
+    def remove(self, amount: int):
+        i = bisect.bisect_left(self.amounts, amount)
+        if i < len(self.amounts) and self.amounts[i] == amount:
+            del self.amounts[i]
+            self.total -= amount
+
+    def percentile(self, p: float) -> Optional[int]:
+        """
+        Nearest-rank percentile of the amounts, None when there are none.
+        """
+        if not self.amounts:
+            return None
+        rank = max(1, math.ceil(p / 100 * len(self.amounts)))
+        return self.amounts[rank - 1]
+
+    def as_dict(self) -> dict:
+        return {
+            "patron_count": len(self.amounts),
+            "amount_cents": {
+                "total": self.total,
+                "min": self.amounts[0] if self.amounts else None,
+                "max": self.amounts[-1] if self.amounts else None,
+                **{f"p{p}": self.percentile(p) for p in PERCENTILES},
+            },
+        }
+
+class PatronIndex(KeyedIndex):
+    """
+    Pledges grouped by campaign, with per-campaign pledge aggregates.
+
+    When the pledge feed changes only the pledges that were added, removed
+    or modified are re-indexed, and the aggregates of their campaigns are
+    adjusted rather than recomputed.
+    """
+
+    def __init__(self):
+        super().__init__(group=pledge_campaign)
+        self._stats: Dict[str, PledgeStats] = defaultdict(PledgeStats)
+
+    def _index(self, pledge_id: str, pledge: dict):
+        self._stats[pledge_campaign(pledge)].add(pledge_amount(pledge))
+
+    def _unindex(self, pledge_id: str, pledge: dict):
+        campaign_id = pledge_campaign(pledge)
+        self._stats[campaign_id].remove(pledge_amount(pledge))
+        if not len(self._stats[campaign_id]):
+            del self._stats[campaign_id]
+
+    def patrons(self, campaign_id: str) -> List[dict]:
+        return list(self.docs(campaign_id).values())
+
+    def stats(self, campaign_id: str) -> dict:
+        stats = self._stats.get(campaign_id) or PledgeStats()
+        return {"campaign_id": campaign_id, **stats.as_dict()}
+
+patron_index = PatronIndex()
+
 def _get_mock_data(filename: str, default_data: list):
     """Helper to load mock data from a JSON file."""
-    dir_path = os.path.dirname(os.path.realpath(__file__))
-    data_path = os.path.join(dir_path, "..", "data", filename)
-
-    try:
-        with open(data_path, "r") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return default_data
+    return data_files.registry.load(filename, default=default_data)
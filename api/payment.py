@@ -1,17 +1,23 @@
-import stripe
 import os
 from fastapi import APIRouter, Request
 from pydantic import BaseModel
 
-# Set your secret key. Remember to switch to your live secret key in production.
-# See your keys here: https://dashboard.stripe.com/apikeys
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
-
 router = APIRouter()
 
+def get_stripe():
+    """
+    Import the Stripe SDK on first use, so it does not slow down startup.
+    """
+    import stripe
+    # Set your secret key. Remember to switch to your live secret key in production.
+    # See your keys here: https://dashboard.stripe.com/apikeys
+    if not stripe.api_key:
+        stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+    return stripe
+
 @router.on_event("startup")
 async def startup_event():
-    if not stripe.api_key:
+    if not os.getenv("STRIPE_SECRET_KEY"):
         raise Exception("STRIPE_SECRET_KEY environment variable not set")
 
 class Product(BaseModel):
@@ -25,7 +31,7 @@ class Sponsorship(BaseModel):
 @router.post("/create-checkout-session")
 async def create_checkout_session(product: Product):
     try:
-        session = stripe.checkout.Session.create(
+        session = get_stripe().checkout.Session.create(
             line_items=[{
                 'price_data': {
                     'currency': 'usd',
@@ -50,7 +56,7 @@ async def create_checkout_session(product: Product):
 @router.post("/create-sponsorship-checkout-session")
 async def create_sponsorship_checkout_session(sponsorship: Sponsorship):
     try:
-        session = stripe.checkout.Session.create(
+        session = get_stripe().checkout.Session.create(
             line_items=[{
                 'price_data': {
                     'currency': 'ngn',
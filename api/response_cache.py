@@ -0,0 +1,164 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from api import http_client
+from api.single_flight import SingleFlight
+
+# Upper bound on the response bodies held in memory, in bytes.
+# RESPONSE_CACHE_MAX_BYTES overrides it.
+MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(64 * 2 ** 20)))
+
+# Seconds a response is served fresh when the caller does not say otherwise.
+DEFAULT_TTL = 300.0
+
+class _CacheEntry:
+    __slots__ = ("value", "size", "fetched_at", "ttl", "stale_ttl", "refresh")
+
+    def __init__(self, value, size, fetched_at, ttl, stale_ttl):
+        self.value = value
+        self.size = size
+        self.fetched_at = fetched_at
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.refresh: Optional[asyncio.Task] = None
+
+def cache_key(url: str, params: Optional[dict] = None) -> Tuple:
+    return (url, tuple(sorted((params or {}).items())))
+
+class ResponseCache:
+    """
+    In-memory cache of upstream responses with stale-while-revalidate.
+
+    A response younger than its `ttl` is served as is. Up to `stale_ttl`
+    seconds past that it is still served, while a background task fetches
+    a new copy; older responses are fetched on the request path. Entries
+    are evicted least recently used first once their sizes add up to more
+    than `max_bytes`. Concurrent misses for one key share a single fetch.
+    Failed fetches are never cached, and a failed background refresh
+    leaves the stale copy in place.
+
+    Every caller of a URL gets the same parsed body until it is refetched,
+    which is how derived indexes such as who_api's tell it changed.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple, _CacheEntry]" = OrderedDict()
+        self._size = 0
+        self._tasks = set()
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def get_or_fetch(self, key: Tuple, fetch: Callable[[], Awaitable[Tuple[Any, int]]],
+                           ttl: float = DEFAULT_TTL, stale_ttl: Optional[float] = None) -> Any:
+        """
+        Return the cached value for `key`, calling `fetch()` for a new
+        `(value, size)` pair when there is none or it is too old.
+        `stale_ttl` defaults to `ttl`.
+        """
+        stale_ttl = ttl if stale_ttl is None else stale_ttl
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = self._clock() - entry.fetched_at
+            if age < entry.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+            if age < entry.ttl + entry.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._refresh_in_background(key, entry, fetch, ttl, stale_ttl)
+                return entry.value
+        self.misses += 1
+
+        async def fetch_and_store():
+            value, size = await fetch()
+            self._store(key, value, size, ttl, stale_ttl)
+            return value
+        return await self._flights.do(key, fetch_and_store)
+
+    def _refresh_in_background(self, key, entry: _CacheEntry, fetch, ttl: float, stale_ttl: float):
+        loop = asyncio.get_running_loop()
+        running = entry.refresh
+        if running is not None and not running.done() and running.get_loop() is loop:
+            return
+
+        async def refresh():
+            try:
+                value, size = await fetch()
+            except Exception as e:
+                self.refresh_errors += 1
+                print(f"Background refresh of {key[0]} failed: {e}")
+                return
+            self.refreshes += 1
+            self._store(key, value, size, ttl, stale_ttl)
+
+        task = entry.refresh = loop.create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _store(self, key, value, size: int, ttl: float, stale_ttl: float):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= old.size
+        if size > self.max_bytes:
+            return
+        self._entries[key] = _CacheEntry(value, size, self._clock(), ttl, stale_ttl)
+        self._size += size
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+            self.evictions += 1
+
+    async def get_json(self, url: str, params: Optional[dict] = None, ttl: float = DEFAULT_TTL,
+                       stale_ttl: Optional[float] = None, **kwargs) -> Any:
+        """
+        GET `url` through the shared upstream client and return the decoded
+        JSON body, cached by URL and query parameters. Error statuses raise
+        httpx.HTTPStatusError and are not cached.
+        """
+        async def fetch():
+            response = await http_client.client.get(url, params=params, **kwargs)
+            response.raise_for_status()
+            return response.json(), len(response.content)
+        return await self.get_or_fetch(cache_key(url, params), fetch, ttl, stale_ttl)
+
+    async def wait_for_refreshes(self):
+        """
+        Wait for the background refreshes started on this loop.
+        """
+        loop = asyncio.get_running_loop()
+        tasks = [task for task in self._tasks if task.get_loop() is loop]
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "evictions": self.evictions,
+            "coalesced": self._flights.coalesced,
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
+
+cache = ResponseCache()
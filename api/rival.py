@@ -1,9 +1,10 @@
-import json
 from typing import List, Dict, Any
+from api import data_files
+
+GAMES_FILE = "rival_games.json"
 
 def get_all_games() -> List[Dict[str, Any]]:
     """
     Retrieve a list of all games from the mock Rival data file.
     """
-    with open("/app/frontend/data/rival_games.json", "r") as f:
-        return json.load(f)
+    return data_files.registry.load(GAMES_FILE)
@@ -0,0 +1,280 @@
+import bisect
+import heapq
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Query tokens shorter than this only match whole terms, so that a single
+# letter does not expand to half of the vocabulary.
+MIN_PREFIX_LENGTH = 2
+
+# Terms reached through prefix expansion score lower than exact matches.
+PREFIX_MATCH_WEIGHT = 0.5
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase word tokens.
+    """
+    if not text:
+        return []
+    return TOKEN_RE.findall(str(text).lower())
+
+class InvertedIndex:
+    """
+    In-memory inverted index with BM25 ranking.
+
+    Each document is a dict; the configured fields are tokenized and their
+    term frequencies weighted per field. Documents can be added, replaced
+    and removed incrementally. Query tokens match whole terms and, once
+    they are at least MIN_PREFIX_LENGTH characters long, any term they are
+    a prefix of (edge n-grams resolved against a sorted vocabulary).
+    """
+
+    def __init__(self, fields: Dict[str, float], k1: float = 1.2, b: float = 0.75):
+        self.fields = fields
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Hashable, float]] = defaultdict(dict)
+        self._doc_terms: Dict[Hashable, Dict[str, float]] = {}
+        self._doc_length: Dict[Hashable, float] = {}
+        self._total_length = 0.0
+        self._vocabulary: List[str] = []
+        self._bulk_loading = False
+
+    def __len__(self):
+        return len(self._doc_length)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._doc_length
+
+    def _weighted_terms(self, doc: dict) -> Dict[str, float]:
+        terms: Dict[str, float] = defaultdict(float)
+        for field, weight in self.fields.items():
+            for token in tokenize(doc.get(field)):
+                terms[token] += weight
+        return terms
+
+    def add(self, doc_id: Hashable, doc: dict):
+        """
+        Index a document, replacing any previous version with the same id.
+        """
+        if doc_id in self._doc_length:
+            self.remove(doc_id)
+        terms = self._weighted_terms(doc)
+        for term, tf in terms.items():
+            postings = self._postings[term]
+            if not postings and not self._bulk_loading:
+                bisect.insort(self._vocabulary, term)
+            postings[doc_id] = tf
+        length = sum(terms.values())
+        self._doc_terms[doc_id] = terms
+        self._doc_length[doc_id] = length
+        self._total_length += length
+
+    def remove(self, doc_id: Hashable):
+        """
+        Remove a document from the index. Unknown ids are ignored.
+        """
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                i = bisect.bisect_left(self._vocabulary, term)
+                if i < len(self._vocabulary) and self._vocabulary[i] == term:
+                    del self._vocabulary[i]
+        self._total_length -= self._doc_length.pop(doc_id)
+
+    def rebuild(self, docs: Iterable[Tuple[Hashable, dict]]):
+        """
+        Drop the current contents and index `docs` from scratch.
+        """
+        self._postings = defaultdict(dict)
+        self._doc_terms = {}
+        self._doc_length = {}
+        self._total_length = 0.0
+        self._bulk_loading = True
+        try:
+            for doc_id, doc in docs:
+                self.add(doc_id, doc)
+        finally:
+            self._bulk_loading = False
+        self._vocabulary = sorted(self._postings)
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """
+        Resolve a query token to the vocabulary terms it matches.
+        """
+        matches = []
+        if token in self._postings:
+            matches.append((token, 1.0))
+        if len(token) >= MIN_PREFIX_LENGTH:
+            i = bisect.bisect_right(self._vocabulary, token)
+            while i < len(self._vocabulary) and self._vocabulary[i].startswith(token):
+                matches.append((self._vocabulary[i], PREFIX_MATCH_WEIGHT))
+                i += 1
+        return matches
+
+    def _idf(self, term: str) -> float:
+        n = len(self._doc_length)
+        df = len(self._postings[term])
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def score(self, query: str) -> Dict[Hashable, float]:
+        """
+        Return the BM25 score of every document matching all query tokens.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self._doc_length:
+            return {}
+
+        # Start from the most selective token and filter its matches by
+        # membership in the others, so broad tokens are never materialized.
+        expansions = []
+        for token in tokens:
+            terms = self._expand(token)
+            if not terms:
+                return {}
+            expansions.append((sum(len(self._postings[t]) for t, _ in terms), terms))
+        expansions.sort(key=lambda expansion: expansion[0])
+        candidates = set()
+        for term, _ in expansions[0][1]:
+            candidates.update(self._postings[term])
+        for _, terms in expansions[1:]:
+            postings = [self._postings[term] for term, _ in terms]
+            if len(postings) == 1:
+                candidates = {d for d in candidates if d in postings[0]}
+            else:
+                candidates = {d for d in candidates if any(d in p for p in postings)}
+            if not candidates:
+                return {}
+
+        avg_length = self._total_length / len(self._doc_length) or 1.0
+        k1, b = self.k1, self.b
+        doc_length = self._doc_length
+        norms = {
+            doc_id: k1 * (1 - b + b * doc_length[doc_id] / avg_length)
+            for doc_id in candidates
+        }
+        scores = dict.fromkeys(candidates, 0.0)
+        for _, terms in expansions:
+            for term, weight in terms:
+                postings = self._postings[term]
+                idf = self._idf(term) * weight * (k1 + 1)
+                if len(postings) < len(candidates):
+                    matches = ((d, tf) for d, tf in postings.items() if d in norms)
+                else:
+                    matches = ((d, postings[d]) for d in candidates if d in postings)
+                for doc_id, tf in matches:
+                    scores[doc_id] += idf * tf / (tf + norms[doc_id])
+        return scores
+
+    def search(self, query: str, limit: int = None, offset: int = 0) -> Tuple[int, List[Hashable]]:
+        """
+        Return the total number of matches and one page of ranked doc ids.
+        """
+        scores = self.score(query)
+        total = len(scores)
+        if limit is None:
+            ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], str(doc_id)))
+            return total, ranked[offset:]
+        top = heapq.nsmallest(
+            offset + limit, scores, key=lambda doc_id: (-scores[doc_id], str(doc_id))
+        )
+        return total, top[offset:]
+
+# Default minimum share of the query's trigrams a fuzzy match must contain.
+DEFAULT_SIMILARITY = 0.5
+
+def trigrams(text: str) -> set:
+    """
+    Return the set of trigrams of every word in `text`.
+
+    Words are padded like PostgreSQL's pg_trgm ("  word "), so word starts
+    weigh more than word ends and short words still produce trigrams.
+    """
+    grams = set()
+    for token in tokenize(text):
+        padded = f"  {token} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+class TrigramIndex:
+    """
+    Trigram postings for typo-tolerant matching of short texts such as titles.
+
+    Candidates are counted straight from the postings of the query
+    trigrams, so documents sharing no trigram with the query are never
+    looked at.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, set] = defaultdict(set)
+        self._doc_trigrams: Dict[Hashable, set] = {}
+
+    def __len__(self):
+        return len(self._doc_trigrams)
+
+    def add(self, doc_id: Hashable, text: str):
+        if doc_id in self._doc_trigrams:
+            self.remove(doc_id)
+        grams = trigrams(text)
+        for gram in grams:
+            self._postings[gram].add(doc_id)
+        self._doc_trigrams[doc_id] = grams
+
+    def remove(self, doc_id: Hashable):
+        grams = self._doc_trigrams.pop(doc_id, None)
+        if grams is None:
+            return
+        for gram in grams:
+            postings = self._postings[gram]
+            postings.discard(doc_id)
+            if not postings:
+                del self._postings[gram]
+
+    def rebuild(self, docs: Iterable[Tuple[Hashable, str]]):
+        self._postings = defaultdict(set)
+        self._doc_trigrams = {}
+        for doc_id, text in docs:
+            self.add(doc_id, text)
+
+    def score(self, query: str, threshold: float = DEFAULT_SIMILARITY) -> Dict[Hashable, float]:
+        """
+        Return a similarity score for every document above `threshold`.
+
+        A document matches when it contains at least `threshold` of the
+        query trigrams. Matches are scored by the Jaccard similarity of the
+        two trigram sets, so the closest spelling of the whole title ranks
+        first.
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return {}
+        shared: Dict[Hashable, int] = defaultdict(int)
+        for gram in query_grams:
+            for doc_id in self._postings.get(gram, ()):
+                shared[doc_id] += 1
+        needed = threshold * len(query_grams)
+        scores = {}
+        for doc_id, count in shared.items():
+            if count >= needed:
+                union = len(query_grams) + len(self._doc_trigrams[doc_id]) - count
+                scores[doc_id] = count / union
+        return scores
+
+    def search(self, query: str, threshold: float = DEFAULT_SIMILARITY, limit: int = None, offset: int = 0) -> Tuple[int, List[Hashable]]:
+        """
+        Return the total number of matches and one page of doc ids, closest first.
+        """
+        scores = self.score(query, threshold)
+        ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], str(doc_id)))
+        end = offset + limit if limit is not None else None
+        return len(scores), ranked[offset:end]
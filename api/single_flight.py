@@ -0,0 +1,56 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from api import http_client
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one.
+
+    The first caller for a key starts the call; callers arriving while it
+    is in flight wait for the same result or exception instead of issuing
+    their own. The call runs in its own task, so a caller that gives up
+    does not cancel it for the others. `issued` counts calls started and
+    `coalesced` calls that joined one already in flight.
+
+    Waiters get the very result object of the call, not a copy.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.issued = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        task = self._calls.get(key)
+        if task is not None and not task.done() and task.get_loop() is loop:
+            self.coalesced += 1
+        else:
+            self.issued += 1
+            task = self._calls[key] = loop.create_task(call())
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when no caller was left to await it.
+            task.exception()
+
+    async def get_json(self, url: str, params: Optional[dict] = None, **kwargs) -> Any:
+        """
+        GET `url` through the shared upstream client and return the decoded
+        JSON body, sharing the request with concurrent identical calls.
+        Error statuses raise httpx.HTTPStatusError.
+        """
+        async def fetch():
+            response = await http_client.client.get(url, params=params, **kwargs)
+            response.raise_for_status()
+            return response.json()
+        return await self.do((url, tuple(sorted((params or {}).items()))), fetch)
+
+    def stats(self) -> Dict[str, int]:
+        return {"issued": self.issued, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+group = SingleFlight()
@@ -0,0 +1,113 @@
+import bisect
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+class _Last:
+    """
+    Sorts after every doc id, so (value, LAST) bounds all keys with that value.
+    """
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+LAST = _Last()
+
+class SortedIndex:
+    """
+    Documents kept sorted by one numeric field, as (value, doc_id) keys.
+
+    Ties are broken by doc id so every key is unique and can be used as a
+    keyset pagination cursor. Inserts and removals are a bisect plus a
+    list insert/delete; pages are slices of the key list.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self._keys: List[Tuple[float, Hashable]] = []
+
+    def __len__(self):
+        return len(self._keys)
+
+    def key(self, doc_id: Hashable, doc: dict) -> Tuple[float, Hashable]:
+        return (doc.get(self.field) or 0, doc_id)
+
+    def add(self, doc_id: Hashable, doc: dict):
+        bisect.insort(self._keys, self.key(doc_id, doc))
+
+    def remove(self, doc_id: Hashable, doc: dict):
+        key = self.key(doc_id, doc)
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def rebuild(self, docs: Iterable[Tuple[Hashable, dict]]):
+        self._keys = sorted(self.key(doc_id, doc) for doc_id, doc in docs)
+
+    def _bounds(self, low: Optional[float], high: Optional[float]) -> Tuple[int, int]:
+        keys = self._keys
+        start = 0 if low is None else bisect.bisect_left(keys, (low,))
+        end = len(keys) if high is None else bisect.bisect_right(keys, (high, LAST))
+        return start, max(start, end)
+
+    def count(self, low: Optional[float] = None, high: Optional[float] = None) -> int:
+        """
+        Number of documents with low <= value <= high, in O(log n).
+        """
+        start, end = self._bounds(low, high)
+        return end - start
+
+    def range(self, low: Optional[float] = None, high: Optional[float] = None) -> List[Hashable]:
+        """
+        Doc ids with low <= value <= high, in value order.
+        """
+        start, end = self._bounds(low, high)
+        return [doc_id for _, doc_id in self._keys[start:end]]
+
+    def filter(self, candidates: Optional[Set[Hashable]], docs: Dict[Hashable, dict],
+               low: Optional[float] = None, high: Optional[float] = None) -> Set[Hashable]:
+        """
+        Intersect `candidates` (None for every document) with a value range.
+
+        Whichever side is smaller is walked: a handful of text matches is
+        checked value by value, a narrow range is read from the key list.
+        """
+        if low is None and high is None:
+            return {doc_id for _, doc_id in self._keys} if candidates is None else candidates
+        if candidates is not None and len(candidates) < self.count(low, high):
+            lowest = float("-inf") if low is None else low
+            highest = float("inf") if high is None else high
+            return {
+                doc_id for doc_id in candidates
+                if lowest <= self.key(doc_id, docs[doc_id])[0] <= highest
+            }
+        ids = set(self.range(low, high))
+        return ids if candidates is None else ids & candidates
+
+    def histogram(self, bounds: Sequence[float]) -> List[int]:
+        """
+        Count documents per bucket [bounds[i], bounds[i + 1]), the last bucket
+        being open ended, with one bisect per bound.
+        """
+        positions = [bisect.bisect_left(self._keys, (bound,)) for bound in bounds] + [len(self._keys)]
+        return [positions[i + 1] - positions[i] for i in range(len(bounds))]
+
+    def page(self, limit: Optional[int], after: Optional[tuple] = None, descending: bool = False) -> List[Tuple[float, Hashable]]:
+        """
+        Return up to `limit` keys that come after the key `after`.
+        """
+        return page_keys(self._keys, limit, after, descending)
+
+def page_keys(keys: List[Tuple[float, Hashable]], limit: Optional[int], after: Optional[tuple] = None,
+              descending: bool = False) -> List[Tuple[float, Hashable]]:
+    """
+    Return up to `limit` keys of the sorted list `keys` that come after `after`.
+    """
+    if descending:
+        end = len(keys) if after is None else bisect.bisect_left(keys, tuple(after))
+        start = 0 if limit is None else max(0, end - limit)
+        return keys[start:end][::-1]
+    start = 0 if after is None else bisect.bisect_right(keys, tuple(after))
+    end = None if limit is None else start + limit
+    return keys[start:end]
@@ -0,0 +1,92 @@
+"""
+Import-time report for the API's cold start.
+
+Imports a module (api.main by default) in a fresh interpreter with
+`python -X importtime`, then prints the total import time, the time spent
+per top-level package and the slowest modules, so heavy SDKs creeping back
+into the startup path are easy to spot. With --budget, exits non-zero
+when the total exceeds it.
+
+Usage:
+    python -m api.startup_report [--module api.main] [--top 15] [--budget 1000]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import List, NamedTuple
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """
+    Parse the "import time: self | cumulative | module" lines of -X importtime.
+    """
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        module = name.lstrip()
+        depth = (len(name) - len(module) - 1) // 2
+        timings.append(ImportTiming(module, int(fields[0]), int(fields[1]), depth))
+    return timings
+
+def measure(module: str) -> List[ImportTiming]:
+    """
+    Import `module` in a new interpreter and return its import timings.
+    """
+    root = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=root, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    return parse_importtime(result.stderr)
+
+def summarize(timings: List[ImportTiming], top: int = 15) -> dict:
+    """
+    Total import time in ms, self time per top-level package and the
+    `top` modules with the largest cumulative time.
+    """
+    packages = defaultdict(int)
+    for timing in timings:
+        packages[timing.module.split(".")[0]] += timing.self_us
+    total = sum(timing.cumulative_us for timing in timings if timing.depth == 0)
+    slowest = sorted(timings, key=lambda timing: timing.cumulative_us, reverse=True)[:top]
+    return {
+        "total_ms": total / 1000,
+        "packages": sorted(((name, us / 1000) for name, us in packages.items()), key=lambda item: -item[1])[:top],
+        "modules": [(timing.module, timing.cumulative_us / 1000) for timing in slowest],
+    }
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="api.main")
+    parser.add_argument("--top", type=int, default=15, help="Rows per table")
+    parser.add_argument("--budget", type=float, help="Fail if the total import time exceeds this many ms")
+    args = parser.parse_args()
+
+    summary = summarize(measure(args.module), args.top)
+    print(f"Importing {args.module}: {summary['total_ms']:.1f} ms")
+    print("\nSelf time by package:")
+    for name, ms in summary["packages"]:
+        print(f"  {ms:8.1f} ms  {name}")
+    print("\nSlowest modules (cumulative):")
+    for name, ms in summary["modules"]:
+        print(f"  {ms:8.1f} ms  {name}")
+    if args.budget is not None and summary["total_ms"] > args.budget:
+        print(f"\nOver budget: {summary['total_ms']:.1f} ms > {args.budget:.1f} ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main_cli()
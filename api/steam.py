@@ -1,24 +1,204 @@
+import asyncio
+import bisect
+import json
 import os
-import requests
-from typing import List, Dict, Any
+import threading
+import time
+import httpx
+from typing import List, Dict, Any, Optional, Tuple
+from api import http_client
+from api.games_journal import install_snapshot, write_snapshot
+from api.search_index import InvertedIndex
+from api.single_flight import SingleFlight
 
 # It's recommended to store the API key in an environment variable or a config file.
 # For this example, we'll use a placeholder.
 STEAM_API_KEY = os.environ.get("STEAM_API_KEY", "YOUR_STEAM_API_KEY")
 STEAM_API_BASE_URL = "https://api.steampowered.com"
 
-def get_all_games() -> List[Dict[str, Any]]:
+dir_path = os.path.dirname(os.path.realpath(__file__))
+
+# Local copy of the Steam app list. STEAM_SNAPSHOT_PATH overrides it.
+SNAPSHOT_PATH = os.environ.get("STEAM_SNAPSHOT_PATH", os.path.join(dir_path, "..", "data", "steam_apps.json"))
+
+# Seconds between refreshes of the local app list from Steam.
+REFRESH_INTERVAL = float(os.environ.get("STEAM_REFRESH_INTERVAL", str(6 * 60 * 60)))
+
+# A refresh that changes more than this share of the apps rebuilds the
+# indexes instead of patching them app by app.
+REBUILD_FRACTION = 0.1
+
+async def fetch_app_list() -> List[Dict[str, Any]]:
     """
-    Retrieve a list of all games from the Steam Web API.
+    Download the full app list from the Steam Web API. Raises httpx.HTTPError.
     """
     url = f"{STEAM_API_BASE_URL}/ISteamApps/GetAppList/v2/"
-    params = {"key": STEAM_API_KEY}
-
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()  # Raise an exception for bad status codes
-        data = response.json()
-        return data.get("applist", {}).get("apps", [])
-    except requests.exceptions.RequestException as e:
-        print(f"An error occurred: {e}")
-        return []
+    response = await http_client.client.get(url, params={"key": STEAM_API_KEY})
+    response.raise_for_status()
+    return response.json().get("applist", {}).get("apps", [])
+
+class SteamCatalog:
+    """
+    Locally persisted copy of the Steam app list with a name index.
+
+    The app list is kept in a JSON snapshot on disk and in memory as an
+    appid -> name map, a sorted list of app ids for browsing and a
+    full-text index of names for `q` searches, so a page costs the same
+    however large Steam's list is. `refresh` downloads the list again,
+    diffs it against the current one and patches only the apps that were
+    added, removed or renamed before writing a new snapshot.
+    """
+
+    def __init__(self, path: str = SNAPSHOT_PATH, refresh_interval: float = REFRESH_INTERVAL, clock=time.time):
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._apps: Dict[int, str] = {}
+        self._appids: List[int] = []
+        self._names = InvertedIndex({"name": 1.0})
+        self._loaded = False
+        self._refreshes = SingleFlight()
+        self._task: Optional[asyncio.Task] = None
+        self.fetched_at: Optional[float] = None
+        self.last_diff: Optional[Dict[str, int]] = None
+
+    def __len__(self):
+        return len(self._apps)
+
+    def _install(self, apps: Dict[int, str]):
+        names = InvertedIndex({"name": 1.0})
+        names.rebuild((appid, {"name": name}) for appid, name in apps.items())
+        appids = sorted(apps)
+        with self._lock:
+            self._apps, self._appids, self._names = apps, appids, names
+
+    def load(self):
+        """
+        Read the snapshot from disk, if there is one.
+        """
+        if self._loaded:
+            return
+        try:
+            with open(self.path, "r") as f:
+                snapshot = json.load(f)
+            self._install({int(appid): name for appid, name in snapshot["apps"]})
+            self.fetched_at = snapshot.get("fetched_at")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable Steam snapshot {self.path}: {e}")
+        self._loaded = True
+
+    def apply(self, apps: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Bring the catalog in line with a freshly downloaded app list and
+        return how many apps were added, removed and renamed.
+
+        Only refreshes modify the catalog, one at a time, so the diff is
+        taken without blocking readers. Large changes build new indexes
+        on the side and swap them in; small ones are patched in place.
+        """
+        incoming = {app["appid"]: app.get("name") or "" for app in apps if "appid" in app}
+        current = self._apps
+        removed = [appid for appid in current if appid not in incoming]
+        changed = [appid for appid, name in incoming.items() if current.get(appid) != name]
+        added = sum(1 for appid in changed if appid not in current)
+        diff = {"added": added, "removed": len(removed), "renamed": len(changed) - added}
+        if len(removed) + len(changed) > REBUILD_FRACTION * max(len(current), 1):
+            self._install(incoming)
+        else:
+            with self._lock:
+                for appid in removed:
+                    del current[appid]
+                    del self._appids[bisect.bisect_left(self._appids, appid)]
+                    self._names.remove(appid)
+                for appid in changed:
+                    if appid not in current:
+                        bisect.insort(self._appids, appid)
+                    current[appid] = incoming[appid]
+                    self._names.add(appid, {"name": incoming[appid]})
+        self.fetched_at = self._clock()
+        self.last_diff = diff
+        self._loaded = True
+        snapshot = {"fetched_at": self.fetched_at, "apps": list(self._apps.items())}
+        install_snapshot(write_snapshot(self.path, snapshot), self.path)
+        return diff
+
+    async def refresh(self) -> Optional[Dict[str, int]]:
+        """
+        Download the app list and apply it. Concurrent calls share one
+        download. On an upstream error the current list is kept and None
+        is returned.
+        """
+        async def download_and_apply():
+            try:
+                apps = await fetch_app_list()
+            except httpx.HTTPError as e:
+                print(f"Steam app list refresh failed: {e}")
+                return None
+            return await asyncio.to_thread(self.apply, apps)
+        return await self._refreshes.do("refresh", download_and_apply)
+
+    def is_stale(self) -> bool:
+        return self.fetched_at is None or self._clock() - self.fetched_at >= self.refresh_interval
+
+    async def ensure_loaded(self):
+        """
+        Load the snapshot on first use. Without one, the first request
+        waits for a download; afterwards refreshes happen in the background.
+        """
+        if not self._loaded:
+            await asyncio.to_thread(self.load)
+        if not self._apps and self.fetched_at is None:
+            await self.refresh()
+
+    async def run(self):
+        """
+        Refresh the catalog whenever it is older than `refresh_interval`.
+        """
+        await self.ensure_loaded()
+        while True:
+            if self.is_stale():
+                await self.refresh()
+            await asyncio.sleep(min(self.refresh_interval, 60.0))
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def page(self, q: str = "", limit: int = 100, after=None) -> Tuple[int, List[dict], Any]:
+        """
+        Return the number of matching apps, one page of them and the
+        position of the next page (None on the last page).
+
+        Name searches are ranked and paginated by position; without `q`
+        apps are listed by app id and `after` is the last app id seen.
+        """
+        with self._lock:
+            if q.strip():
+                start = after if isinstance(after, int) else 0
+                total, appids = self._names.search(q, limit=limit, offset=start)
+                end = start + limit
+                next_position = end if end < total else None
+            else:
+                total = len(self._appids)
+                start = 0 if not isinstance(after, list) else bisect.bisect_right(self._appids, after[0])
+                appids = self._appids[start:start + limit]
+                next_position = [appids[-1]] if appids and start + limit < total else None
+            apps = [{"appid": appid, "name": self._apps[appid]} for appid in appids]
+        return total, apps, next_position
+
+    def stats(self) -> Dict[str, Any]:
+        return {"apps": len(self._apps), "fetched_at": self.fetched_at, "last_diff": self.last_diff}
+
+catalog = SteamCatalog()
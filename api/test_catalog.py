@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from api.main import app
+from api import catalog
+from api.data_files import DataFileRegistry
+
+class TestCatalogIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.write("racing_games.json", [
+            {"name": "Kart Kings", "description": "Kart racing.", "link": "kart.html"},
+            {"name": "Space Racer", "description": "Race in space.", "link": "space.html"},
+        ])
+        self.write("health_fitness_games.json", [
+            {"name": "Zombies, Run!", "category": "Fitness", "link": "zombies.html"},
+        ])
+        self.write("coupons.json", [{"id": 1, "title": "Racing discount"}])
+        self.write("palm_store_games.json", [{"id": 1, "name": "Palm Racer", "description": "Racing on the go."}])
+        self.write("rival_games.json", [{"name": "Dota 2", "genre": "MOBA", "developer": "Valve"}])
+        # motogp_games.json is missing and skipped.
+        providers = {"palm_store": "palm_store_games.json", "rival": "rival_games.json", "motogp": "motogp_games.json"}
+        patcher = patch.dict(catalog.PROVIDER_FEEDS, providers, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.now = 0.0
+        self.registry = DataFileRegistry([self.tmp_dir.name], revalidate_interval=60, clock=lambda: self.now)
+        self.index = catalog.get_catalog_index(self.registry)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, filename, data):
+        path = os.path.join(self.tmp_dir.name, filename)
+        with open(path, "w") as f:
+            json.dump(data, f)
+        # Make sure the change is visible even within one mtime tick.
+        os.utime(path, ns=(0, len(data)))
+
+    def test_feeds_are_normalized(self):
+        self.assertEqual(len(self.index), 5)
+        records = {r["name"]: r for r in self.index.records.values()}
+        self.assertEqual(records["Kart Kings"]["source"], "racing_games")
+        self.assertEqual(records["Kart Kings"]["category"], "Racing")
+        self.assertEqual(records["Zombies, Run!"]["category"], "Fitness")
+        self.assertEqual(records["Dota 2"]["category"], "MOBA")
+        self.assertEqual(records["Dota 2"]["developer"], "Valve")
+
+    def test_cross_feed_search_with_facets(self):
+        result = self.index.search("racing")
+        self.assertEqual({r["name"] for r in result["results"]}, {"Kart Kings", "Space Racer", "Palm Racer"})
+        self.assertEqual(result["facets"]["source"], {"racing_games": 2, "palm_store": 1})
+
+    def test_facet_filter(self):
+        result = self.index.search("racing", {"source": "palm_store"})
+        self.assertEqual([r["name"] for r in result["results"]], ["Palm Racer"])
+        result = self.index.search("", {"category": "moba"})
+        self.assertEqual(result["total"], 1)
+
+    def test_empty_query_counts_everything(self):
+        result = self.index.search("", limit=2)
+        self.assertEqual(result["total"], 5)
+        self.assertEqual(len(result["results"]), 2)
+        self.assertEqual(sum(result["facets"]["source"].values()), 5)
+
+    def test_broken_feed_is_skipped(self):
+        with open(os.path.join(self.tmp_dir.name, "puzzle_games.json"), "w") as f:
+            f.write("{not json")
+        self.now = 60
+        index = catalog.get_catalog_index(self.registry)
+        self.assertIsNot(index, self.index)
+        self.assertEqual(len(index), 5)
+
+    def test_index_is_rebuilt_only_when_a_feed_changes(self):
+        self.assertIs(catalog.get_catalog_index(self.registry), self.index)
+        self.write("racing_games.json", [{"name": "Kart Kings"}])
+        self.assertIs(catalog.get_catalog_index(self.registry), self.index)
+        self.now = 60
+        with patch.object(catalog, "CatalogIndex", wraps=catalog.CatalogIndex) as build:
+            rebuilt = catalog.get_catalog_index(self.registry)
+            self.assertEqual(len(rebuilt), 4)
+            self.now = 120
+            self.assertIs(catalog.get_catalog_index(self.registry), rebuilt)
+            self.assertEqual(build.call_count, 1)
+        self.write("strategy_games.json", [{"name": "Chess"}])
+        self.now = 180
+        self.assertEqual(catalog.get_catalog_index(self.registry).search("chess")["total"], 1)
+
+class TestCatalogEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.headers = {"X-API-Key": "test-api-key"}
+
+    def test_search_catalog(self):
+        response = self.client.get("/api/catalog/search?q=beat saber", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["results"][0]["name"], "Beat Saber")
+        self.assertIn("vrar_games", data["facets"]["source"])
+
+    def test_search_catalog_no_api_key(self):
+        response = self.client.get("/api/catalog/search")
+        self.assertEqual(response.status_code, 401)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+import unittest
+from fastapi.testclient import TestClient
+from api.main import app
+from api.data_files import DataFileRegistry
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestDataFileRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.first = os.path.join(self.tmp_dir.name, "first")
+        self.second = os.path.join(self.tmp_dir.name, "second")
+        os.makedirs(self.first)
+        os.makedirs(self.second)
+        self.clock = FakeClock()
+        self.registry = DataFileRegistry([self.first, self.second], revalidate_interval=5, clock=self.clock)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, root, filename, data):
+        with open(os.path.join(root, filename), "w") as f:
+            json.dump(data, f)
+
+    def test_roots_are_searched_in_order(self):
+        self.write(self.second, "games.json", ["second"])
+        self.assertEqual(self.registry.load("games.json"), ["second"])
+        self.write(self.first, "games.json", ["first"])
+        self.registry.invalidate()
+        self.assertEqual(self.registry.load("games.json"), ["first"])
+
+    def test_cached_until_revalidated(self):
+        self.write(self.first, "games.json", [1])
+        self.assertEqual(self.registry.load("games.json"), [1])
+        self.write(self.first, "games.json", [1, 2])
+        self.assertEqual(self.registry.load("games.json"), [1])
+        self.clock.now = 5
+        self.assertEqual(self.registry.load("games.json"), [1, 2])
+        self.assertEqual((self.registry.hits, self.registry.misses), (1, 2))
+
+    def test_unchanged_file_is_not_reparsed(self):
+        self.write(self.first, "games.json", [1])
+        data = self.registry.load("games.json")
+        self.clock.now = 10
+        self.assertIs(self.registry.load("games.json"), data)
+        self.assertEqual((self.registry.hits, self.registry.misses), (1, 1))
+
+    def test_missing_and_invalid_files(self):
+        with self.assertRaises(FileNotFoundError):
+            self.registry.load("missing.json")
+        self.assertEqual(self.registry.load("missing.json", default=[]), [])
+        with open(os.path.join(self.first, "broken.json"), "w") as f:
+            f.write("{")
+        with self.assertRaises(json.JSONDecodeError):
+            self.registry.load("broken.json")
+        self.assertEqual(self.registry.load("broken.json", default=[]), [])
+        self.write(self.first, "missing.json", ["found"])
+        self.clock.now = 5
+        self.assertEqual(self.registry.load("missing.json", default=[]), ["found"])
+
+    def test_missing_default_does_not_hide_parse_errors(self):
+        self.assertEqual(self.registry.load("missing.json", missing=[]), [])
+        with open(os.path.join(self.first, "broken.json"), "w") as f:
+            f.write("{")
+        with self.assertRaises(json.JSONDecodeError):
+            self.registry.load("broken.json", missing=[])
+
+    def test_derived_data_follows_file_version(self):
+        self.write(self.first, "games.json", [{"id": 1}])
+        builds = []
+        build = lambda games: builds.append(1) or {game["id"]: game for game in games}
+        self.assertEqual(self.registry.derive("games.json", "by_id", build), {1: {"id": 1}})
+        self.registry.derive("games.json", "by_id", build)
+        self.assertEqual(len(builds), 1)
+        self.write(self.first, "games.json", [{"id": 1}, {"id": 2}])
+        self.clock.now = 5
+        self.assertEqual(set(self.registry.derive("games.json", "by_id", build)), {1, 2})
+        self.assertEqual(len(builds), 2)
+
+    def test_combined_data_follows_every_file(self):
+        self.write(self.first, "a.json", [1])
+        self.write(self.first, "b.json", [2])
+        filenames = ["a.json", "b.json", "missing.json"]
+        builds = []
+
+        def build(files):
+            builds.append(files)
+            return sum((data for data in files.values() if isinstance(data, list)), [])
+
+        self.assertEqual(self.registry.derive_all("sum", lambda: filenames, build), [1, 2])
+        self.assertIsInstance(builds[0]["missing.json"], FileNotFoundError)
+        self.write(self.first, "b.json", [2, 3])
+        filenames.append("c.json")
+        self.assertEqual(self.registry.derive_all("sum", lambda: filenames, build), [1, 2])
+        self.clock.now = 5
+        self.assertEqual(self.registry.derive_all("sum", lambda: filenames, build), [1, 2, 3])
+        self.clock.now = 10
+        self.registry.derive_all("sum", lambda: filenames, build)
+        self.assertEqual(len(builds), 2)
+        self.registry.invalidate("a.json")
+        self.registry.derive_all("sum", lambda: filenames, build)
+        self.assertEqual(len(builds), 3)
+
+class TestDataFileEndpoints(unittest.TestCase):
+    def test_stats(self):
+        client = TestClient(app)
+        headers = {"X-API-Key": "test-api-key"}
+        client.get("/api/rival/games", headers=headers)
+        client.get("/api/rival/games", headers=headers)
+        response = client.get("/api/data-files/stats", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(response.json()["hits"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,10 @@
 import unittest
 from fastapi.testclient import TestClient
 from api.main import app
+from api.ecommerce import ProductIndex
+
+def make_product(product_id, name, price, category="Gear"):
+    return {"id": product_id, "name": name, "category": category, "price": price}
 
 class TestEcommerce(unittest.TestCase):
     def setUp(self):
@@ -41,3 +45,48 @@ class TestEcommerce(unittest.TestCase):
             response = self.client.get(f"/api/ecommerce/{endpoint}")
             self.assertEqual(response.status_code, 401)
             self.assertEqual(response.json()["detail"], "Not authenticated")
+
+class TestProductIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = ProductIndex({
+            "alibaba": [make_product("a1", "Gaming Mouse", 5.5), make_product("a2", "Office Chair", 45)],
+            "amazon": [make_product("m1", "Wireless Gaming Mouse", 39.99), make_product("m2", "Keyboard", 120)],
+        })
+
+    def ids(self, result):
+        return [product["id"] for product in result["results"]]
+
+    def test_text_search_and_facets(self):
+        result = self.index.search("mouse")
+        self.assertEqual(result["total"], 2)
+        self.assertEqual(result["facets"]["retailer"], {"alibaba": 1, "amazon": 1})
+        self.assertEqual(result["results"][0]["retailer"], "alibaba")
+
+    def test_price_range_and_sort(self):
+        self.assertEqual(self.ids(self.index.search(min_price=10, max_price=100)), ["m1", "a2"])
+        self.assertEqual(self.ids(self.index.search(sort="price_desc", limit=2)), ["m2", "a2"])
+        self.assertEqual(self.ids(self.index.search(sort="price_asc", limit=2, offset=1)), ["m1", "a2"])
+
+    def test_retailer_filter_keeps_facet_counts(self):
+        result = self.index.search("gaming", retailers=["amazon"])
+        self.assertEqual(self.ids(result), ["m1"])
+        self.assertEqual(result["facets"]["retailer"], {"alibaba": 1, "amazon": 1})
+
+class TestProductSearchEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.headers = {"X-API-Key": "test-api-key"}
+
+    def test_search(self):
+        response = self.client.get("/api/ecommerce/search", params={"q": "keyboard", "retailer": ["amazon", "shopline"]}, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({p["retailer"] for p in response.json()["results"]}, {"amazon", "shopline"})
+        response = self.client.get("/api/ecommerce/search", params={"max_price": 10, "sort": "price_asc"}, headers=self.headers)
+        prices = [p["price"] for p in response.json()["results"]]
+        self.assertEqual(prices, sorted(prices))
+        self.assertTrue(all(price <= 10 for price in prices))
+
+    def test_search_rejects_bad_parameters(self):
+        for params in ({"retailer": "ebay"}, {"sort": "name"}, {"min_price": 50, "max_price": 10}):
+            response = self.client.get("/api/ecommerce/search", params=params, headers=self.headers)
+            self.assertEqual(response.status_code, 400)
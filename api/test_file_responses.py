@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from api.main import app
+from api import data_files
+from api.data_files import DataFileRegistry, EncodedFile
+
+class TestEncodedFile(unittest.TestCase):
+    def test_variants(self):
+        encoded = EncodedFile([{"name": "Game"}] * 50)
+        self.assertEqual(json.loads(encoded.variants["identity"]), [{"name": "Game"}] * 50)
+        self.assertLess(len(encoded.variants["gzip"]), len(encoded.variants["identity"]))
+        self.assertNotEqual(encoded.etags["identity"], encoded.etags["gzip"])
+
+    def test_choose(self):
+        encoded = EncodedFile([{"name": "Game"}] * 50)
+        self.assertEqual(encoded.choose("gzip, deflate"), "gzip")
+        self.assertEqual(encoded.choose("gzip;q=0, deflate"), "identity")
+        self.assertEqual(encoded.choose(None), "identity")
+        # Tiny bodies are never worth compressing.
+        self.assertEqual(EncodedFile([]).choose("gzip"), "identity")
+
+class TestJsonFileResponses(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.registry = DataFileRegistry([self.tmp_dir.name], revalidate_interval=0)
+        self.patcher = patch.object(data_files, "registry", self.registry)
+        self.patcher.start()
+        self.write([{"id": i, "title": f"Coupon {i}"} for i in range(50)])
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def write(self, coupons):
+        path = os.path.join(self.tmp_dir.name, "coupons.json")
+        with open(path, "w") as f:
+            json.dump(coupons, f)
+        # Make sure the change is visible even within one mtime tick.
+        os.utime(path, ns=(0, len(coupons)))
+
+    def test_cached_response(self):
+        response = self.client.get("/api/coupons", headers={"Accept-Encoding": "identity"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 50)
+        self.assertNotIn("content-encoding", response.headers)
+        etag = response.headers["etag"]
+        self.assertIs(self.registry.encoded("coupons.json"), self.registry.encoded("coupons.json"))
+
+        response = self.client.get("/api/coupons", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(len(response.json()), 50)
+
+        response = self.client.get("/api/coupons", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_new_version_changes_etag(self):
+        etag = self.client.get("/api/coupons").headers["etag"]
+        self.write([{"id": 1, "title": "Only coupon"}])
+        response = self.client.get("/api/coupons", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{"id": 1, "title": "Only coupon"}])
+        self.assertNotEqual(response.headers["etag"], etag)
+
+    def test_provider_list_default(self):
+        response = self.client.get("/api/junglee/games", headers={"X-API-Key": "test-api-key"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+        with open(os.path.join(self.tmp_dir.name, "junglee_games.json"), "w") as f:
+            f.write("[{")
+        with self.assertRaises(json.JSONDecodeError):
+            self.client.get("/api/junglee/games", headers={"X-API-Key": "test-api-key"})
+
+if __name__ == '__main__':
+    unittest.main()
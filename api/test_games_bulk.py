@@ -0,0 +1,143 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from api.main import Game, app
+from api.games_bulk import iter_lines, validate_chunk
+from api.games_sqlite import SqliteGamesStore
+from api.games_store import GamesStore
+
+def make_game(name, category="Action"):
+    return {
+        "name": name,
+        "category": category,
+        "link": f"{name}.html",
+        "description": f"The {name} game.",
+        "rating": 4.5,
+        "player_count": 10,
+    }
+
+def to_ndjson(games):
+    return "".join(json.dumps(game) + "\n" for game in games)
+
+async def stream(*pieces):
+    for piece in pieces:
+        yield piece
+
+class TestBulkHelpers(unittest.TestCase):
+    def test_iter_lines(self):
+        async def collect():
+            return [line async for line in iter_lines(stream(b'{"a"', b': 1}\n\n{"b": 2}\n{"c"', b": 3}"))]
+        self.assertEqual(asyncio.run(collect()), [(1, '{"a": 1}'), (3, '{"b": 2}'), (4, '{"c": 3}')])
+
+    def test_validate_chunk(self):
+        records, errors = validate_chunk(Game, [
+            (1, json.dumps(make_game("Alpha"))),
+            (2, "{not json"),
+            (3, json.dumps({"name": "Beta"})),
+            (4, "[1, 2]"),
+        ])
+        self.assertEqual([record["name"] for record in records], ["Alpha"])
+        self.assertEqual([error["line"] for error in errors], [2, 3, 4])
+        self.assertIn("category", errors[1]["error"])
+
+class BulkEndpointTests:
+    """
+    Import/export tests run against every storage backend.
+    """
+
+    def make_store(self, tmp_dir):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.client = TestClient(app)
+        self.headers = {"X-API-Key": "test-api-key"}
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = self.make_store(self.tmp_dir.name)
+        self.store.add(make_game("Alpha"))
+        self.patcher = patch("api.main.games_store", self.store)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def test_bulk_import(self):
+        games = [make_game(f"Game {i}") for i in range(2500)] + [make_game("Alpha", "Puzzle")]
+        response = self.client.post("/api/games/bulk", content=to_ndjson(games), headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"created": 2500, "updated": 1})
+        self.assertEqual(self.store.get("Alpha")["category"], "Puzzle")
+        self.assertEqual(self.store.get("Alpha")["version"], 2)
+        self.assertEqual(self.store.page("puzzle")[0], 1)
+        self.assertEqual(self.store.page()[0], 2501)
+
+    def test_invalid_import_writes_nothing(self):
+        body = to_ndjson([make_game("Beta")]) + '{"name": "Gamma"}\n'
+        response = self.client.post("/api/games/bulk", content=body, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["detail"]["errors"][0]["line"], 2)
+        self.assertIsNone(self.store.get("Beta"))
+
+    def test_export_round_trip(self):
+        self.client.post("/api/games/bulk", content=to_ndjson([make_game("Beta", "Racing")]), headers=self.headers)
+        response = self.client.get("/api/games/export", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        games = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([(g["name"], g["category"]) for g in games], [("Alpha", "Action"), ("Beta", "Racing")])
+
+class TestJsonBulkEndpoints(BulkEndpointTests, unittest.TestCase):
+    def make_store(self, tmp_dir):
+        return GamesStore(os.path.join(tmp_dir, "games.json"))
+
+    def test_import_replaces_snapshot_and_journal(self):
+        self.client.post("/api/games/bulk", content=to_ndjson([make_game("Beta")]), headers=self.headers)
+        self.assertFalse(os.path.exists(self.store._journal.path))
+        reopened = GamesStore(self.store.path)
+        self.assertEqual([g["name"] for g in reopened.all()], ["Alpha", "Beta"])
+
+    def journal_then_import(self):
+        self.store.replace("Alpha", make_game("Alpha", "Racing"))
+        self.store.add(make_game("Beta"))
+        self.store.remove("Beta")
+        return self.client.post("/api/games/bulk", content=to_ndjson([make_game("Alpha", "Puzzle"), make_game("Beta")]),
+                                headers=self.headers)
+
+    def test_crash_after_import_swap_does_not_replay_old_journal(self):
+        # The process dies after the new snapshot is installed but before
+        # the rotated journal is deleted.
+        with patch("api.games_store.os.remove"):
+            response = self.journal_then_import()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(os.path.exists(self.store._journal.compacting_path))
+        reopened = GamesStore(self.store.path)
+        self.assertEqual(reopened.get("Alpha")["category"], "Puzzle")
+        self.assertEqual(reopened.get("Alpha")["version"], 3)
+        self.assertIsNotNone(reopened.get("Beta"))
+        # Later mutations still replay on top of the marker.
+        reopened.remove("Beta")
+        reopened.flush()
+        self.assertIsNone(GamesStore(self.store.path).get("Beta"))
+
+    def test_crash_before_import_swap_keeps_journal(self):
+        with patch("api.games_store.install_snapshot", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.journal_then_import()
+        reopened = GamesStore(self.store.path)
+        self.assertEqual(reopened.get("Alpha")["category"], "Racing")
+        self.assertIsNone(reopened.get("Beta"))
+
+class TestSqliteBulkEndpoints(BulkEndpointTests, unittest.TestCase):
+    def make_store(self, tmp_dir):
+        return SqliteGamesStore(os.path.join(tmp_dir, "games.db"))
+
+    def tearDown(self):
+        self.store.close()
+        super().tearDown()
+
+if __name__ == '__main__':
+    unittest.main()
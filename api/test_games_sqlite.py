@@ -0,0 +1,160 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from api.main import app
+from api.games_store import NameConflict, VersionMismatch, open_games_store
+from api.games_sqlite import SqliteGamesStore, fts_query, migrate
+
+def make_game(name, category="Action", rating=4.5, player_count=10):
+    return {
+        "name": name,
+        "category": category,
+        "link": f"{name}.html",
+        "description": f"The {name} game.",
+        "rating": rating,
+        "player_count": player_count,
+    }
+
+class TestSqliteGamesStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = SqliteGamesStore(os.path.join(self.tmp_dir.name, "games.db"))
+        self.store.add(make_game("Space Racer", "Racing", rating=4.0, player_count=30))
+        self.store.add(make_game("Kart Kings", "Racing", rating=3.0, player_count=20))
+        self.store.add(dict(make_game("Puzzle Planet", "Puzzle", rating=5.0, player_count=10), download_link="games/pp.zip"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_fts_query(self):
+        self.assertEqual(fts_query("Space rac"), '"space"* "rac"*')
+        self.assertIsNone(fts_query("  "))
+
+    def test_wal_mode(self):
+        self.assertEqual(self.store._query("PRAGMA journal_mode")[0][0], "wal")
+
+    def test_crud_and_versions(self):
+        game = self.store.get("Puzzle Planet")
+        self.assertEqual(game["version"], 1)
+        self.assertEqual(game["download_link"], "games/pp.zip")
+        with self.assertRaises(NameConflict):
+            self.store.add(make_game("Kart Kings"))
+
+        stored = self.store.replace("Kart Kings", make_game("Kart Kings", "Arcade"), expected_version=1)
+        self.assertEqual(stored["version"], 2)
+        with self.assertRaises(VersionMismatch):
+            self.store.replace("Kart Kings", make_game("Kart Kings"), expected_version=1)
+        with self.assertRaises(NameConflict):
+            self.store.replace("Kart Kings", make_game("Space Racer"))
+        self.assertIsNone(self.store.replace("Missing", make_game("Missing")))
+
+        with self.assertRaises(VersionMismatch):
+            self.store.remove("Kart Kings", expected_version=1)
+        self.assertTrue(self.store.remove("Kart Kings", expected_version=2))
+        self.assertFalse(self.store.remove("Kart Kings"))
+        self.assertEqual([g["name"] for g in self.store.all()], ["Space Racer", "Puzzle Planet"])
+
+    def test_search_tracks_updates(self):
+        total, games = self.store.search("racing")
+        self.assertEqual(total, 2)
+        self.assertEqual({g["name"] for g in games}, {"Space Racer", "Kart Kings"})
+        self.store.replace("Kart Kings", make_game("Kart Kings", "Arcade"))
+        self.assertEqual(self.store.search("arc")[1][0]["name"], "Kart Kings")
+        self.assertEqual(self.store.search("racing")[0], 1)
+
+    def test_sorted_keyset_pages(self):
+        total, first, position = self.store.page(sort="-rating", limit=2)
+        self.assertEqual(total, 3)
+        self.assertEqual([g["name"] for g in first], ["Puzzle Planet", "Space Racer"])
+        _, second, position = self.store.page(sort="-rating", limit=2, after=position)
+        self.assertEqual([g["name"] for g in second], ["Kart Kings"])
+        self.assertIsNone(position)
+        _, by_offset, position = self.store.page(sort="-rating", limit=1, after=1)
+        self.assertEqual(([g["name"] for g in by_offset], position), (["Space Racer"], 2))
+
+    def test_query_pages(self):
+        total, first, position = self.store.page("racing", sort="player_count", limit=1)
+        self.assertEqual((total, first[0]["name"]), (2, "Kart Kings"))
+        _, second, position = self.store.page("racing", sort="player_count", limit=1, after=position)
+        self.assertEqual(second[0]["name"], "Space Racer")
+        self.assertIsNone(position)
+        with self.assertRaises(ValueError):
+            self.store.page(sort="name")
+
+    def test_fuzzy_pages(self):
+        total, games, _ = self.store.page("spcae racr", fuzzy=True, similarity=0.3)
+        self.assertEqual(games[0]["name"], "Space Racer")
+        self.store.replace("Kart Kings", make_game("Kart Queens"))
+        self.assertEqual(self.store.page("kart quens", fuzzy=True)[1][0]["name"], "Kart Queens")
+        self.store.remove("Kart Queens")
+        self.assertEqual(self.store.page("kart quens", fuzzy=True)[0], 0)
+
+    def test_filters_and_facets(self):
+        total, games, _ = self.store.page(filters={"category": "racing", "min_players": 25})
+        self.assertEqual((total, [g["name"] for g in games]), (1, ["Space Racer"]))
+        _, games, _ = self.store.page("racing", filters={"max_rating": 3.5})
+        self.assertEqual([g["name"] for g in games], ["Kart Kings"])
+        _, games, position = self.store.page(sort="-rating", limit=1, filters={"min_rating": 3.5})
+        self.assertEqual(games[0]["name"], "Puzzle Planet")
+        _, games, position = self.store.page(sort="-rating", limit=1, after=position, filters={"min_rating": 3.5})
+        self.assertEqual(([g["name"] for g in games], position), (["Space Racer"], None))
+
+        facets = self.store.facets(filters={"min_rating": 3.5})
+        self.assertEqual(facets["total"], 2)
+        self.assertEqual(facets["category"], {"Puzzle": 1, "Racing": 1})
+        self.assertEqual(facets["rating"]["4-5"], 1)
+        self.assertEqual(facets["rating"]["5+"], 1)
+        self.assertEqual(facets["player_count"]["10-100"], 2)
+        self.assertEqual(self.store.facets("nothing")["total"], 0)
+
+class TestMigration(unittest.TestCase):
+    def test_migrate_from_json(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = os.path.join(tmp_dir, "games.json")
+            with open(source, "w") as f:
+                json.dump([make_game("Alpha"), make_game("Beta")], f)
+            json_store = open_games_store("json", source)
+            json_store.replace("Beta", make_game("Beta", "Puzzle"))
+            json_store.flush()
+
+            target = os.path.join(tmp_dir, "games.db")
+            self.assertEqual(migrate(source, target), 2)
+            store = open_games_store("sqlite", target)
+            self.assertEqual(store.get("Beta")["category"], "Puzzle")
+            self.assertEqual(store.get("Beta")["version"], 2)
+            self.assertEqual(store.search("alpha")[0], 1)
+            store.close()
+
+class TestSqliteEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.headers = {"X-API-Key": "test-api-key"}
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = SqliteGamesStore(os.path.join(self.tmp_dir.name, "games.db"))
+        self.patcher = patch("api.main.games_store", self.store)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_create_search_update(self):
+        response = self.client.post("/api/games", json=make_game("Alpha"), headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        etag = response.headers["ETag"]
+        response = self.client.get("/api/games/search?q=alpha", headers=self.headers)
+        self.assertEqual([g["name"] for g in response.json()], ["Alpha"])
+        response = self.client.put("/api/games/Alpha", json=make_game("Alpha", "Puzzle"),
+                                   headers={**self.headers, "If-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.put("/api/games/Alpha", json=make_game("Alpha", "Puzzle"),
+                                   headers={**self.headers, "If-Match": etag})
+        self.assertEqual(response.status_code, 412)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,301 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from api.main import app
+from api.games_journal import install_snapshot, write_file, write_snapshot
+from api.games_store import GamesStore, NameConflict, VersionMismatch
+
+def make_game(name, category="Action", rating=4.5, player_count=10):
+    return {
+        "name": name,
+        "category": category,
+        "link": f"{name}.html",
+        "description": f"The {name} game.",
+        "rating": rating,
+        "player_count": player_count,
+    }
+
+class TestGamesStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "games.json")
+        self.write_games([make_game("Alpha"), make_game("Beta", "Racing")])
+        self.store = GamesStore(self.path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_games(self, games):
+        with open(self.path, "w") as f:
+            json.dump(games, f)
+
+    def test_loads_once(self):
+        self.assertEqual(len(self.store.all()), 2)
+        self.assertEqual(self.store.get("Beta")["category"], "Racing")
+        self.store.all()
+        self.assertEqual(self.store.loads, 1)
+
+    def test_reloads_when_file_changes(self):
+        self.store.all()
+        self.write_games([make_game("Gamma")])
+        self.assertEqual([g["name"] for g in self.store.all()], ["Gamma"])
+        self.assertEqual(self.store.loads, 2)
+
+    def test_mutations_are_journaled(self):
+        self.store.add(make_game("Gamma"))
+        self.assertTrue(self.store.replace("Alpha", make_game("Alpha", "Puzzle")))
+        self.assertTrue(self.store.remove("Beta"))
+        self.assertFalse(self.store.remove("Beta"))
+        # The snapshot is untouched; the mutations live in the journal.
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)), 2)
+        with open(self.path + ".journal") as f:
+            self.assertEqual(len(f.readlines()), 3)
+        # Our own writes must not force a reparse.
+        self.store.all()
+        self.assertEqual(self.store.loads, 1)
+
+        reopened = GamesStore(self.path)
+        self.assertEqual([g["name"] for g in reopened.all()], ["Alpha", "Gamma"])
+        self.assertEqual(reopened.get("Alpha")["category"], "Puzzle")
+
+    def test_compaction(self):
+        store = GamesStore(self.path, compaction_threshold=2)
+        store.add(make_game("Gamma"))
+        store.remove("Alpha")
+        store.flush()
+        with open(self.path) as f:
+            on_disk = json.load(f)
+        self.assertEqual([g["name"] for g in on_disk], ["Beta", "Gamma"])
+        self.assertFalse(os.path.exists(self.path + ".journal"))
+        self.assertFalse(os.path.exists(self.path + ".journal.compacting"))
+        store.add(make_game("Delta"))
+        self.assertEqual([g["name"] for g in GamesStore(self.path).all()], ["Beta", "Gamma", "Delta"])
+        self.assertEqual(store.loads, 1)
+
+    def test_torn_journal_record_is_ignored(self):
+        self.store.add(make_game("Gamma"))
+        self.store.flush()
+        with open(self.path + ".journal", "a") as f:
+            f.write('{"op":"put","name":"Tor')
+        reopened = GamesStore(self.path)
+        self.assertEqual(len(reopened.all()), 3)
+        reopened.add(make_game("Delta"))
+        self.assertEqual(len(GamesStore(self.path).all()), 4)
+
+    def test_versions(self):
+        self.assertEqual(self.store.get("Alpha")["version"], 1)
+        stored = self.store.replace("Alpha", make_game("Alpha", "Puzzle"), expected_version=1)
+        self.assertEqual(stored["version"], 2)
+        with self.assertRaises(VersionMismatch):
+            self.store.replace("Alpha", make_game("Alpha"), expected_version=1)
+        with self.assertRaises(VersionMismatch):
+            self.store.remove("Alpha", expected_version=1)
+        with self.assertRaises(NameConflict):
+            self.store.add(make_game("Beta"))
+        self.assertEqual(GamesStore(self.path).get("Alpha")["version"], 2)
+
+    def test_sorted_pages_with_offset_cursor(self):
+        self.store.add(dict(make_game("Gamma"), rating=5.0))
+        self.store.add(dict(make_game("Delta"), rating=1.0))
+        total, first, position = self.store.page(sort="-rating", limit=2, after=0)
+        self.assertEqual(total, 4)
+        self.assertEqual([g["name"] for g in first], ["Gamma", "Beta"])
+        self.assertEqual(position, 2)
+        _, second, position = self.store.page(sort="-rating", limit=2, after=position)
+        self.assertEqual([g["name"] for g in second], ["Alpha", "Delta"])
+        self.assertIsNone(position)
+
+    def test_missing_file_is_empty(self):
+        store = GamesStore(os.path.join(self.tmp_dir.name, "missing.json"))
+        self.assertEqual(store.all(), [])
+
+    def test_concurrent_snapshot_writers_use_their_own_temp_files(self):
+        first = write_snapshot(self.path, [make_game("First")])
+        second = write_snapshot(self.path, [make_game("Second")])
+        self.assertNotEqual(first, second)
+        install_snapshot(first, self.path)
+        install_snapshot(second, self.path)
+        with open(self.path) as f:
+            self.assertEqual([game["name"] for game in json.load(f)], ["Second"])
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["games.json"])
+
+    def test_failed_snapshot_write_leaves_no_temp_file(self):
+        def fail(f):
+            f.write(b"[")
+            raise OSError("disk full")
+        with self.assertRaises(OSError):
+            write_file(self.path, fail)
+        with patch("api.games_journal.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                install_snapshot(write_snapshot(self.path, []), self.path)
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["games.json"])
+
+class TestGamesEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.headers = {"X-API-Key": "test-api-key"}
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp_dir.name, "games.json")
+        with open(path, "w") as f:
+            json.dump([make_game("Alpha"), make_game("Beta", "Racing")], f)
+        self.patcher = patch("api.main.games_store", GamesStore(path))
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def test_search_games(self):
+        response = self.client.get("/api/games/search?q=racing", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([g["name"] for g in response.json()], ["Beta"])
+        self.assertEqual(response.headers["X-Total-Count"], "1")
+
+    def test_search_games_pagination(self):
+        response = self.client.get("/api/games/search?q=game&limit=1&offset=1", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(response.headers["X-Total-Count"], "2")
+
+    def test_create_update_delete_game(self):
+        response = self.client.post("/api/games", json=make_game("Gamma"), headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post("/api/games", json=make_game("Gamma"), headers=self.headers)
+        self.assertEqual(response.status_code, 409)
+
+        response = self.client.put("/api/games/Gamma", json=make_game("Gamma", "Puzzle"), headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["category"], "Puzzle")
+        response = self.client.get("/api/games/search?q=puzzle", headers=self.headers)
+        self.assertEqual([g["name"] for g in response.json()], ["Gamma"])
+
+        response = self.client.delete("/api/games/Gamma", headers=self.headers)
+        self.assertEqual(response.status_code, 204)
+        response = self.client.put("/api/games/Gamma", json=make_game("Gamma"), headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_game_etag(self):
+        response = self.client.get("/api/games/Alpha", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["name"], "Alpha")
+        etag = response.headers["ETag"]
+
+        response = self.client.get("/api/games/Alpha", headers={**self.headers, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        response = self.client.get("/api/games/Missing", headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_conflicting_updates_are_rejected(self):
+        etag = self.client.get("/api/games/Alpha", headers=self.headers).headers["ETag"]
+
+        # Two writers read the same version; only the first one wins.
+        first = self.client.put("/api/games/Alpha", json=make_game("Alpha", "Puzzle"),
+                                headers={**self.headers, "If-Match": etag})
+        self.assertEqual(first.status_code, 200)
+        self.assertNotEqual(first.headers["ETag"], etag)
+        second = self.client.put("/api/games/Alpha", json=make_game("Alpha", "Sports"),
+                                 headers={**self.headers, "If-Match": etag})
+        self.assertEqual(second.status_code, 412)
+
+        response = self.client.delete("/api/games/Alpha", headers={**self.headers, "If-Match": etag})
+        self.assertEqual(response.status_code, 412)
+        response = self.client.delete("/api/games/Alpha", headers={**self.headers, "If-Match": first.headers["ETag"]})
+        self.assertEqual(response.status_code, 204)
+
+    def test_rename_onto_existing_game(self):
+        response = self.client.put("/api/games/Alpha", json=make_game("Beta"), headers=self.headers)
+        self.assertEqual(response.status_code, 409)
+
+    def test_search_sorted_with_cursor(self):
+        for i, name in enumerate(["Gamma", "Delta", "Epsilon"]):
+            game = dict(make_game(name), rating=i, player_count=100 - i)
+            self.client.post("/api/games", json=game, headers=self.headers)
+
+        names = []
+        cursor = None
+        while True:
+            params = {"sort": "-rating", "limit": 2, "fields": "name,rating"}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get("/api/games/search", params=params, headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+            for game in response.json():
+                self.assertEqual(set(game), {"name", "rating"})
+                names.append(game["name"])
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        # Descending order reverses the (rating, name) key, ties included.
+        self.assertEqual(names, ["Beta", "Alpha", "Epsilon", "Delta", "Gamma"])
+
+        response = self.client.get("/api/games/search", params={"sort": "player_count", "limit": 1}, headers=self.headers)
+        self.assertEqual(response.json()[0]["name"], "Alpha")
+
+    def test_search_cursor_with_query(self):
+        response = self.client.get("/api/games/search", params={"q": "game", "limit": 1}, headers=self.headers)
+        first = response.json()
+        cursor = response.headers["X-Next-Cursor"]
+        response = self.client.get("/api/games/search", params={"q": "game", "limit": 1, "cursor": cursor}, headers=self.headers)
+        self.assertEqual(len(response.json()), 1)
+        self.assertNotEqual(response.json(), first)
+        self.assertNotIn("X-Next-Cursor", response.headers)
+
+    def test_fuzzy_search(self):
+        self.client.post("/api/games", json=make_game("Minecraft"), headers=self.headers)
+        response = self.client.get("/api/games/search", params={"q": "minecarft"}, headers=self.headers)
+        self.assertEqual(response.json(), [])
+        response = self.client.get("/api/games/search", params={"q": "minecarft", "fuzzy": "true"}, headers=self.headers)
+        self.assertEqual([g["name"] for g in response.json()], ["Minecraft"])
+        response = self.client.get("/api/games/search", params={"q": "alpah", "fuzzy": "true", "similarity": 0.3}, headers=self.headers)
+        self.assertEqual([g["name"] for g in response.json()], ["Alpha"])
+        response = self.client.get("/api/games/search", params={"q": "alpha", "fuzzy": "true", "similarity": 2}, headers=self.headers)
+        self.assertEqual(response.status_code, 422)
+
+    def test_search_filters(self):
+        self.client.post("/api/games", json=make_game("Gamma", "Racing", rating=2.0, player_count=5000), headers=self.headers)
+        self.client.post("/api/games", json=make_game("Delta", "Puzzle", rating=3.5, player_count=50), headers=self.headers)
+
+        def names(**params):
+            response = self.client.get("/api/games/search", params=params, headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+            return [g["name"] for g in response.json()]
+
+        self.assertEqual(names(category="racing"), ["Beta", "Gamma"])
+        self.assertEqual(names(min_rating=3, max_rating=4), ["Delta"])
+        self.assertEqual(names(min_players=50, sort="-player_count"), ["Gamma", "Delta"])
+        self.assertEqual(names(q="game", category="Racing", max_rating=3), ["Gamma"])
+        self.assertEqual(names(min_rating=4, sort="rating", limit=1), ["Alpha"])
+        response = self.client.get("/api/games/search", params={"min_rating": 4, "sort": "rating", "limit": 1}, headers=self.headers)
+        self.assertEqual(response.headers["X-Total-Count"], "2")
+        cursor = response.headers["X-Next-Cursor"]
+        self.assertEqual(names(min_rating=4, sort="rating", limit=1, cursor=cursor), ["Beta"])
+
+    def test_facets(self):
+        self.client.post("/api/games", json=make_game("Gamma", "Racing", rating=2.0, player_count=5000), headers=self.headers)
+        response = self.client.get("/api/games/facets", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        facets = response.json()
+        self.assertEqual(facets["total"], 3)
+        self.assertEqual(facets["category"], {"Action": 1, "Racing": 2})
+        self.assertEqual(facets["rating"], {"0-1": 0, "1-2": 0, "2-3": 1, "3-4": 0, "4-5": 2, "5+": 0})
+        self.assertEqual(facets["player_count"]["10-100"], 2)
+        self.assertEqual(facets["player_count"]["1000-10000"], 1)
+
+        facets = self.client.get("/api/games/facets", params={"category": "racing", "min_rating": 3}, headers=self.headers).json()
+        self.assertEqual(facets["total"], 1)
+        self.assertEqual(facets["category"], {"Racing": 1})
+        self.assertEqual(facets["rating"]["4-5"], 1)
+
+    def test_search_invalid_parameters(self):
+        for params in ({"fields": "name,secret"}, {"sort": "name"}, {"cursor": "not-a-cursor"}, {"sort": "rating", "cursor": "WyJ4IiwxXQ"}):
+            response = self.client.get("/api/games/search", params=params, headers=self.headers)
+            self.assertEqual(response.status_code, 400, params)
+
+if __name__ == '__main__':
+    unittest.main()
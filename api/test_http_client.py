@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+import httpx
+from api.http_client import UpstreamClient
+
+class CountingTransport(httpx.AsyncBaseTransport):
+    """
+    Answers every request after a short delay and records the highest
+    number of requests in flight per host.
+    """
+
+    def __init__(self):
+        self.in_flight = {}
+        self.peak = {}
+
+    async def handle_async_request(self, request):
+        host = request.url.host
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+        self.peak[host] = max(self.peak.get(host, 0), self.in_flight[host])
+        await asyncio.sleep(0.01)
+        self.in_flight[host] -= 1
+        return httpx.Response(200, json={"host": host})
+
+class TestUpstreamClient(unittest.TestCase):
+    def test_per_host_limit(self):
+        transport = CountingTransport()
+        client = UpstreamClient(max_connections_per_host=3, transport=transport)
+
+        async def run():
+            urls = [f"https://{host}/item/{i}" for i in range(10) for host in ("a.example", "b.example")]
+            responses = await asyncio.gather(*(client.get(url) for url in urls))
+            await client.aclose()
+            return responses
+
+        responses = asyncio.run(run())
+        self.assertEqual(len(responses), 20)
+        self.assertEqual(transport.peak, {"a.example": 3, "b.example": 3})
+
+    def test_client_is_reused_within_a_loop(self):
+        client = UpstreamClient(transport=httpx.MockTransport(lambda request: httpx.Response(204)))
+
+        async def run():
+            await client.get("https://a.example/")
+            first = client._client
+            await client.get("https://a.example/")
+            return first is client._client, first
+
+        reused, first = asyncio.run(run())
+        self.assertTrue(reused)
+        # A new event loop gets a new pool.
+        reused, second = asyncio.run(run())
+        self.assertIsNot(first, second)
+
+    def test_timeouts(self):
+        client = UpstreamClient(timeout=2.5, connect_timeout=1.0)
+        self.assertEqual((client.timeout.read, client.timeout.connect), (2.5, 1.0))
+
+if __name__ == '__main__':
+    unittest.main()
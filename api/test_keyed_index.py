@@ -0,0 +1,42 @@
+import unittest
+from api.keyed_index import KeyedIndex
+
+class RecordingIndex(KeyedIndex):
+    def __init__(self):
+        super().__init__(group=lambda doc: doc["group"])
+        self.calls = []
+
+    def _index(self, doc_id, doc):
+        self.calls.append(("index", doc_id))
+
+    def _unindex(self, doc_id, doc):
+        self.calls.append(("unindex", doc_id))
+
+def doc(doc_id, group, value=0):
+    return {"id": doc_id, "group": group, "value": value}
+
+class TestKeyedIndex(unittest.TestCase):
+    def test_only_changed_documents_are_reindexed(self):
+        index = RecordingIndex()
+        feed = [doc("a", 1), doc("b", 1), doc("c", 2)]
+        index.refresh(feed)
+        index.calls.clear()
+        index.refresh(feed)
+        self.assertEqual(index.calls, [])
+        index.refresh([doc("a", 1), doc("b", 1, 5), doc("d", 2)])
+        self.assertEqual(index.calls, [("unindex", "c"), ("unindex", "b"), ("index", "b"), ("index", "d")])
+        self.assertEqual(index.indexed, 5)
+
+    def test_feed_order_is_kept(self):
+        index = RecordingIndex()
+        index.refresh([doc("a", 1), doc("b", 2), doc("c", 1)])
+        index.refresh([doc("a", 1), doc("b", 1, 5), doc("c", 1)])
+        self.assertEqual(list(index.docs()), ["a", "b", "c"])
+        self.assertEqual(list(index.docs(1)), ["a", "b", "c"])
+        self.assertEqual(index.docs(2), {})
+        index.refresh([doc("c", 1), doc("a", 1)])
+        self.assertEqual(list(index.docs()), ["c", "a"])
+        self.assertEqual(len(index), 2)
+
+if __name__ == '__main__':
+    unittest.main()
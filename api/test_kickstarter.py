@@ -1,15 +1,27 @@
-import unittest
-from unittest.mock import patch, mock_open
-from api import kickstarter
 import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from api import data_files, kickstarter
 
 class TestKickstarter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.patcher = patch.object(data_files, "registry", data_files.DataFileRegistry([self.tmp_dir.name]))
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def test_get_projects_success(self):
+        with open(os.path.join(self.tmp_dir.name, "kickstarter_projects.json"), "w") as f:
+            json.dump([
+                {"title": "Test Project 1", "blurb": "A test blurb", "link": "http://test.com/1"},
+                {"title": "Another Project", "blurb": "Another blurb", "link": "http://test.com/2"}
+            ], f)
 
-    @patch('builtins.open', new_callable=mock_open, read_data=json.dumps([
-        {"title": "Test Project 1", "blurb": "A test blurb", "link": "http://test.com/1"},
-        {"title": "Another Project", "blurb": "Another blurb", "link": "http://test.com/2"}
-    ]))
-    def test_get_projects_success(self, mock_file):
         # Call the function with a query that matches one project
         projects = kickstarter.get_projects("test")
         self.assertEqual(len(projects), 1)
@@ -19,8 +31,7 @@ class TestKickstarter(unittest.TestCase):
         projects = kickstarter.get_projects("")
         self.assertEqual(len(projects), 2)
 
-    @patch('builtins.open', side_effect=FileNotFoundError)
-    def test_get_projects_file_not_found(self, mock_file):
+    def test_get_projects_file_not_found(self):
         # Call the function with a query that matches one project in the default list
         projects = kickstarter.get_projects("awesome")
         self.assertEqual(len(projects), 1)
@@ -34,5 +45,27 @@ class TestKickstarter(unittest.TestCase):
         projects = kickstarter.get_projects("")
         self.assertEqual(len(projects), 2)
 
+    def test_get_projects_fuzzy(self):
+        self.assertEqual(kickstarter.get_projects("awsome game"), [])
+        projects = kickstarter.get_projects("awsome game", fuzzy=True)
+        self.assertEqual([p['title'] for p in projects], ['Awesome Game Project'])
+        projects = kickstarter.get_projects("indy rpg", fuzzy=True, similarity=0.3)
+        self.assertEqual(projects[0]['title'], 'Indie RPG Adventure')
+
+    def test_fuzzy_title_index_is_built_once_per_file_version(self):
+        path = os.path.join(self.tmp_dir.name, "kickstarter_projects.json")
+        with open(path, "w") as f:
+            json.dump([{"title": "Space Miner", "blurb": "", "link": ""}], f)
+        with patch.object(kickstarter, "_index_titles", wraps=kickstarter._index_titles) as build:
+            kickstarter.get_projects("spce miner", fuzzy=True)
+            kickstarter.get_projects("space minr", fuzzy=True)
+            self.assertEqual(build.call_count, 1)
+            with open(path, "w") as f:
+                json.dump([{"title": "Ocean Diver", "blurb": "", "link": ""}], f)
+            data_files.registry.invalidate(kickstarter.PROJECTS_FILE)
+            projects = kickstarter.get_projects("ocean divr", fuzzy=True)
+            self.assertEqual(build.call_count, 2)
+        self.assertEqual([p['title'] for p in projects], ['Ocean Diver'])
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,46 +1,42 @@
 import unittest
-from unittest.mock import patch, Mock
+from unittest.mock import patch
+import httpx
+import pytest
 from fastapi.testclient import TestClient
 from api.main import app
+from api import response_cache
+from api.response_cache import ResponseCache
 
+@pytest.mark.usefixtures("mock_upstream")
 class TestMakeupAPI(unittest.TestCase):
     def setUp(self):
         self.client = TestClient(app)
         self.api_key = "test-api-key"
         self.headers = {"X-API-Key": self.api_key}
+        patcher = patch.object(response_cache, "cache", ResponseCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
-    @patch('requests.get')
-    def test_get_makeup_products(self, mock_get):
-        # Mock the response from the makeup API
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = [{"id": 1, "name": "Test Lipstick"}]
-        mock_get.return_value = mock_response
-
-        # Call the endpoint
-        response = self.client.get("/api/makeup/products", headers=self.headers)
+    def test_get_makeup_products(self):
+        # Mock the response from the makeup API and call the endpoint
+        with self.mock_upstream(lambda request: httpx.Response(200, json=[{"id": 1, "name": "Test Lipstick"}])):
+            response = self.client.get("/api/makeup/products", headers=self.headers)
 
         # Assert the response
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), [{"id": 1, "name": "Test Lipstick"}])
 
-    @patch('requests.get')
-    def test_get_makeup_products_with_filter(self, mock_get):
-        # Mock the response from the makeup API
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = [{"id": 2, "name": "Test Foundation", "brand": "maybelline"}]
-        mock_get.return_value = mock_response
-
-        # Call the endpoint with a filter
-        response = self.client.get("/api/makeup/products?brand=maybelline", headers=self.headers)
+    def test_get_makeup_products_with_filter(self):
+        # Mock the response from the makeup API and call the endpoint with a filter
+        with self.mock_upstream(lambda request: httpx.Response(200, json=[{"id": 2, "name": "Test Foundation", "brand": "maybelline"}])):
+            response = self.client.get("/api/makeup/products?brand=maybelline", headers=self.headers)
 
         # Assert the response
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), [{"id": 2, "name": "Test Foundation", "brand": "maybelline"}])
 
-        # Assert that requests.get was called with the correct parameters
-        mock_get.assert_called_with(
-            "http://makeup-api.herokuapp.com/api/v1/products.json",
-            params={"brand": "maybelline"}
+        # Assert that the upstream was called with the correct parameters
+        self.assertEqual(
+            str(self.mock_upstream.requests[-1].url),
+            "http://makeup-api.herokuapp.com/api/v1/products.json?brand=maybelline"
         )
@@ -1,8 +1,10 @@
 import pytest
 from fastapi.testclient import TestClient
 from api.main import app
+from api.marketplace import MarketplaceStore
 import os
 import json
+from unittest.mock import patch
 
 client = TestClient(app)
 
@@ -48,3 +50,61 @@ def test_get_dynamic_offers_grinder():
     assert isinstance(data, list)
     for item in data:
         assert item["category"] == "Tools"
+
+def make_item(name, item_id=None):
+    return {"id": item_id, "name": name, "category": "Tools", "price": 100, "description": "", "image": ""}
+
+def test_marketplace_store_index(tmp_path):
+    path = tmp_path / "items.json"
+    path.write_text(json.dumps([make_item("Shovel", 1), make_item("Skin", 5)]))
+    store = MarketplaceStore(str(path), revalidate_interval=0)
+    assert store.get(5)["name"] == "Skin"
+    assert store.get(2) is None
+    assert store.allocate_id() == 6
+
+    assert store.remove(5)
+    assert not store.remove(5)
+    # Ids are never reused, even after the highest one was deleted.
+    assert store.allocate_id() == 7
+    assert store.add(make_item("Blueprint", 3))
+    assert not store.add(make_item("Copy", 3))
+    # Changes go to the journal; the snapshot is not rewritten.
+    assert [item["id"] for item in json.loads(path.read_text())] == [1, 5]
+    assert [item["id"] for item in MarketplaceStore(str(path)).all()] == [1, 3]
+
+    path.write_text(json.dumps([make_item("Replaced", 10)]))
+    assert store.get(10)["name"] == "Replaced"
+    assert store.get(1) is None
+
+def test_marketplace_compaction(tmp_path):
+    path = tmp_path / "items.json"
+    path.write_text(json.dumps([make_item("Shovel", 1)]))
+    store = MarketplaceStore(str(path), compaction_threshold=3)
+    store.add(make_item("Skin", 2))
+    store.remove(1)
+    assert [item["id"] for item in json.loads(path.read_text())] == [1]
+    store.add(make_item("Blueprint", 3))
+    assert [item["id"] for item in json.loads(path.read_text())] == [2, 3]
+    assert not os.path.exists(f"{path}.journal")
+    assert [item["id"] for item in store.all()] == [2, 3]
+    assert [item["id"] for item in MarketplaceStore(str(path)).all()] == [2, 3]
+
+def test_failed_write_changes_nothing(tmp_path, api_key_headers):
+    path = tmp_path / "items.json"
+    path.write_text(json.dumps([make_item("Shovel", 1)]))
+    store = MarketplaceStore(str(path))
+    with patch.object(store._journal, "append", side_effect=OSError("disk full")), \
+            patch("api.marketplace.store", store):
+        with pytest.raises(OSError):
+            store.add(make_item("Skin", 2))
+        assert store.get(2) is None
+        response = client.delete("/api/marketplace/1", headers=api_key_headers)
+        assert response.status_code == 500
+        assert store.get(1)["name"] == "Shovel"
+        response = client.post("/api/marketplace/", json=make_item("Skin", 2), headers=api_key_headers)
+        assert response.status_code == 500
+        assert store.get(2) is None
+
+def test_get_missing_marketplace_item():
+    response = client.get("/api/marketplace/999999")
+    assert response.status_code == 404
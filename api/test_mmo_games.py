@@ -1,35 +1,44 @@
+import asyncio
 import unittest
 from unittest.mock import patch
-import requests
-from api import mmo_games
+import httpx
+import pytest
+from api import mmo_games, response_cache
+from api.response_cache import ResponseCache
 
+@pytest.mark.usefixtures("mock_upstream")
 class TestMMOGames(unittest.TestCase):
 
-    @patch('api.mmo_games.requests.get')
-    def test_get_all_games(self, mock_get):
+    def setUp(self):
+        patcher = patch.object(response_cache, "cache", ResponseCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_all_games(self):
         # Mock the API response
-        mock_response = unittest.mock.Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = [
-            {"id": 1, "title": "Test Game 1"},
-            {"id": 2, "title": "Test Game 2"}
-        ]
-        mock_get.return_value = mock_response
+        def handler(request):
+            self.assertEqual(str(request.url), mmo_games.MMO_GAMES_URL)
+            return httpx.Response(200, json=[
+                {"id": 1, "title": "Test Game 1"},
+                {"id": 2, "title": "Test Game 2"}
+            ])
 
         # Call the function
-        games = mmo_games.get_all_games()
+        with self.mock_upstream(handler):
+            games = asyncio.run(mmo_games.get_all_games())
 
         # Assert the results
         self.assertEqual(len(games), 2)
         self.assertEqual(games[0]['title'], 'Test Game 1')
 
-    @patch('api.mmo_games.requests.get')
-    def test_get_all_games_api_error(self, mock_get):
+    def test_get_all_games_api_error(self):
         # Mock an API error
-        mock_get.side_effect = requests.exceptions.RequestException("API is down")
+        def handler(request):
+            raise httpx.ConnectError("API is down")
 
         # Call the function
-        games = mmo_games.get_all_games()
+        with self.mock_upstream(handler):
+            games = asyncio.run(mmo_games.get_all_games())
 
         # Assert the results
         self.assertEqual(games, [])
@@ -1,31 +1,96 @@
-import unittest
-from unittest.mock import patch, mock_open
-from api import patreon
 import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from api import data_files, patreon
+from api.patreon import PatronIndex, PledgeStats
+
+def make_pledge(pledge_id, campaign_id, amount_cents):
+    return {
+        "id": pledge_id,
+        "type": "pledge",
+        "attributes": {"amount_cents": amount_cents},
+        "relationships": {"campaign": {"data": {"id": campaign_id, "type": "campaign"}}},
+    }
 
 class TestPatreon(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.patcher = patch.object(data_files, "registry", data_files.DataFileRegistry([self.tmp_dir.name]))
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def write_data(self, filename, data):
+        with open(os.path.join(self.tmp_dir.name, filename), "w") as f:
+            json.dump(data, f)
 
-    @patch('builtins.open', new_callable=mock_open, read_data=json.dumps([
-        {"id": "1", "attributes": {"creation_name": "Campaign 1"}}
-    ]))
-    def test_get_campaigns_success(self, mock_file):
+    def test_get_campaigns_success(self):
+        self.write_data("patreon_campaigns.json", [
+            {"id": "1", "attributes": {"creation_name": "Campaign 1"}}
+        ])
         campaigns = patreon.get_campaigns()
         self.assertEqual(len(campaigns), 1)
         self.assertEqual(campaigns[0]['attributes']['creation_name'], 'Campaign 1')
 
-    @patch('builtins.open', side_effect=FileNotFoundError)
-    def test_get_campaigns_file_not_found(self, mock_file):
+    def test_get_campaigns_file_not_found(self):
         campaigns = patreon.get_campaigns()
         self.assertEqual(len(campaigns), 1)
         self.assertEqual(campaigns[0]['attributes']['creation_name'], 'My Awesome Project')
 
-    @patch('builtins.open', new_callable=mock_open, read_data=json.dumps([
-        {"id": "101", "attributes": {"amount_cents": 500}}
-    ]))
-    def test_get_patrons_success(self, mock_file):
+    def test_get_patrons_success(self):
+        self.write_data("patreon_patrons.json", [make_pledge("101", "1", 500), make_pledge("102", "2", 1000)])
         patrons = patreon.get_patrons("1")
         self.assertEqual(len(patrons), 1)
         self.assertEqual(patrons[0]['attributes']['amount_cents'], 500)
+        self.assertEqual(patreon.get_patrons("3"), [])
+
+    def test_get_campaign_stats(self):
+        self.write_data("patreon_campaigns.json", [{"id": "1"}, {"id": "2"}])
+        self.write_data("patreon_patrons.json", [make_pledge("101", "1", 500), make_pledge("102", "1", 1500)])
+        stats = patreon.get_campaign_stats("1")
+        self.assertEqual(stats["patron_count"], 2)
+        self.assertEqual(stats["amount_cents"]["total"], 2000)
+        self.assertEqual(patreon.get_campaign_stats("2")["patron_count"], 0)
+        self.assertIsNone(patreon.get_campaign_stats("9"))
+
+class TestPatronIndex(unittest.TestCase):
+    def test_percentiles(self):
+        stats = PledgeStats()
+        for amount in range(100, 1100, 100):
+            stats.add(amount)
+        stats.remove(1000)
+        self.assertEqual(stats.percentile(50), 500)
+        self.assertEqual(stats.percentile(90), 900)
+        self.assertEqual(stats.total, 4500)
+        self.assertIsNone(PledgeStats().percentile(50))
+
+    def test_incremental_refresh(self):
+        index = PatronIndex()
+        pledges = [make_pledge(str(i), "1" if i % 2 else "2", i * 100) for i in range(1, 7)]
+        index.refresh(pledges)
+        self.assertEqual(index.indexed, 6)
+        self.assertEqual(index.stats("1")["amount_cents"]["total"], 900)
+
+        # One pledge moves campaign, one is dropped and one is new.
+        updated = pledges[:4] + [make_pledge("5", "2", 500), make_pledge("7", "1", 50)]
+        index.refresh(updated)
+        self.assertEqual(index.indexed, 8)
+        self.assertEqual(index.stats("1")["patron_count"], 3)
+        self.assertEqual(index.stats("1")["amount_cents"]["min"], 50)
+        self.assertEqual(index.stats("2")["amount_cents"]["total"], 1100)
+        self.assertEqual([p["id"] for p in index.patrons("2")], ["2", "4", "5"])
+
+    def test_changed_pledge_keeps_its_position(self):
+        index = PatronIndex()
+        pledges = [make_pledge(str(i), "1", i * 100) for i in range(1, 5)]
+        index.refresh(pledges)
+        index.refresh([pledges[0], make_pledge("2", "1", 5000)] + pledges[2:])
+        self.assertEqual([p["id"] for p in index.patrons("1")], ["1", "2", "3", "4"])
+        self.assertEqual(index.stats("1")["amount_cents"]["max"], 5000)
 
 if __name__ == '__main__':
     unittest.main()
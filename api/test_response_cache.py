@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+import httpx
+from api import http_client
+from api.http_client import UpstreamClient
+from api.response_cache import ResponseCache, cache_key
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResponseCache(max_bytes=100, clock=self.clock)
+        self.calls = 0
+
+    async def fetch(self):
+        self.calls += 1
+        return f"value {self.calls}", 10
+
+    def get(self, key="a", **kwargs):
+        async def run():
+            value = await self.cache.get_or_fetch(cache_key(key), self.fetch, **kwargs)
+            await self.cache.wait_for_refreshes()
+            return value
+        return asyncio.run(run())
+
+    def test_fresh_hit(self):
+        self.assertEqual(self.get(ttl=10), "value 1")
+        self.clock.now = 9
+        self.assertEqual(self.get(ttl=10), "value 1")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_stale_while_revalidate(self):
+        self.get(ttl=10, stale_ttl=5)
+        self.clock.now = 12
+        # The stale copy is returned while the refresh runs in the background.
+        self.assertEqual(self.get(ttl=10, stale_ttl=5), "value 1")
+        self.assertEqual((self.cache.stale_hits, self.cache.refreshes), (1, 1))
+        self.assertEqual(self.get(ttl=10, stale_ttl=5), "value 2")
+        self.clock.now = 40
+        self.assertEqual(self.get(ttl=10, stale_ttl=5), "value 3")
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_failed_refresh_keeps_stale_copy(self):
+        self.get(ttl=10)
+        self.clock.now = 11
+
+        async def failing():
+            raise httpx.ConnectError("down")
+        self.fetch = failing
+        self.assertEqual(self.get(ttl=10), "value 1")
+        self.assertEqual(self.cache.refresh_errors, 1)
+        self.assertEqual(self.get(ttl=10), "value 1")
+
+    def test_lru_eviction(self):
+        for key in "abcdefghij":
+            self.get(key)
+        self.get("a")
+        self.get("k")
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual(self.cache.stats()["bytes"], 100)
+        calls = self.calls
+        self.get("a")
+        self.assertEqual(self.calls, calls)
+        self.get("b")
+        self.assertEqual(self.calls, calls + 1)
+
+    def test_get_json_keys_by_params_and_skips_errors(self):
+        requests = []
+
+        def handler(request):
+            requests.append(str(request.url))
+            if request.url.params.get("brand") == "broken":
+                return httpx.Response(500)
+            return httpx.Response(200, json={"brand": request.url.params.get("brand")})
+
+        async def run():
+            values = [
+                await self.cache.get_json("https://up.example/p", params={"brand": "x"}),
+                await self.cache.get_json("https://up.example/p", params={"brand": "x"}),
+                await self.cache.get_json("https://up.example/p", params={"brand": "y"}),
+            ]
+            for _ in range(2):
+                with self.assertRaises(httpx.HTTPStatusError):
+                    await self.cache.get_json("https://up.example/p", params={"brand": "broken"})
+            return values
+
+        with patch.object(http_client, "client", UpstreamClient(transport=httpx.MockTransport(handler))):
+            values = asyncio.run(run())
+        self.assertEqual(values, [{"brand": "x"}, {"brand": "x"}, {"brand": "y"}])
+        self.assertEqual(len(requests), 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from api.search_index import InvertedIndex, TrigramIndex, tokenize, trigrams
+
+FIELDS = {"name": 3.0, "category": 2.0, "description": 1.0}
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = InvertedIndex(FIELDS)
+        self.index.rebuild([
+            ("Space Racer", {"name": "Space Racer", "category": "Racing", "description": "Race through space."}),
+            ("Kart Kings", {"name": "Kart Kings", "category": "Racing", "description": "Kart racing with friends."}),
+            ("Puzzle Planet", {"name": "Puzzle Planet", "category": "Puzzle", "description": "Solve puzzles in space."}),
+        ])
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Counter-Strike: GO"), ["counter", "strike", "go"])
+        self.assertEqual(tokenize(None), [])
+
+    def test_ranks_name_matches_first(self):
+        total, ids = self.index.search("space")
+        self.assertEqual(total, 2)
+        self.assertEqual(ids[0], "Space Racer")
+
+    def test_prefix_match(self):
+        total, ids = self.index.search("puz")
+        self.assertEqual(ids, ["Puzzle Planet"])
+
+    def test_all_tokens_must_match(self):
+        total, ids = self.index.search("racing space")
+        self.assertEqual(ids, ["Space Racer"])
+        self.assertEqual(self.index.search("racing unknown"), (0, []))
+
+    def test_pagination(self):
+        total, first = self.index.search("racing", limit=1)
+        _, second = self.index.search("racing", limit=1, offset=1)
+        self.assertEqual(total, 2)
+        self.assertEqual(len(first + second), 2)
+        self.assertNotEqual(first, second)
+
+    def test_incremental_updates(self):
+        self.index.remove("Kart Kings")
+        self.assertEqual(self.index.search("kart"), (0, []))
+        self.index.add("Kart Kings", {"name": "Kart Kings", "category": "Arcade", "description": ""})
+        self.assertEqual(self.index.search("arcade"), (1, ["Kart Kings"]))
+        self.assertEqual(self.index.search("racing")[1], ["Space Racer"])
+        self.assertEqual(len(self.index), 3)
+
+class TestTrigramIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = TrigramIndex()
+        self.index.rebuild((name, name) for name in ["Minecraft", "Minecart Mania", "Mine Sweeper", "Portal"])
+
+    def test_trigrams(self):
+        self.assertEqual(trigrams("Go"), {"  g", " go", "go "})
+
+    def test_typo_tolerant_match(self):
+        total, ids = self.index.search("minecarft")
+        self.assertEqual(ids[0], "Minecraft")
+        self.assertNotIn("Portal", ids)
+        self.assertEqual(self.index.search("portl"), (1, ["Portal"]))
+
+    def test_threshold(self):
+        self.assertIn("Mine Sweeper", self.index.search("minecraft", threshold=0.3)[1])
+        self.assertEqual(self.index.search("minecraft", threshold=1.0)[1], ["Minecraft"])
+
+    def test_incremental_updates(self):
+        self.index.remove("Portal")
+        self.assertEqual(self.index.search("portal"), (0, []))
+        self.index.add("Portal", "Portal 2")
+        self.assertEqual(self.index.search("portal")[1], ["Portal"])
+        self.assertEqual(len(self.index), 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+import httpx
+from api import http_client, single_flight, unesco, wescore
+from api.http_client import UpstreamClient
+from api.response_cache import ResponseCache
+from api.single_flight import SingleFlight
+
+class SlowTransport(httpx.AsyncBaseTransport):
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.requests = []
+
+    async def handle_async_request(self, request):
+        self.requests.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(self.status_code, json={"url": str(request.url)})
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.group = SingleFlight()
+        self.calls = 0
+
+    async def call(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"call": self.calls}
+
+    def test_concurrent_calls_share_one_result(self):
+        async def run():
+            results = await asyncio.gather(*(self.group.do("k", self.call) for _ in range(10)))
+            # Once finished, the next call is issued again.
+            results.append(await self.group.do("k", self.call))
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual(results[:10], [{"call": 1}] * 10)
+        self.assertEqual(results[10], {"call": 2})
+        self.assertEqual(self.group.stats(), {"issued": 2, "coalesced": 9, "in_flight": 0})
+
+    def test_keys_are_independent(self):
+        async def run():
+            await asyncio.gather(self.group.do("a", self.call), self.group.do("b", self.call))
+        asyncio.run(run())
+        self.assertEqual((self.group.issued, self.group.coalesced), (2, 0))
+
+    def test_errors_are_shared(self):
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise httpx.ConnectError("down")
+
+        async def run():
+            return await asyncio.gather(*(self.group.do("k", failing) for _ in range(3)), return_exceptions=True)
+
+        errors = asyncio.run(run())
+        self.assertTrue(all(isinstance(error, httpx.ConnectError) for error in errors))
+        self.assertEqual(self.group.issued, 1)
+
+    def test_cancelled_caller_does_not_cancel_others(self):
+        async def run():
+            first = asyncio.ensure_future(self.group.do("k", self.call))
+            second = asyncio.ensure_future(self.group.do("k", self.call))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        self.assertEqual(asyncio.run(run()), {"call": 1})
+
+    def test_cache_misses_are_coalesced(self):
+        transport = SlowTransport()
+        cache = ResponseCache()
+
+        async def run():
+            return await asyncio.gather(*(cache.get_json("https://up.example/list") for _ in range(5)))
+
+        with patch.object(http_client, "client", UpstreamClient(transport=transport)):
+            asyncio.run(run())
+        self.assertEqual(len(transport.requests), 1)
+        self.assertEqual(cache.stats()["coalesced"], 4)
+
+class TestCoalescedIntegrations(unittest.TestCase):
+    def setUp(self):
+        self.transport = SlowTransport()
+        for patcher in (
+            patch.object(http_client, "client", UpstreamClient(transport=self.transport)),
+            patch.object(single_flight, "group", SingleFlight()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_unesco_datasets(self):
+        async def run():
+            return await asyncio.gather(*(unesco.get_datasets() for _ in range(8)))
+
+        results = asyncio.run(run())
+        self.assertEqual(len(self.transport.requests), 1)
+        self.assertEqual(len(results), 8)
+        self.assertEqual(single_flight.group.stats()["coalesced"], 7)
+
+    @patch("api.wescore.get_wescore_credentials", return_value={"api_key": "k", "api_secret": "s"})
+    def test_wescore_scores(self, _):
+        async def run():
+            return await asyncio.gather(*(wescore.get_live_scores() for _ in range(8)), wescore.get_all_fixtures())
+
+        asyncio.run(run())
+        self.assertEqual(len(self.transport.requests), 2)
+        self.assertEqual(single_flight.group.stats(), {"issued": 2, "coalesced": 7, "in_flight": 0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from api.sorted_index import SortedIndex
+
+class TestSortedIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SortedIndex("rating")
+        self.index.rebuild([
+            ("a", {"rating": 3}),
+            ("b", {"rating": 1}),
+            ("c", {"rating": 3}),
+            ("d", {"rating": 2}),
+        ])
+
+    def test_ascending_pages(self):
+        first = self.index.page(2)
+        self.assertEqual(first, [(1, "b"), (2, "d")])
+        self.assertEqual(self.index.page(2, after=first[-1]), [(3, "a"), (3, "c")])
+        self.assertEqual(self.index.page(2, after=(3, "c")), [])
+
+    def test_descending_pages(self):
+        first = self.index.page(3, descending=True)
+        self.assertEqual(first, [(3, "c"), (3, "a"), (2, "d")])
+        self.assertEqual(self.index.page(3, after=first[-1], descending=True), [(1, "b")])
+
+    def test_add_and_remove(self):
+        self.index.remove("a", {"rating": 3})
+        self.index.add("e", {"rating": 2.5})
+        self.assertEqual([key[1] for key in self.index.page(None)], ["b", "d", "e", "c"])
+        self.assertEqual(len(self.index), 4)
+
+    def test_ranges(self):
+        self.assertEqual(self.index.range(2, 3), ["d", "a", "c"])
+        self.assertEqual(self.index.range(high=2), ["b", "d"])
+        self.assertEqual(self.index.count(low=2.5), 2)
+        self.assertEqual(self.index.count(4), 0)
+
+    def test_filter(self):
+        docs = {"a": {"rating": 3}, "b": {"rating": 1}, "c": {"rating": 3}, "d": {"rating": 2}}
+        self.assertEqual(self.index.filter(None, docs, low=3), {"a", "c"})
+        self.assertEqual(self.index.filter({"a", "b"}, docs, high=2), {"b"})
+        self.assertEqual(self.index.filter({"a", "b", "c", "d"}, docs, low=2, high=2), {"d"})
+
+    def test_histogram(self):
+        self.assertEqual(self.index.histogram([0, 2, 3]), [1, 1, 2])
+
+if __name__ == '__main__':
+    unittest.main()
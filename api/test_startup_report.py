@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+import unittest
+from api.startup_report import parse_importtime, summarize
+
+# SDKs that must only be imported by the first request that needs them.
+LAZY_MODULES = ["web3", "stripe", "google.cloud.storage", "facebook_business", "bs4", "github", "numpy"]
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     _io
+import time:       200 |        300 |   json.decoder
+import time:       400 |        700 | json
+import time:      1000 |       1000 | api
+"""
+
+class TestStartupReport(unittest.TestCase):
+    def test_parse_and_summarize(self):
+        timings = parse_importtime(SAMPLE)
+        self.assertEqual([(t.module, t.depth) for t in timings], [("_io", 2), ("json.decoder", 1), ("json", 0), ("api", 0)])
+        summary = summarize(timings, top=2)
+        self.assertEqual(summary["total_ms"], 1.7)
+        self.assertEqual(summary["packages"], [("api", 1.0), ("json", 0.6)])
+        self.assertEqual(summary["modules"], [("api", 1.0), ("json", 0.7)])
+
+    def test_heavy_sdks_are_not_imported_at_startup(self):
+        code = "import sys, api.main; print(','.join(m for m in %r if m in sys.modules))" % (LAZY_MODULES,)
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."),
+            capture_output=True, text=True, check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,35 +1,116 @@
+import asyncio
+import json
+import os
+import tempfile
 import unittest
 from fastapi.testclient import TestClient
 from api.main import app
 from unittest.mock import patch
+import httpx
+from api import http_client, steam
+from api.http_client import UpstreamClient
+from api.steam import SteamCatalog
 
-class TestSteam(unittest.TestCase):
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def make_applist(*apps):
+    return {"applist": {"apps": [{"appid": appid, "name": name} for appid, name in apps]}}
+
+STEAM_APPS = [(570, "Dota 2"), (730, "Counter-Strike: Global Offensive"), (440, "Team Fortress 2")]
+
+class SteamTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "steam_apps.json")
+        self.upstream = make_applist(*STEAM_APPS)
+        self.downloads = 0
+        patcher = patch.object(http_client, "client", UpstreamClient(transport=httpx.MockTransport(self.handler)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def handler(self, request):
+        self.downloads += 1
+        return httpx.Response(200, json=self.upstream)
+
+class TestSteam(SteamTestCase):
     def setUp(self):
+        super().setUp()
         self.client = TestClient(app)
         self.api_key = "test-api-key"
         self.headers = {"X-API-Key": self.api_key}
-
-    def get_mock_steam_games(self):
-        return {
-            "applist": {
-                "apps": [
-                    {"appid": 570, "name": "Dota 2"},
-                    {"appid": 730, "name": "Counter-Strike: Global Offensive"},
-                    {"appid": 440, "name": "Team Fortress 2"},
-                ]
-            }
-        }
+        patcher = patch.object(steam, "catalog", SteamCatalog(self.path))
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def test_get_steam_games_success(self):
-        with patch("api.steam.requests.get") as mock_get:
-            mock_get.return_value.status_code = 200
-            mock_get.return_value.json.return_value = self.get_mock_steam_games()
+        response = self.client.get("/api/steam/games", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 3)
+        # Later requests are served from the local catalog.
+        self.client.get("/api/steam/games", headers=self.headers)
+        self.assertEqual(self.downloads, 1)
+
+    def test_get_steam_games_paginated(self):
+        response = self.client.get("/api/steam/games", params={"limit": 2}, headers=self.headers)
+        self.assertEqual([app["appid"] for app in response.json()], [440, 570])
+        self.assertEqual(response.headers["X-Total-Count"], "3")
+        cursor = response.headers["X-Next-Cursor"]
+        response = self.client.get("/api/steam/games", params={"limit": 2, "cursor": cursor}, headers=self.headers)
+        self.assertEqual([app["appid"] for app in response.json()], [730])
+        self.assertNotIn("X-Next-Cursor", response.headers)
 
-            response = self.client.get("/api/steam/games", headers=self.headers)
-            self.assertEqual(response.status_code, 200)
-            self.assertEqual(len(response.json()), 3)
+    def test_search_steam_games(self):
+        response = self.client.get("/api/steam/games", params={"q": "fortress"}, headers=self.headers)
+        self.assertEqual(response.json(), [{"appid": 440, "name": "Team Fortress 2"}])
+        response = self.client.get("/api/steam/games", params={"cursor": "not a cursor"}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
 
     def test_get_steam_games_no_api_key(self):
         response = self.client.get("/api/steam/games")
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json()["detail"], "Not authenticated")
+
+class TestSteamCatalog(SteamTestCase):
+    def test_refresh_diffs_against_snapshot(self):
+        clock = FakeClock()
+        catalog = SteamCatalog(self.path, refresh_interval=60, clock=clock)
+        self.assertEqual(asyncio.run(catalog.refresh()), {"added": 3, "removed": 0, "renamed": 0})
+        self.assertFalse(catalog.is_stale())
+
+        apps = [(i, f"App {i}") for i in range(1000, 1100)]
+        self.upstream = make_applist(*STEAM_APPS, *apps)
+        asyncio.run(catalog.refresh())
+        self.upstream = make_applist((570, "Dota 2"), (440, "Team Fortress Classic"), (100, "New Game"), *apps)
+        self.assertEqual(asyncio.run(catalog.refresh()), {"added": 1, "removed": 1, "renamed": 1})
+        self.assertEqual(catalog.page("fortress")[1], [{"appid": 440, "name": "Team Fortress Classic"}])
+        self.assertEqual(catalog.page("counter")[0], 0)
+        self.assertEqual(catalog.page(limit=1)[1], [{"appid": 100, "name": "New Game"}])
+        clock.now += 61
+        self.assertTrue(catalog.is_stale())
+
+        # A restarted process serves the snapshot without downloading.
+        downloads = self.downloads
+        reopened = SteamCatalog(self.path)
+        asyncio.run(reopened.ensure_loaded())
+        self.assertEqual(self.downloads, downloads)
+        self.assertEqual(len(reopened), 103)
+        self.assertEqual(reopened.page("classic")[1][0]["appid"], 440)
+
+    def test_failed_refresh_keeps_catalog(self):
+        catalog = SteamCatalog(self.path)
+        asyncio.run(catalog.refresh())
+        self.handler = lambda request: httpx.Response(503)
+        with patch.object(http_client, "client", UpstreamClient(transport=httpx.MockTransport(self.handler))):
+            self.assertIsNone(asyncio.run(catalog.refresh()))
+        self.assertEqual(len(catalog), 3)
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)["apps"]), 3)
+
+if __name__ == '__main__':
+    unittest.main()
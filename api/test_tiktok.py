@@ -1,87 +1,73 @@
+import asyncio
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 import json
 import os
+from urllib.parse import parse_qs
 
 # Add the parent directory to the Python path to allow importing from 'api'
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import httpx
+import pytest
 from api import tiktok
 
+@pytest.mark.usefixtures("mock_upstream")
 class TestTikTok(unittest.TestCase):
 
-
-    @patch("api.tiktok.requests.post")
     @patch("api.tiktok.get_tiktok_api_keys")
-    def test_get_access_token(self, mock_get_keys, mock_post):
+    def test_get_access_token(self, mock_get_keys):
         # Mock the API keys
         mock_get_keys.return_value = {"client_key": "test_client_key", "client_secret": "test_client_secret"}
 
-        # Mock the response from the TikTok API
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"data": {"access_token": "test_access_token"}}
-        mock_post.return_value = mock_response
-
-        # Call the function
-        result = tiktok.get_access_token("test_code")
-
-        # Assert that the mock was called with the correct arguments
-        mock_post.assert_called_once_with(
-            f"{tiktok.TIKTOK_API_BASE_URL}/oauth/token/",
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-            data={
-                "client_key": "test_client_key",
-                "client_secret": "test_client_secret",
-                "code": "test_code",
-                "grant_type": "authorization_code"
-            }
-        )
+        # Mock the response from the TikTok API and call the function
+        with self.mock_upstream(lambda request: httpx.Response(200, json={"data": {"access_token": "test_access_token"}})):
+            result = asyncio.run(tiktok.get_access_token("test_code"))
+
+        # Assert that the upstream was called with the correct arguments
+        request, = self.mock_upstream.requests
+        self.assertEqual((request.method, str(request.url)), ("POST", f"{tiktok.TIKTOK_API_BASE_URL}/oauth/token/"))
+        self.assertEqual(request.headers["Content-Type"], "application/x-www-form-urlencoded")
+        self.assertEqual(parse_qs(request.content.decode()), {
+            "client_key": ["test_client_key"],
+            "client_secret": ["test_client_secret"],
+            "code": ["test_code"],
+            "grant_type": ["authorization_code"]
+        })
 
         # Assert that the function returns the correct value
         self.assertEqual(result, {"data": {"access_token": "test_access_token"}})
 
-    @patch("api.tiktok.requests.get")
-    def test_get_user_info(self, mock_get):
-        # Mock the response from the TikTok API
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"data": {"user": {"display_name": "Test User"}}}
-        mock_get.return_value = mock_response
-
-        # Call the function
-        result = tiktok.get_user_info("test_access_token")
+    def test_get_user_info(self):
+        # Mock the response from the TikTok API and call the function
+        with self.mock_upstream(lambda request: httpx.Response(200, json={"data": {"user": {"display_name": "Test User"}}})):
+            result = asyncio.run(tiktok.get_user_info("test_access_token"))
 
-        # Assert that the mock was called with the correct arguments
-        mock_get.assert_called_once_with(
-            f"{tiktok.TIKTOK_API_BASE_URL}/user/info/?fields=open_id,union_id,avatar_url,display_name",
-            headers={"Authorization": "Bearer test_access_token"}
+        # Assert that the upstream was called with the correct arguments
+        request, = self.mock_upstream.requests
+        self.assertEqual(
+            str(request.url),
+            f"{tiktok.TIKTOK_API_BASE_URL}/user/info/?fields=open_id,union_id,avatar_url,display_name"
         )
+        self.assertEqual(request.headers["Authorization"], "Bearer test_access_token")
 
         # Assert that the function returns the correct value
         self.assertEqual(result, {"data": {"user": {"display_name": "Test User"}}})
 
-    @patch("api.tiktok.requests.post")
-    def test_get_video_list(self, mock_post):
-        # Mock the response from the TikTok API
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"data": {"videos": [{"id": "123"}]}}
-        mock_post.return_value = mock_response
-
-        # Call the function
-        result = tiktok.get_video_list("test_access_token")
+    def test_get_video_list(self):
+        # Mock the response from the TikTok API and call the function
+        with self.mock_upstream(lambda request: httpx.Response(200, json={"data": {"videos": [{"id": "123"}]}})):
+            result = asyncio.run(tiktok.get_video_list("test_access_token"))
 
-        # Assert that the mock was called with the correct arguments
-        mock_post.assert_called_once_with(
-            f"{tiktok.TIKTOK_API_BASE_URL}/video/list/?fields=id,title,video_description,duration,cover_image_url,embed_link",
-            headers={
-                "Authorization": "Bearer test_access_token",
-                "Content-Type": "application/json"
-            },
-            json={"max_count": 20}
+        # Assert that the upstream was called with the correct arguments
+        request, = self.mock_upstream.requests
+        self.assertEqual(
+            (request.method, str(request.url)),
+            ("POST", f"{tiktok.TIKTOK_API_BASE_URL}/video/list/?fields=id,title,video_description,duration,cover_image_url,embed_link")
         )
+        self.assertEqual(request.headers["Authorization"], "Bearer test_access_token")
+        self.assertEqual(json.loads(request.content), {"max_count": 20})
 
         # Assert that the function returns the correct value
         self.assertEqual(result, {"data": {"videos": [{"id": "123"}]}})
@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from api.main import app
+from api import data_files, twitch
+from api.twitch import StreamIndex
+
+def make_stream(stream_id, game_id, viewer_count):
+    return {"id": stream_id, "user_name": stream_id, "game_id": game_id, "title": "", "viewer_count": viewer_count}
+
+STREAMS = [
+    make_stream("s1", "2", 1250),
+    make_stream("s2", "1", 450),
+    make_stream("s3", "2", 890),
+    make_stream("s4", "3", 2100),
+]
+
+class TestStreamIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = StreamIndex()
+        self.index.refresh(STREAMS)
+
+    def ids(self, result):
+        return [stream["id"] for stream in result[1]]
+
+    def test_by_game(self):
+        self.assertEqual(self.ids(self.index.query("2")), ["s1", "s3"])
+        self.assertEqual(self.index.query("99"), (0, []))
+
+    def test_top(self):
+        self.assertEqual(self.ids(self.index.query(top=True)), ["s4", "s1", "s3", "s2"])
+        self.assertEqual(self.ids(self.index.query("2", top=True, min_viewers=900)), ["s1"])
+        total, streams = self.index.query(top=True, limit=2, offset=1)
+        self.assertEqual((total, [s["id"] for s in streams]), (4, ["s1", "s3"]))
+        total, streams = self.index.query(top=True, min_viewers=1000, limit=5, offset=1)
+        self.assertEqual((total, [s["id"] for s in streams]), (2, ["s1"]))
+
+    def test_incremental_refresh(self):
+        self.assertEqual(self.index.indexed, 4)
+        updated = [STREAMS[0], make_stream("s2", "1", 5000), STREAMS[3], make_stream("s5", "2", 10)]
+        self.index.refresh(updated)
+        # s2 changed and s5 is new; s3 is dropped and the others are left alone.
+        self.assertEqual(self.index.indexed, 6)
+        self.assertEqual(self.ids(self.index.query(top=True)), ["s2", "s4", "s1", "s5"])
+        self.assertEqual(self.ids(self.index.query("2")), ["s1", "s5"])
+
+    def test_changed_stream_keeps_feed_position(self):
+        updated = [STREAMS[0], make_stream("s2", "2", 5000), STREAMS[2], STREAMS[3]]
+        self.index.refresh(updated)
+        self.assertEqual(self.ids(self.index.query()), ["s1", "s2", "s3", "s4"])
+        self.assertEqual(self.ids(self.index.query("2")), ["s1", "s2", "s3"])
+        self.assertEqual(self.index.query("1"), (0, []))
+        reordered = [STREAMS[3], make_stream("s9", "2", 1), STREAMS[0]]
+        self.index.refresh(reordered)
+        self.assertEqual(self.ids(self.index.query()), ["s4", "s9", "s1"])
+
+    def test_empty_game_id_means_no_filter(self):
+        self.assertEqual(self.ids(self.index.query("")), ["s1", "s2", "s3", "s4"])
+        self.assertEqual(self.ids(self.index.query("", top=True)), ["s4", "s1", "s3", "s2"])
+
+class TestTwitchEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.headers = {"X-API-Key": "test-api-key"}
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmp_dir.name, "twitch_streams.json"), "w") as f:
+            json.dump(STREAMS, f)
+        self.patchers = [
+            patch.object(data_files, "registry", data_files.DataFileRegistry([self.tmp_dir.name])),
+            patch.object(twitch, "stream_index", StreamIndex()),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def test_get_streams(self):
+        response = self.client.get("/api/twitch/streams", params={"game_id": "2"}, headers=self.headers)
+        self.assertEqual([s["id"] for s in response.json()], ["s1", "s3"])
+        response = self.client.get("/api/twitch/streams", params={"top": "true", "limit": 1}, headers=self.headers)
+        self.assertEqual([s["id"] for s in response.json()], ["s4"])
+        self.assertEqual(response.headers["X-Total-Count"], "4")
+        response = self.client.get("/api/twitch/streams", params={"min_viewers": -1}, headers=self.headers)
+        self.assertEqual(response.status_code, 422)
+
+if __name__ == '__main__':
+    unittest.main()
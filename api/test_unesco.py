@@ -5,6 +5,7 @@ from unittest.mock import patch
 
 import json
 import os
+import tempfile
 class TestUnesco(unittest.TestCase):
     def setUp(self):
         self.client = TestClient(app)
@@ -39,14 +40,13 @@ class TestUnesco(unittest.TestCase):
             data = response.json()
             self.assertIn("records", data)
 
-    def test_unesco_ml_predict(self):
+    def test_unesco_ml_predict_without_model(self):
         """
-        Test the /api/unesco/ml/predict endpoint.
+        Test the /api/unesco/ml/predict endpoint for a dataset without a trained model.
         """
-        dataset_id = "mock_id"
-        with patch("api.unesco.get_records", return_value=self.get_mock_unesco_records(dataset_id)):
-            request_body = {"dataset_id": dataset_id}
-            response = self.client.post("/api/unesco/ml/predict", json=request_body, headers=self.headers)
-            self.assertEqual(response.status_code, 200)
-            data = response.json()
-            self.assertIn("mock_prediction", data)
+        from api import unesco_features
+        with tempfile.TemporaryDirectory() as model_dir, \
+                patch.object(unesco_features, "models", unesco_features.ModelRegistry(model_dir)):
+            response = self.client.post("/api/unesco/ml/predict", json={"dataset_id": "mock_id"}, headers=self.headers)
+            self.assertEqual(response.status_code, 404)
+            self.assertIn("No model trained", response.json()["detail"])
@@ -0,0 +1,159 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import httpx
+import numpy as np
+from fastapi.testclient import TestClient
+from api import http_client, main, unesco_features, unesco_ml, unesco_store
+from api.http_client import UpstreamClient
+from api.test_unesco_store import UnescoStoreTestCase
+from api.unesco_features import FeatureSpec, FeatureStore, LinearModel, ModelRegistry
+from api.unesco_store import UnescoStore
+
+class UnescoMLTestCase(UnescoStoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.model_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.model_dir)
+        self.models = ModelRegistry(self.model_dir)
+        self.features = FeatureStore()
+        offsets = {"France": 10, "Kenya": 20, "Peru": 30}
+        for item in self.upstream.records:
+            fields = item["record"]["fields"]
+            fields["score"] = 3.0 * (fields["year"] - 2000) + offsets[fields["country"]]
+            del fields["population"]
+        for patcher in (
+            patch.object(unesco_features, "models", self.models),
+            patch.object(unesco_features, "features", self.features),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def train(self):
+        return asyncio.run(unesco_ml.train("sdg", "score", alpha=1e-3))
+
+class TestFeatures(UnescoMLTestCase):
+
+    def test_spec_uses_numeric_and_low_cardinality_text_fields(self):
+        dataset = asyncio.run(self.store.get("sdg"))
+        spec = FeatureSpec.from_dataset(dataset, "score")
+        self.assertEqual(spec.names, ["country=France", "country=Kenya", "country=Peru", "year"])
+        X = spec.matrix(dataset)
+        self.assertEqual(X.shape, (250, 4))
+        np.testing.assert_array_equal(X[4], [0, 1, 0, 2004])
+        np.testing.assert_array_equal(spec.matrix_from_records([{"country": "Peru", "year": 2010}]), [[0, 0, 1, 2010]])
+
+    def test_matrix_is_built_once_per_dataset_version(self):
+        dataset = asyncio.run(self.store.get("sdg"))
+        spec = FeatureSpec.from_dataset(dataset, "score")
+        first = self.features.matrix(dataset, spec)
+        self.assertIs(self.features.matrix(dataset, spec), first)
+        self.assertTrue(os.path.exists(os.path.join(dataset.version_dir, f"features_{spec.key}.npy")))
+        reloaded = FeatureStore().matrix(dataset, spec)
+        np.testing.assert_array_equal(reloaded, first)
+        self.assertEqual(self.features.stats()["builds"], 1)
+
+    def test_matrix_files_are_written_through_unique_temp_files(self):
+        dataset = asyncio.run(self.store.get("sdg"))
+        spec = FeatureSpec.from_dataset(dataset, "score")
+        with patch("api.unesco_features.os.fsync", side_effect=OSError("disk full")):
+            X = self.features.matrix(dataset, spec)
+        self.assertEqual(X.shape, (250, 4))
+        self.assertFalse([name for name in os.listdir(dataset.version_dir) if name.startswith(("features_", "."))])
+        FeatureStore().matrix(dataset, spec)
+        self.assertEqual([name for name in os.listdir(dataset.version_dir) if name.startswith(("features_", "."))],
+                         [f"features_{spec.key}.npy"])
+
+    def test_linear_model_recovers_linear_target(self):
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(500, 3))
+        y = X @ [2.0, -1.0, 0.5] + 3.0
+        X[::7, 1] = np.nan
+        model = LinearModel.fit(FeatureSpec([("a", None), ("b", None), ("c", None)]), "y", X, y, alpha=1e-6)
+        self.assertGreater(model.meta["r2"], 0.9)
+        path = os.path.join(self.model_dir, "m.npz")
+        model.save(path)
+        loaded = LinearModel.load(path)
+        np.testing.assert_allclose(loaded.predict(X), model.predict(X))
+        self.assertEqual(loaded.spec.columns, model.spec.columns)
+
+class TestPredictions(UnescoMLTestCase):
+
+    def test_train_saves_model(self):
+        model = self.train()
+        self.assertEqual(model.target, "score")
+        self.assertGreater(model.meta["r2"], 0.99)
+        self.assertEqual(self.models.get("sdg").meta, model.meta)
+        with self.assertRaises(ValueError):
+            asyncio.run(unesco_ml.train("sdg", "country"))
+
+    def test_predict_batch_scores_whole_dataset(self):
+        self.train()
+        result = asyncio.run(unesco_ml.predict_batch("sdg"))
+        self.assertEqual(result["count"], 250)
+        self.assertEqual(result["predictions"][0]["id"], "r0")
+        actual = [item["record"]["fields"]["score"] for item in self.upstream.records]
+        predicted = [item["prediction"] for item in result["predictions"]]
+        np.testing.assert_allclose(predicted, actual, atol=0.01)
+        self.assertEqual(set(result["latency_ms"]), {"load", "features", "inference", "total"})
+
+    def test_predict_batch_by_ids_and_records(self):
+        self.train()
+        by_id = asyncio.run(unesco_ml.predict_batch("sdg", record_ids=["r5", "r2"]))
+        self.assertEqual([item["id"] for item in by_id["predictions"]], ["r5", "r2"])
+        records = [{"id": "new", "country": "Kenya", "year": 2005}] * 3000
+        result = asyncio.run(unesco_ml.predict_batch("sdg", records=records))
+        self.assertEqual(result["count"], 3000)
+        with self.assertRaises(LookupError):
+            asyncio.run(unesco_ml.predict_batch("sdg", record_ids=["missing"]))
+
+    def test_predict_batch_pages_through_dataset(self):
+        self.train()
+        with patch.object(unesco_ml, "MAX_BATCH", 100):
+            first = asyncio.run(unesco_ml.predict_batch("sdg"))
+            last = asyncio.run(unesco_ml.predict_batch("sdg", offset=200))
+        self.assertEqual((first["count"], first["total"], first["next_offset"]), (100, 250, 100))
+        self.assertEqual((last["count"], last["next_offset"]), (50, None))
+        self.assertEqual(last["predictions"][0]["id"], "r200")
+
+    def test_predict_batch_records_do_not_need_dataset(self):
+        self.train()
+        empty = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, empty)
+        down = UpstreamClient(transport=httpx.MockTransport(lambda request: httpx.Response(503)))
+        with patch.object(http_client, "client", down), patch.object(unesco_store, "store", UnescoStore(empty)):
+            result = asyncio.run(unesco_ml.predict_batch("sdg", records=[{"country": "Kenya", "year": 2005}]))
+            with self.assertRaises(httpx.HTTPError):
+                asyncio.run(unesco_ml.predict_batch("sdg"))
+        self.assertAlmostEqual(result["predictions"][0]["prediction"], 35.0, places=1)
+
+    def test_predict_without_model(self):
+        with self.assertRaises(LookupError):
+            asyncio.run(unesco_ml.predict("sdg"))
+
+    def test_predict_endpoints(self):
+        self.train()
+        client = TestClient(main.app)
+        headers = {"X-API-Key": "test-api-key"}
+        response = client.post("/api/unesco/ml/predict", json={"dataset_id": "sdg", "record_id": "r3"}, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["id"], "r3")
+        self.assertEqual(data["target"], "score")
+        self.assertAlmostEqual(data["prediction"], 9.0 + 10, places=2)
+        response = client.post("/api/unesco/ml/predict_batch", json={"dataset_id": "sdg", "record_ids": ["r1"]},
+                               headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 1)
+        response = client.post("/api/unesco/ml/predict_batch", json={"dataset_id": "other"}, headers=headers)
+        self.assertEqual(response.status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
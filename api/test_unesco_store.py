@@ -0,0 +1,211 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import httpx
+import numpy as np
+from fastapi.testclient import TestClient
+from api import http_client, main, unesco, unesco_store
+from api.http_client import UpstreamClient
+from api.unesco_store import ColumnarDataset, UnescoStore
+
+class FakeUnesco:
+    """
+    Serves a dataset's metadata and records pages, counting requests and
+    the largest number of page requests in flight at once.
+    """
+
+    def __init__(self, count=250, modified="2024-01-01T00:00:00+00:00"):
+        self.modified = modified
+        self.set_records(count)
+        self.record_requests = 0
+        self.metadata_requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def set_records(self, count, population=1000):
+        self.records = [
+            {"record": {"id": f"r{i}", "fields": {
+                "country": ["France", "Kenya", "Peru"][i % 3],
+                "year": 2000 + i % 20,
+                "population": population + i * 0.5,
+                "note": None if i % 2 else "even",
+                "geo": {"lat": i, "lon": -i},
+            }}}
+            for i in range(count)
+        ]
+
+    async def handler(self, request):
+        path = request.url.path
+        if path.endswith("/records"):
+            self.record_requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            offset = int(request.url.params["offset"])
+            limit = int(request.url.params["limit"])
+            return httpx.Response(200, json={
+                "total_count": len(self.records), "records": self.records[offset:offset + limit],
+            })
+        if path.endswith("/catalog/datasets/sdg"):
+            self.metadata_requests += 1
+            return httpx.Response(200, json={"dataset": {"dataset_id": "sdg", "metas": {"default": {"modified": self.modified}}}})
+        return httpx.Response(404, json={"error": "not found"})
+
+class UnescoStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.upstream = FakeUnesco()
+        self.now = 0.0
+        self.store = UnescoStore(self.root, revalidate_interval=60, clock=lambda: self.now)
+        for patcher in (
+            patch.object(http_client, "client", UpstreamClient(transport=httpx.MockTransport(self.upstream.handler))),
+            patch.object(unesco_store, "store", self.store),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+class TestRecordPages(UnescoStoreTestCase):
+
+    def test_pages_are_prefetched_with_bounded_concurrency(self):
+        async def collect():
+            return [page async for page in unesco.iter_record_pages("sdg", page_size=10, prefetch=3)]
+
+        pages = asyncio.run(collect())
+        self.assertEqual(len(pages), 25)
+        records = [item for page in pages for item in page]
+        self.assertEqual([item["record"]["id"] for item in records], [f"r{i}" for i in range(250)])
+        self.assertEqual(self.upstream.max_in_flight, 3)
+
+    def test_download_is_capped_at_the_api_window(self):
+        with patch.object(unesco, "MAX_RECORDS", 120):
+            dataset = asyncio.run(self.store.get("sdg"))
+        self.assertEqual(len(dataset), 120)
+
+class TestUnescoStore(UnescoStoreTestCase):
+
+    def test_dataset_is_written_as_one_npy_file_per_field(self):
+        dataset = asyncio.run(self.store.get("sdg"))
+        self.assertEqual(len(dataset), 250)
+        self.assertEqual(dataset.kinds, {"country": "text", "year": "integer", "population": "number",
+                                         "note": "text", "geo": "json"})
+        files = sorted(os.listdir(os.path.join(self.root, "sdg", dataset.meta["version"])))
+        self.assertEqual(files, ["0_country.npy", "1_year.npy", "2_population.npy", "3_note.npy",
+                                 "3_note.null.npy", "4_geo.npy", "_id.npy"])
+        self.assertEqual(np.load(os.path.join(self.root, "sdg", "v1", "1_year.npy")).dtype, np.int64)
+
+    def test_records_round_trip(self):
+        dataset = asyncio.run(self.store.get("sdg"))
+        total, records = dataset.page(offset=1, limit=2)
+        self.assertEqual(total, 250)
+        self.assertEqual(records, self.upstream.records[1:3])
+
+    def test_query_filters_and_selects_fields(self):
+        dataset = asyncio.run(self.store.get("sdg"))
+        total, records = dataset.page(limit=3, fields=["country", "year"], where={"country": "Kenya", "year": "2001"})
+        self.assertEqual(total, 5)
+        self.assertEqual(records[0], {"record": {"id": "r1", "fields": {"country": "Kenya", "year": 2001}}})
+        self.assertEqual(dataset.page(where={"note": "even"})[0], 125)
+        with self.assertRaises(ValueError):
+            dataset.page(where={"missing": "1"})
+        with self.assertRaises(ValueError):
+            dataset.page(fields=["missing"])
+
+    def test_rows_looks_up_ids(self):
+        dataset = asyncio.run(self.store.get("sdg"))
+        rows, missing = dataset.rows(["r5", "missing", "r0", "r249"])
+        self.assertEqual(rows.tolist(), [5, 0, 249])
+        self.assertEqual(missing, ["missing"])
+        sorted_ids = dataset._sorted_ids
+        dataset.rows(["r1"])
+        self.assertIs(dataset._sorted_ids, sorted_ids)
+
+    def test_unchanged_dataset_is_not_downloaded_again(self):
+        asyncio.run(self.store.get("sdg"))
+        self.assertEqual(self.upstream.record_requests, 3)
+        asyncio.run(self.store.get("sdg"))
+        self.assertEqual(self.upstream.metadata_requests, 1)
+        self.now = 61
+        asyncio.run(self.store.get("sdg"))
+        self.assertEqual(self.upstream.metadata_requests, 2)
+        self.assertEqual(self.upstream.record_requests, 3)
+        self.assertEqual(self.store.stats()["unchanged"], 1)
+
+    def test_modified_dataset_is_downloaded_again(self):
+        asyncio.run(self.store.get("sdg"))
+        self.upstream.modified = "2024-02-01T00:00:00+00:00"
+        self.upstream.set_records(40, population=5)
+        self.now = 61
+        dataset = asyncio.run(self.store.get("sdg"))
+        self.assertEqual(len(dataset), 40)
+        self.assertEqual(dataset.modified, "2024-02-01T00:00:00+00:00")
+        self.assertEqual(dataset.value("population", 0), 5.0)
+        self.assertEqual(os.listdir(os.path.join(self.root, "sdg")).count("v1"), 0)
+
+    def test_cache_survives_restart_and_upstream_outage(self):
+        asyncio.run(self.store.get("sdg"))
+        restarted = UnescoStore(self.root, clock=lambda: self.now)
+
+        def down(request):
+            raise httpx.ConnectError("down")
+
+        with patch.object(http_client, "client", UpstreamClient(transport=httpx.MockTransport(down))):
+            dataset = asyncio.run(restarted.get("sdg"))
+            self.assertEqual(len(dataset), 250)
+            self.assertEqual(restarted.stats()["errors"], 1)
+            with self.assertRaises(httpx.HTTPError):
+                asyncio.run(restarted.get("other"))
+
+    def test_concurrent_requests_share_one_download(self):
+        async def many():
+            return await asyncio.gather(*(self.store.get("sdg") for _ in range(20)))
+
+        datasets = asyncio.run(many())
+        self.assertTrue(all(dataset is datasets[0] for dataset in datasets))
+        self.assertEqual(self.store.downloads, 1)
+
+    def test_invalid_dataset_ids_are_rejected(self):
+        for dataset_id in ("../etc", ".hidden", "a/b", ""):
+            with self.assertRaises(ValueError):
+                asyncio.run(self.store.get(dataset_id))
+
+    def test_missing_directory_loads_nothing(self):
+        self.assertIsNone(ColumnarDataset.load(os.path.join(self.root, "nothing")))
+
+class TestUnescoRecordsEndpoint(UnescoStoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = TestClient(main.app)
+        self.headers = {"X-API-Key": "test-api-key"}
+
+    def test_records_endpoint_queries_cache(self):
+        response = self.client.get(
+            "/api/unesco/datasets/sdg/records",
+            params={"limit": 2, "select": "country", "where": ["country:Peru"]},
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["total_count"], 83)
+        self.assertEqual(data["records"], [{"record": {"id": "r2", "fields": {"country": "Peru"}}},
+                                           {"record": {"id": "r5", "fields": {"country": "Peru"}}}])
+
+    def test_records_endpoint_errors(self):
+        response = self.client.get("/api/unesco/datasets/sdg/records", params={"where": "country"}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/unesco/datasets/sdg/records", params={"select": "nope"}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/unesco/datasets/unknown/records", headers=self.headers)
+        self.assertEqual(response.status_code, 502)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
-from unittest.mock import patch, Mock
+from unittest.mock import patch
+import httpx
 from fastapi.testclient import TestClient
 from api.main import app
+from api import http_client
+from api.http_client import UpstreamClient
 
 class TestUnicornAPI(unittest.TestCase):
     def setUp(self):
@@ -10,12 +13,9 @@ class TestUnicornAPI(unittest.TestCase):
         self.headers = {"X-API-Key": self.api_key}
 
     @patch('api.unicorn.API_KEY', "fake-api-key")
-    @patch('requests.get')
-    def test_translate_for_unicorn(self, mock_get):
+    def test_translate_for_unicorn(self):
         # Mock the response from the fun translations API
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        data = {
             "success": {"total": 1},
             "contents": {
                 "translated": "a unicorn-friendly dialect, translated text is.",
@@ -23,14 +23,15 @@ class TestUnicornAPI(unittest.TestCase):
                 "translation": "yoda"
             }
         }
-        mock_get.return_value = mock_response
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json=data))
 
         # Call the endpoint
-        response = self.client.post(
-            "/api/unicorn/translate",
-            headers=self.headers,
-            json={"text": "this is the text to be translated."}
-        )
+        with patch.object(http_client, "client", UpstreamClient(transport=transport)):
+            response = self.client.post(
+                "/api/unicorn/translate",
+                headers=self.headers,
+                json={"text": "this is the text to be translated."}
+            )
 
         # Assert the response
         self.assertEqual(response.status_code, 200)
@@ -2,42 +2,52 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import asyncio
+import json
+import tempfile
+import threading
 import unittest
-from unittest.mock import patch, MagicMock
-from api import wescore
-import requests
-
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from api import data_files, http_client, main, wescore
+from api.http_client import UpstreamClient
+
+@pytest.mark.usefixtures("mock_upstream")
 class TestWeScore(unittest.TestCase):
 
     @patch('api.wescore.get_wescore_credentials')
-    @patch('api.wescore.requests.get')
-    def test_get_live_scores_success(self, mock_get, mock_get_credentials):
+    def test_get_live_scores_success(self, mock_get_credentials):
         # Mock the credentials
         mock_get_credentials.return_value = {"api_key": "test_key", "api_secret": "test_secret"}
 
         # Mock the API response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"data": {"live": "scores"}}
-        mock_get.return_value = mock_response
+        def handler(request):
+            self.assertEqual(request.url.params["key"], "test_key")
+            return httpx.Response(200, json={"data": {"live": "scores"}})
 
         # Call the function
-        result = wescore.get_live_scores()
+        with self.mock_upstream(handler):
+            result = asyncio.run(wescore.get_live_scores())
 
         # Assert the result
         self.assertEqual(result, {"data": {"live": "scores"}})
 
     @patch('api.wescore.get_wescore_credentials')
-    @patch('api.wescore.requests.get')
-    def test_get_live_scores_failure(self, mock_get, mock_get_credentials):
+    def test_get_live_scores_failure(self, mock_get_credentials):
         # Mock the credentials
         mock_get_credentials.return_value = {"api_key": "test_key", "api_secret": "test_secret"}
 
         # Mock the API response
-        mock_get.side_effect = requests.exceptions.RequestException("API is down")
+        def handler(request):
+            raise httpx.ConnectError("API is down")
 
         # Call the function
-        result = wescore.get_live_scores()
+        with self.mock_upstream(handler):
+            result = asyncio.run(wescore.get_live_scores())
 
         # Assert the result
         self.assertIsNone(result)
@@ -48,28 +58,182 @@ class TestWeScore(unittest.TestCase):
         mock_get_credentials.return_value = {}
 
         # Call the function
-        result = wescore.get_live_scores()
+        result = asyncio.run(wescore.get_live_scores())
 
         # Assert the result
         self.assertEqual(result, {"error": "API key and secret not set for WeScore."})
 
     @patch('api.wescore.get_wescore_credentials')
-    @patch('api.wescore.requests.get')
-    def test_get_all_fixtures_success(self, mock_get, mock_get_credentials):
+    def test_get_all_fixtures_success(self, mock_get_credentials):
         # Mock the credentials
         mock_get_credentials.return_value = {"api_key": "test_key", "api_secret": "test_secret"}
 
         # Mock the API response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"data": {"fixtures": "list"}}
-        mock_get.return_value = mock_response
-
-        # Call the function
-        result = wescore.get_all_fixtures()
+        with self.mock_upstream(lambda request: httpx.Response(200, json={"data": {"fixtures": "list"}})):
+            result = asyncio.run(wescore.get_all_fixtures())
 
         # Assert the result
         self.assertEqual(result, {"data": {"fixtures": "list"}})
 
+    def test_credentials_are_read_once(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, "api_keys.json"), "w") as f:
+                json.dump({"wescore": {"api_key": "k", "api_secret": "s"}}, f)
+            registry = data_files.DataFileRegistry([root])
+            with patch.object(wescore, "_keys", registry):
+                for _ in range(5):
+                    self.assertEqual(wescore.get_wescore_credentials(), {"api_key": "k", "api_secret": "s"})
+            self.assertEqual(registry.misses, 1)
+
+class StubLiveScores(BaseHTTPRequestHandler):
+    """
+    Local stand-in for the live score API serving `matches`.
+    """
+    matches = []
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        body = json.dumps({"success": True, "data": {"match": self.matches}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def match(id, score):
+    return {"id": id, "home_name": f"Home {id}", "away_name": f"Away {id}", "score": score}
+
+class TestLiveScorePoller(unittest.TestCase):
+
+    def setUp(self):
+        StubLiveScores.matches = [match(1, "0 - 0"), match(2, "1 - 0"), match(3, "2 - 2")]
+        StubLiveScores.requests = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubLiveScores)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        for patcher in (
+            patch.object(wescore, "BASE_URL", f"http://127.0.0.1:{self.server.server_port}"),
+            patch.object(wescore, "get_wescore_credentials", return_value={"api_key": "k", "api_secret": "s"}),
+            patch.object(http_client, "client", UpstreamClient()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_poll_diffs_against_previous_matches(self):
+        poller = wescore.LiveScorePoller(min_interval=1, max_interval=8)
+
+        async def scenario():
+            await poller.poll()
+            self.assertEqual(poller.version, 1)
+            self.assertEqual(len(poller.matches), 3)
+            queue = asyncio.Queue()
+            poller._subscribers.add(queue)
+            StubLiveScores.matches = [match(1, "1 - 0"), match(2, "1 - 0")]
+            await poller.poll()
+            await poller.poll()
+            return queue
+
+        queue = asyncio.run(scenario())
+        self.assertEqual(queue.qsize(), 1)
+        update = queue.get_nowait()
+        self.assertEqual(update["version"], 2)
+        self.assertEqual(update["changed"], [match(1, "1 - 0")])
+        self.assertEqual(update["removed"], ["3"])
+        self.assertEqual(poller.interval, 1.5)
+
+    def test_interval_backs_off_without_changes_and_on_errors(self):
+        poller = wescore.LiveScorePoller(min_interval=1, max_interval=4)
+
+        async def scenario():
+            for _ in range(5):
+                await poller.poll()
+
+        asyncio.run(scenario())
+        self.assertEqual(poller.interval, 4)
+        self.server.shutdown()
+        self.server.server_close()
+        asyncio.run(scenario())
+        self.assertEqual(poller.interval, 4)
+        self.assertEqual(poller.errors, 5)
+        self.assertEqual(len(poller.matches), 3)
+
+    def test_one_upstream_poll_serves_every_subscriber(self):
+        poller = wescore.LiveScorePoller(min_interval=0.02, max_interval=0.02)
+        subscribers = 500
+
+        async def subscriber(ready, received):
+            async with poller.subscription() as queue:
+                snapshot = await queue.get()
+                ready.release()
+                update = await queue.get()
+                received.append((snapshot, update))
+
+        async def scenario():
+            ready = asyncio.Semaphore(0)
+            received = []
+            tasks = [asyncio.create_task(subscriber(ready, received)) for _ in range(subscribers)]
+            for _ in range(subscribers):
+                await ready.acquire()
+            StubLiveScores.matches = [match(1, "0 - 0"), match(2, "2 - 0"), match(3, "2 - 2")]
+            await asyncio.wait_for(asyncio.gather(*tasks), 5)
+            return received
+
+        received = asyncio.run(scenario())
+        self.assertEqual(len(received), subscribers)
+        for snapshot, update in received:
+            self.assertEqual(snapshot["type"], "snapshot")
+            self.assertEqual(len(snapshot["matches"]), 3)
+            self.assertEqual(update["changed"], [match(2, "2 - 0")])
+        self.assertLess(StubLiveScores.requests, 50)
+        self.assertEqual(poller.stats()["subscribers"], 0)
+
+    def test_current_reuses_recent_poll(self):
+        poller = wescore.LiveScorePoller(min_interval=60, max_interval=60)
+
+        async def scenario():
+            return await asyncio.gather(*(poller.current() for _ in range(20)))
+
+        results = asyncio.run(scenario())
+        asyncio.run(scenario())
+        self.assertEqual(StubLiveScores.requests, 1)
+        self.assertEqual(results[0]["data"]["match"], StubLiveScores.matches)
+
+    def test_sse_events(self):
+        poller = wescore.LiveScorePoller(min_interval=60, max_interval=60)
+
+        async def scenario():
+            events = wescore.sse_events(poller, heartbeat=0.01)
+            first = await events.__anext__()
+            second = await events.__anext__()
+            await events.aclose()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertTrue(first.startswith("id: 1\nevent: snapshot\ndata: "))
+        self.assertEqual(len(json.loads(first.split("data: ", 1)[1])["matches"]), 3)
+        self.assertEqual(second, ": keep-alive\n\n")
+        self.assertEqual(poller.stats()["subscribers"], 0)
+
+    def test_websocket_pushes_snapshot(self):
+        client = TestClient(main.app)
+        with patch.object(wescore, "live_scores", wescore.LiveScorePoller(min_interval=60, max_interval=60)):
+            with client.websocket_connect("/api/wescore/scores/ws?api_key=test-api-key") as websocket:
+                message = websocket.receive_json()
+        self.assertEqual(message["type"], "snapshot")
+        self.assertEqual([m["id"] for m in message["matches"]], [1, 2, 3])
+
+    def test_websocket_rejects_unknown_key(self):
+        client = TestClient(main.app)
+        with self.assertRaises(WebSocketDisconnect):
+            with client.websocket_connect("/api/wescore/scores/ws?api_key=wrong") as websocket:
+                websocket.receive_json()
+        self.assertEqual(StubLiveScores.requests, 0)
+
 if __name__ == '__main__':
     unittest.main()
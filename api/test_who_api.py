@@ -1,40 +1,151 @@
+import asyncio
 import unittest
 from unittest.mock import patch
-import requests
-from api import who_api
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from api import main, who_api, response_cache
+from api.response_cache import ResponseCache
 
+@pytest.mark.usefixtures("mock_upstream")
 class TestWhoApi(unittest.TestCase):
 
-    @patch('api.who_api.requests.get')
-    def test_get_indicators(self, mock_get):
+    def setUp(self):
+        patcher = patch.object(response_cache, "cache", ResponseCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_indicators(self):
         # Mock the API response
-        mock_response = unittest.mock.Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "value": [
-                {"IndicatorCode": "TEST1", "IndicatorName": "Test Indicator 1"},
-                {"IndicatorCode": "TEST2", "IndicatorName": "Test Indicator 2"}
-            ]
-        }
-        mock_get.return_value = mock_response
+        def handler(request):
+            return httpx.Response(200, json={
+                "value": [
+                    {"IndicatorCode": "TEST1", "IndicatorName": "Test Indicator 1"},
+                    {"IndicatorCode": "TEST2", "IndicatorName": "Test Indicator 2"}
+                ]
+            })
 
         # Call the function
-        indicators = who_api.get_indicators()
+        with self.mock_upstream(handler):
+            indicators = asyncio.run(who_api.get_indicators())
 
         # Assert the results
         self.assertEqual(len(indicators['value']), 2)
         self.assertEqual(indicators['value'][0]['IndicatorName'], 'Test Indicator 1')
 
-    @patch('api.who_api.requests.get')
-    def test_get_indicators_api_error(self, mock_get):
+    def test_get_indicators_api_error(self):
         # Mock an API error
-        mock_get.side_effect = requests.exceptions.RequestException("API is down")
-
-        # Call the function
-        indicators = who_api.get_indicators()
+        with self.mock_upstream(lambda request: httpx.Response(503)):
+            indicators = asyncio.run(who_api.get_indicators())
 
         # Assert the results
         self.assertEqual(indicators, [])
 
+    def test_odata_options_are_pushed_down(self):
+        seen = []
+
+        def handler(request):
+            seen.append(dict(request.url.params))
+            return httpx.Response(200, json={"value": [{"IndicatorCode": "TEST1"}]})
+
+        with self.mock_upstream(handler):
+            indicators = asyncio.run(who_api.get_indicators(
+                filter="contains(IndicatorName,'malaria')", select="IndicatorCode, IndicatorName", top=5,
+            ))
+            asyncio.run(who_api.get_indicators(filter="contains(IndicatorName,'malaria')",
+                                               select="IndicatorCode,IndicatorName", top=5))
+
+        self.assertEqual(indicators, {"value": [{"IndicatorCode": "TEST1"}]})
+        self.assertEqual(seen, [{
+            "$filter": "contains(IndicatorName,'malaria')", "$select": "IndicatorCode,IndicatorName", "$top": "5",
+        }])
+
+    def test_invalid_odata_options(self):
+        with self.assertRaises(ValueError):
+            who_api.odata_params(select="IndicatorCode,Secret")
+        with self.assertRaises(ValueError):
+            who_api.odata_params(top=0)
+        with self.assertRaises(ValueError):
+            who_api.odata_params(filter="x" * (who_api.MAX_FILTER_LENGTH + 1))
+        with self.mock_upstream(lambda request: httpx.Response(400, text="Syntax error")):
+            with self.assertRaises(ValueError):
+                asyncio.run(who_api.get_indicators(filter="IndicatorCode eq"))
+
+INDICATORS = {"value": [
+    {"IndicatorCode": "MALARIA_EST_CASES", "IndicatorName": "Estimated number of malaria cases", "Language": "EN"},
+    {"IndicatorCode": "MALARIA_EST_DEATHS", "IndicatorName": "Estimated number of malaria deaths", "Language": "EN"},
+    {"IndicatorCode": "WHOSIS_000001", "IndicatorName": "Life expectancy at birth (years)", "Language": "EN"},
+    {"IndicatorCode": "MDG_0000000001", "IndicatorName": "Infant mortality rate", "Language": "EN"},
+    {"IndicatorCode": "MAL_VECTOR", "IndicatorName": "Vector control", "Language": "EN"},
+]}
+
+class TestIndicatorIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = who_api.IndicatorIndex(INDICATORS)
+
+    def codes(self, result):
+        return [indicator["IndicatorCode"] for indicator in result["results"]]
+
+    def test_lookup_by_code(self):
+        self.assertEqual(self.index.get("whosis_000001")["IndicatorName"], "Life expectancy at birth (years)")
+        self.assertIsNone(self.index.get("MISSING"))
+        self.assertEqual(len(self.index), 5)
+
+    def test_prefix_search(self):
+        self.assertEqual(self.codes(self.index.search("mal")),
+                         ["MALARIA_EST_CASES", "MALARIA_EST_DEATHS", "MAL_VECTOR"])
+        self.assertEqual(self.codes(self.index.search("malaria de")), ["MALARIA_EST_DEATHS"])
+        self.assertEqual(self.codes(self.index.search("mort")), ["MDG_0000000001"])
+        self.assertEqual(self.index.search("mal", limit=1, offset=1)["total"], 3)
+        self.assertEqual(self.codes(self.index.search("mal", limit=1, offset=1)), ["MALARIA_EST_DEATHS"])
+        self.assertEqual(self.index.search("  ")["total"], 0)
+
+@pytest.mark.usefixtures("mock_upstream")
+class TestWhoEndpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.requests = 0
+
+        def handler(request):
+            self.requests += 1
+            if request.url.params.get("$filter") == "bad":
+                return httpx.Response(400, text="Syntax error")
+            return httpx.Response(200, json=INDICATORS)
+
+        for patcher in (
+            patch.object(response_cache, "cache", ResponseCache()),
+            patch.object(who_api, "_index", who_api.IndicatorIndex()),
+            self.mock_upstream(handler),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = TestClient(main.app)
+        self.headers = {"X-API-Key": "test-api-key"}
+
+    def test_index_is_built_once_from_cached_list(self):
+        response = self.client.get("/api/who_data/indicators/search", params={"prefix": "life"}, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["IndicatorCode"], "WHOSIS_000001")
+        index = who_api._index
+        response = self.client.get("/api/who_data/indicators/mal_vector", headers=self.headers)
+        self.assertEqual(response.json()["IndicatorName"], "Vector control")
+        self.assertIs(who_api._index, index)
+        self.assertEqual(self.requests, 1)
+
+    def test_unknown_indicator(self):
+        response = self.client.get("/api/who_data/indicators/NOPE", headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_who_data_pushdown_errors(self):
+        response = self.client.get("/api/who_data", params={"$select": "Nope"}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/who_data", params={"$top": "0"}, headers=self.headers)
+        self.assertEqual(response.status_code, 422)
+        response = self.client.get("/api/who_data", params={"$filter": "bad"}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/who_data", params={"$top": "2"}, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,6 @@
 import os
 import json
-import requests
+from api import http_client
 
 TIKTOK_API_BASE_URL = "https://open.tiktokapis.com/v2"
 
@@ -17,7 +17,7 @@ def get_tiktok_api_keys():
     except FileNotFoundError:
         return {}
 
-def get_access_token(code: str):
+async def get_access_token(code: str):
     """
     Exchange an authorization code for an access token.
     """
@@ -38,11 +38,11 @@ def get_access_token(code: str):
         "code": code,
         "grant_type": "authorization_code"
     }
-    response = requests.post(url, headers=headers, data=data)
+    response = await http_client.client.post(url, headers=headers, data=data)
     response.raise_for_status()
     return response.json()
 
-def get_user_info(access_token: str):
+async def get_user_info(access_token: str):
     """
     Get user information from the TikTok API.
     """
@@ -50,11 +50,11 @@ def get_user_info(access_token: str):
     headers = {
         "Authorization": f"Bearer {access_token}"
     }
-    response = requests.get(url, headers=headers)
+    response = await http_client.client.get(url, headers=headers)
     response.raise_for_status()
     return response.json()
 
-def get_video_list(access_token: str, max_count: int = 20):
+async def get_video_list(access_token: str, max_count: int = 20):
     """
     Get a list of videos from the TikTok API.
     """
@@ -66,6 +66,6 @@ def get_video_list(access_token: str, max_count: int = 20):
     data = {
         "max_count": max_count
     }
-    response = requests.post(url, headers=headers, json=data)
+    response = await http_client.client.post(url, headers=headers, json=data)
     response.raise_for_status()
     return response.json()
@@ -1,27 +1,86 @@
-import json
-import os
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Optional
+from collections import defaultdict
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from typing import Dict, List, Optional, Tuple
+from api import data_files
 from api.auth import get_api_key
+from api.file_responses import json_file_response
+from api.keyed_index import KeyedIndex
+from api.sorted_index import SortedIndex
 
 router = APIRouter()
 
-DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "frontend", "data")
+STREAMS_FILE = "twitch_streams.json"
 
 def load_data(filename):
-    path = os.path.join(DATA_PATH, filename)
-    if not os.path.exists(path):
-        return []
-    with open(path, "r") as f:
-        return json.load(f)
+    return data_files.registry.load(filename, default=[])
+
+class StreamIndex(KeyedIndex):
+    """
+    Twitch streams indexed by game and ordered by viewer count.
+
+    Streams are kept per game in feed order, and in presorted viewer count
+    indexes (one overall, one per game) for the `top` mode. When the feed
+    changes only the streams that were added, removed or modified are
+    re-indexed.
+    """
+
+    def __init__(self):
+        super().__init__(group=lambda stream: stream.get("game_id"))
+        self._viewers = SortedIndex("viewer_count")
+        self._game_viewers: Dict[str, SortedIndex] = defaultdict(lambda: SortedIndex("viewer_count"))
+
+    def _index(self, stream_id: str, stream: dict):
+        self._viewers.add(stream_id, stream)
+        self._game_viewers[stream.get("game_id")].add(stream_id, stream)
+
+    def _unindex(self, stream_id: str, stream: dict):
+        game_id = stream.get("game_id")
+        self._viewers.remove(stream_id, stream)
+        self._game_viewers[game_id].remove(stream_id, stream)
+        if not len(self._game_viewers[game_id]):
+            del self._game_viewers[game_id]
+
+    def query(self, game_id: Optional[str] = None, top: bool = False, min_viewers: Optional[int] = None,
+              limit: Optional[int] = None, offset: int = 0) -> Tuple[int, List[dict]]:
+        """
+        Return the number of matching streams and one page of them, in feed
+        order or, with `top`, by descending viewer count.
+        """
+        end = offset + limit if limit is not None else None
+        if top:
+            viewers = self._game_viewers.get(game_id) if game_id else self._viewers
+            if viewers is None:
+                return 0, []
+            total = viewers.count(low=min_viewers)
+            keys = viewers.page(min(end, total) if end is not None else total, descending=True)
+            return total, [self._docs[stream_id] for _, stream_id in keys[offset:]]
+        matches = list(self.docs(game_id or None).values())
+        if min_viewers is not None:
+            matches = [stream for stream in matches if (stream.get("viewer_count") or 0) >= min_viewers]
+        return len(matches), matches[offset:end]
+
+stream_index = StreamIndex()
 
 @router.get("/games")
-async def get_twitch_games(api_key: str = Depends(get_api_key)):
-    return load_data("twitch_games.json")
+async def get_twitch_games(request: Request, api_key: str = Depends(get_api_key)):
+    return json_file_response(request, "twitch_games.json", default=[])
 
 @router.get("/streams")
-async def get_twitch_streams(game_id: Optional[str] = None, api_key: str = Depends(get_api_key)):
-    streams = load_data("twitch_streams.json")
-    if game_id:
-        return [s for s in streams if s.get("game_id") == game_id]
+async def get_twitch_streams(
+    response: Response,
+    game_id: Optional[str] = None,
+    top: bool = False,
+    min_viewers: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    api_key: str = Depends(get_api_key),
+):
+    """
+    List live streams, optionally for one game. With `top=true` streams are
+    ordered by viewer count, highest first. The total number of matches is
+    returned in the X-Total-Count header.
+    """
+    stream_index.refresh(load_data(STREAMS_FILE))
+    total, streams = stream_index.query(game_id, top=top, min_viewers=min_viewers, limit=limit, offset=offset)
+    response.headers["X-Total-Count"] = str(total)
     return streams
@@ -1,31 +1,103 @@
-import requests
+import asyncio
+import collections
+import os
+import sys
+from typing import AsyncIterator, Dict, List, Optional
+from api import http_client
+from api import single_flight
 
 BASE_URL = "https://data.unesco.org/api/explore/v2.0"
 
-import sys
+# Largest page of records the Explore API serves.
+PAGE_SIZE = 100
+
+# The records endpoint only serves the first MAX_RECORDS records of a dataset.
+MAX_RECORDS = 10000
 
-def get_datasets():
+# Pages requested ahead of the one being consumed when a dataset is downloaded.
+PREFETCH_PAGES = int(os.environ.get("UNESCO_PREFETCH_PAGES", "4"))
+
+async def get_datasets():
     """
-    Fetches a list of all datasets from the UNESCO API.
+    Fetches a list of all datasets from the UNESCO API. Concurrent calls
+    share one upstream request.
     """
     url = f"{BASE_URL}/catalog/datasets"
+    return await single_flight.group.do(url, lambda: _fetch_json(url))
+
+async def _fetch_json(url: str, params: Optional[dict] = None):
     print(f"Fetching data from URL: {url}", flush=True)
-    response = requests.get(url)
+    response = await http_client.client.get(url, params=params)
     print(f"Response status code: {response.status_code}", flush=True)
     response.raise_for_status()
     return response.json()
 
-def get_records(dataset_id: str):
+async def get_modified(dataset_id: str) -> Optional[str]:
     """
-    Fetches records from a specific dataset from the UNESCO API.
+    The `modified` timestamp of a dataset's metadata.
+    """
+    data = await _fetch_json(f"{BASE_URL}/catalog/datasets/{dataset_id}")
+    metas = (data.get("dataset") or data).get("metas") or {}
+    return (metas.get("default") or {}).get("modified")
+
+async def fetch_records_page(dataset_id: str, offset: int, limit: int = PAGE_SIZE) -> dict:
+    """
+    Fetches one page of records from a dataset.
     """
     url = f"{BASE_URL}/catalog/datasets/{dataset_id}/records"
-    print(f"Fetching data from URL: {url}", flush=True)
+    return await _fetch_json(url, {"limit": limit, "offset": offset})
+
+async def iter_record_pages(dataset_id: str, page_size: int = PAGE_SIZE,
+                            prefetch: int = PREFETCH_PAGES) -> AsyncIterator[List[dict]]:
+    """
+    Yield every page of a dataset's records, in order.
+
+    The first page tells how many records there are; after that up to
+    `prefetch` pages are in flight while earlier ones are consumed, so a
+    download takes about total / prefetch round-trips without holding the
+    whole dataset in memory twice.
+    """
+    first = await fetch_records_page(dataset_id, 0, page_size)
+    yield first.get("records") or []
+    total = min(first.get("total_count") or 0, MAX_RECORDS)
+    offsets = iter(range(page_size, total, page_size))
+    pending = collections.deque()
+
+    def request_next():
+        offset = next(offsets, None)
+        if offset is not None:
+            pending.append(asyncio.ensure_future(fetch_records_page(dataset_id, offset, min(page_size, total - offset))))
+
+    try:
+        for _ in range(max(prefetch, 1)):
+            request_next()
+        while pending:
+            page = await pending.popleft()
+            request_next()
+            yield page.get("records") or []
+    finally:
+        for task in pending:
+            task.cancel()
+
+def get_store():
+    """
+    Import the columnar record cache on first use, so numpy does not slow
+    down startup.
+    """
+    from api import unesco_store
+    return unesco_store.store
+
+async def get_records(dataset_id: str, limit: int = 100, offset: int = 0, fields: Optional[List[str]] = None,
+                      where: Optional[Dict[str, str]] = None):
+    """
+    Fetches records from a specific dataset, served from the local
+    columnar cache. `where` keeps records whose fields equal the given
+    values; `fields` limits the fields returned.
+    """
     try:
-        response = requests.get(url)
-        print(f"Response status code: {response.status_code}", flush=True)
-        response.raise_for_status()
-        return response.json()
+        dataset = await get_store().get(dataset_id)
     except Exception as e:
         print(f"An error occurred: {e}", file=sys.stderr, flush=True)
         raise
+    total, records = dataset.page(offset, limit, fields, where)
+    return {"total_count": total, "modified": dataset.modified, "records": records}
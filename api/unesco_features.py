@@ -0,0 +1,247 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from api.games_journal import install_snapshot, write_file
+from api.unesco_store import ColumnarDataset, check_dataset_id
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+
+# Directory of the trained models, one `<dataset_id>.npz` per dataset.
+# UNESCO_MODEL_DIR overrides it.
+MODEL_DIR = os.environ.get("UNESCO_MODEL_DIR", os.path.join(dir_path, "..", "data", "unesco_models"))
+
+# Text fields with at most this many distinct values are one-hot encoded;
+# other text fields are not used as features.
+MAX_CATEGORIES = 20
+
+# Feature matrices kept in memory.
+MAX_CACHED_MATRICES = 8
+
+class FeatureSpec:
+    """
+    The columns of a feature matrix: numeric fields as they are and
+    one-hot columns for the categories of low-cardinality text fields.
+    Missing values become NaN, left for the model to impute.
+    """
+
+    def __init__(self, columns: List[Tuple[str, Optional[str]]]):
+        self.columns = [(field, category) for field, category in columns]
+
+    @classmethod
+    def from_dataset(cls, dataset: ColumnarDataset, target: str, max_categories: int = MAX_CATEGORIES) -> "FeatureSpec":
+        columns = []
+        for name in dataset.fields:
+            if name == target:
+                continue
+            kind = dataset.kinds[name]
+            if kind in ("integer", "number"):
+                columns.append((name, None))
+            elif kind == "text":
+                values = np.asarray(dataset.columns[name])
+                nulls = dataset.nulls.get(name)
+                categories = np.unique(values if nulls is None else values[~np.asarray(nulls)])
+                if 1 < len(categories) <= max_categories:
+                    columns.extend((name, str(category)) for category in categories)
+        return cls(columns)
+
+    @property
+    def names(self) -> List[str]:
+        return [field if category is None else f"{field}={category}" for field, category in self.columns]
+
+    @property
+    def key(self) -> str:
+        return hashlib.sha256(json.dumps(self.columns).encode("utf-8")).hexdigest()[:16]
+
+    def matrix(self, dataset: ColumnarDataset) -> np.ndarray:
+        """
+        The feature matrix of every record in `dataset`, one row per record.
+        """
+        X = np.empty((len(dataset), len(self.columns)), dtype=np.float64)
+        for position, (field, category) in enumerate(self.columns):
+            column = dataset.columns.get(field)
+            if column is None:
+                X[:, position] = np.nan if category is None else 0.0
+                continue
+            nulls = dataset.nulls.get(field)
+            if category is None:
+                if dataset.kinds[field] not in ("integer", "number"):
+                    X[:, position] = np.nan
+                    continue
+                X[:, position] = column
+                if nulls is not None:
+                    X[np.asarray(nulls), position] = np.nan
+            else:
+                X[:, position] = np.asarray(column) == category
+                if nulls is not None:
+                    X[np.asarray(nulls), position] = 0.0
+        return X
+
+    def matrix_from_records(self, records: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        The feature matrix of records given as field -> value mappings.
+        """
+        X = np.zeros((len(records), len(self.columns)), dtype=np.float64)
+        for position, (field, category) in enumerate(self.columns):
+            values = [record.get(field) for record in records]
+            if category is None:
+                X[:, position] = [
+                    value if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+                    for value in values
+                ]
+            else:
+                X[:, position] = [value == category for value in values]
+        return X
+
+class LinearModel:
+    """
+    Ridge regression over standardized features.
+
+    Missing features are imputed with their training mean, so a record
+    missing a field contributes nothing for it.
+    """
+
+    def __init__(self, spec: FeatureSpec, target: str, mean: np.ndarray, scale: np.ndarray,
+                 weights: np.ndarray, bias: float, meta: Optional[dict] = None):
+        self.spec = spec
+        self.target = target
+        self.mean = mean
+        self.scale = scale
+        self.weights = weights
+        self.bias = bias
+        self.meta = meta or {}
+
+    @classmethod
+    def fit(cls, spec: FeatureSpec, target: str, X: np.ndarray, y: np.ndarray, alpha: float = 1.0) -> "LinearModel":
+        """
+        Fit on the rows of `X` whose target `y` is known. Raises ValueError
+        if there are none.
+        """
+        known = ~np.isnan(y)
+        X, y = X[known], y[known]
+        if not len(y):
+            raise ValueError(f"No records with a value for {target}.")
+        present = (~np.isnan(X)).sum(axis=0)
+        mean = np.divide(np.nansum(X, axis=0), present, out=np.zeros(X.shape[1]), where=present > 0)
+        X = np.where(np.isnan(X), mean, X)
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1.0
+        Z = (X - mean) / scale
+        bias = float(y.mean())
+        weights = np.linalg.solve(Z.T @ Z + alpha * np.eye(Z.shape[1]), Z.T @ (y - bias))
+        residual = y - (Z @ weights + bias)
+        total = ((y - bias) ** 2).sum()
+        meta = {
+            "records": int(len(y)),
+            "alpha": alpha,
+            "r2": float(1 - (residual ** 2).sum() / total) if total else 1.0,
+            "trained_at": time.time(),
+        }
+        return cls(spec, target, mean, scale, weights, bias, meta)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Score every row of `X` in one pass.
+        """
+        X = np.where(np.isnan(X), self.mean, X)
+        return ((X - self.mean) / self.scale) @ self.weights + self.bias
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        header = json.dumps({"target": self.target, "columns": self.spec.columns, "meta": self.meta})
+        install_snapshot(write_file(path, lambda f: np.savez(f, header=np.array(header), mean=self.mean,
+                                                             scale=self.scale, weights=self.weights,
+                                                             bias=np.array(self.bias))), path)
+
+    @classmethod
+    def load(cls, path: str) -> "LinearModel":
+        with np.load(path) as data:
+            header = json.loads(str(data["header"]))
+            return cls(FeatureSpec(header["columns"]), header["target"], data["mean"], data["scale"],
+                       data["weights"], float(data["bias"]), header["meta"])
+
+class ModelRegistry:
+    """
+    Trained models by dataset id, reloaded when their file changes.
+    """
+
+    def __init__(self, root: str = MODEL_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._models: Dict[str, Tuple[Tuple[float, int], LinearModel]] = {}
+
+    def path(self, dataset_id: str) -> str:
+        check_dataset_id(dataset_id)
+        return os.path.join(self.root, f"{dataset_id}.npz")
+
+    def get(self, dataset_id: str) -> Optional[LinearModel]:
+        path = self.path(dataset_id)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        signature = (st.st_mtime, st.st_size)
+        with self._lock:
+            cached = self._models.get(dataset_id)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+        model = LinearModel.load(path)
+        with self._lock:
+            self._models[dataset_id] = (signature, model)
+        return model
+
+    def save(self, dataset_id: str, model: LinearModel):
+        model.save(self.path(dataset_id))
+
+class FeatureStore:
+    """
+    Feature matrices of cached datasets, built once per dataset version.
+
+    A matrix is kept in memory (least recently used first out) and saved
+    as `features_<spec>.npy` in the dataset's version directory, so it
+    survives restarts and is dropped with the version it was built from.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_MATRICES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._matrices: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.loads = 0
+        self.builds = 0
+
+    def matrix(self, dataset: ColumnarDataset, spec: FeatureSpec) -> np.ndarray:
+        key = (dataset.version_dir or str(id(dataset)), spec.key)
+        with self._lock:
+            X = self._matrices.get(key)
+            if X is not None:
+                self.hits += 1
+                self._matrices.move_to_end(key)
+                return X
+        path = os.path.join(dataset.version_dir, f"features_{spec.key}.npy") if dataset.version_dir else None
+        if path is not None and os.path.exists(path):
+            X = np.load(path, mmap_mode="r")
+            self.loads += 1
+        else:
+            X = spec.matrix(dataset)
+            self.builds += 1
+            if path is not None:
+                try:
+                    install_snapshot(write_file(path, lambda f: np.save(f, X)), path)
+                except OSError as e:
+                    print(f"Error saving feature matrix {path}: {e}")
+        with self._lock:
+            self._matrices[key] = X
+            while len(self._matrices) > self.max_entries:
+                self._matrices.popitem(last=False)
+        return X
+
+    def stats(self) -> Dict[str, int]:
+        return {"matrices": len(self._matrices), "hits": self.hits, "loads": self.loads, "builds": self.builds}
+
+models = ModelRegistry()
+features = FeatureStore()
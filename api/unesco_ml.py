@@ -1,18 +1,151 @@
+"""
+Predictions on UNESCO datasets from models trained offline.
+
+Train a ridge regression model for one numeric field of a dataset with:
+
+    python -m api.unesco_ml train <dataset_id> <target> [--alpha 1.0]
+
+The model is saved to UNESCO_MODEL_DIR and picked up by the API without a
+restart.
+"""
+import argparse
+import asyncio
 import random
+import time
+from typing import Any, Dict, List, Optional
 from api import unesco
 
-def predict(dataset_id: str):
+# Largest number of records scored by one batch request; requests for the
+# whole dataset are paged by this many records.
+MAX_BATCH = 10000
+
+def get_features():
     """
-    Fetches data from a UNESCO dataset and returns a mock prediction.
+    Import the feature store and models on first use, so numpy does not
+    slow down startup.
     """
-    records = unesco.get_records(dataset_id)
+    from api import unesco_features
+    return unesco_features
+
+async def _load_model(dataset_id: str):
+    features = get_features()
+    model = await asyncio.to_thread(features.models.get, dataset_id)
+    if model is None:
+        raise LookupError(f"No model trained for dataset {dataset_id}.")
+    return features, model
+
+async def predict(dataset_id: str, record_id: Optional[str] = None):
+    """
+    Predicts the model's target for one record of a dataset, a random one
+    unless `record_id` is given. Raises LookupError if there is no model
+    or no such record.
+    """
+    features, model = await _load_model(dataset_id)
+    dataset = await unesco.get_store().get(dataset_id)
+    if not len(dataset):
+        return {"message": "No records found to make a prediction."}
+    X = await asyncio.to_thread(features.features.matrix, dataset, model.spec)
+    if record_id is None:
+        row = random.randrange(len(dataset))
+    else:
+        rows, missing = dataset.rows([record_id])
+        if missing:
+            raise LookupError(f"No record {record_id} in dataset {dataset_id}.")
+        row = int(rows[0])
+    _, records = dataset.page(row, 1)
+    record = records[0]["record"]
+    record["prediction"] = float(model.predict(X[row:row + 1])[0])
+    record["target"] = model.target
+    return record
+
+async def predict_batch(dataset_id: str, record_ids: Optional[List[str]] = None,
+                        records: Optional[List[Dict[str, Any]]] = None, offset: int = 0):
+    """
+    Predicts the model's target for many records in one vectorized pass:
+    the given `records` (field -> value mappings), the cached records with
+    the given ids, or else the cached records of the dataset, MAX_BATCH at
+    a time from `offset`; `next_offset` is set while there are more.
+    Scoring `records` needs only the model, not the dataset.
+    Raises ValueError for batches over MAX_BATCH records.
+    """
+    start = time.perf_counter()
+    features, model = await _load_model(dataset_id)
+    dataset = None if records is not None else await unesco.get_store().get(dataset_id)
+    loaded = time.perf_counter()
+    page = {}
+    if records is not None:
+        if len(records) > MAX_BATCH:
+            raise ValueError(f"At most {MAX_BATCH} records can be scored at once.")
+        ids = [str(record.get("id", position)) for position, record in enumerate(records)]
+        X = model.spec.matrix_from_records(records)
+    else:
+        matrix = await asyncio.to_thread(features.features.matrix, dataset, model.spec)
+        if record_ids is None:
+            if offset < 0:
+                raise ValueError("offset must not be negative.")
+            end = min(len(dataset), offset + MAX_BATCH)
+            X = matrix[offset:end]
+            ids = [str(record_id) for record_id in dataset.ids[offset:end]]
+            page = {"total": len(dataset), "next_offset": end if end < len(dataset) else None}
+        else:
+            if len(record_ids) > MAX_BATCH:
+                raise ValueError(f"At most {MAX_BATCH} records can be scored at once.")
+            rows, missing = dataset.rows(record_ids)
+            if missing:
+                raise LookupError(f"Unknown records: {', '.join(missing[:10])}")
+            X = matrix[rows]
+            ids = [str(record_id) for record_id in dataset.ids[rows]]
+    featurized = time.perf_counter()
+    predictions = model.predict(X)
+    inferred = time.perf_counter()
+    return {
+        "dataset_id": dataset_id,
+        "target": model.target,
+        "model": model.meta,
+        "count": len(ids),
+        **page,
+        "predictions": [{"id": record_id, "prediction": float(value)} for record_id, value in zip(ids, predictions)],
+        "latency_ms": {
+            "load": round((loaded - start) * 1000, 3),
+            "features": round((featurized - loaded) * 1000, 3),
+            "inference": round((inferred - featurized) * 1000, 3),
+            "total": round((inferred - start) * 1000, 3),
+        },
+    }
+
+async def train(dataset_id: str, target: str, alpha: float = 1.0):
+    """
+    Fits a model predicting `target` from the other fields of a dataset
+    and saves it. Raises ValueError unless `target` is a numeric field.
+    """
+    features = get_features()
+    dataset = await unesco.get_store().get(dataset_id)
+    if dataset.kinds.get(target) not in ("integer", "number"):
+        raise ValueError(f"{target} is not a numeric field of {dataset_id}.")
+
+    def fit():
+        spec = features.FeatureSpec.from_dataset(dataset, target)
+        X = features.features.matrix(dataset, spec)
+        y = features.FeatureSpec([(target, None)]).matrix(dataset)[:, 0]
+        model = features.LinearModel.fit(spec, target, X, y, alpha)
+        model.meta.update({"dataset_version": dataset.meta["version"], "modified": dataset.modified})
+        features.models.save(dataset_id, model)
+        return model
+
+    return await asyncio.to_thread(fit)
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    train_parser = commands.add_parser("train", help="Train a model for one dataset")
+    train_parser.add_argument("dataset_id")
+    train_parser.add_argument("target", help="Numeric field to predict")
+    train_parser.add_argument("--alpha", type=float, default=1.0, help="Ridge regularization strength")
+    args = parser.parse_args()
 
-    # This is a mock prediction. In a real application, this would be replaced
-    # with a call to a real machine learning model.
-    if records and records.get("records"):
-        # Get a random record and add a mock prediction to it
-        random_record = random.choice(records["records"])
-        random_record["mock_prediction"] = random.random()
-        return random_record
+    model = asyncio.run(train(args.dataset_id, args.target, args.alpha))
+    print(f"Trained {args.dataset_id} -> {model.target} on {model.meta['records']} records, "
+          f"{len(model.spec.columns)} features, r2 {model.meta['r2']:.3f}")
 
-    return {"message": "No records found to make a prediction."}
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,307 @@
+import asyncio
+import json
+import os
+import re
+import shutil
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+import numpy as np
+from api import unesco
+from api.games_journal import install_snapshot, write_snapshot
+from api.single_flight import SingleFlight
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+
+# Directory of the cached datasets, one subdirectory per dataset.
+# UNESCO_CACHE_DIR overrides it.
+CACHE_DIR = os.environ.get("UNESCO_CACHE_DIR", os.path.join(dir_path, "..", "data", "unesco"))
+
+# Seconds a cached dataset is served before its modified timestamp is
+# checked upstream again.
+REVALIDATE_INTERVAL = float(os.environ.get("UNESCO_REVALIDATE_INTERVAL", str(60 * 60)))
+
+_DATASET_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+_UNSAFE = re.compile(r"[^A-Za-z0-9_-]")
+
+def check_dataset_id(dataset_id: str):
+    """
+    Dataset ids name cache directories, so only plain ones are accepted.
+    """
+    if not _DATASET_ID.match(dataset_id) or ".." in dataset_id:
+        raise ValueError(f"Invalid dataset id: {dataset_id!r}")
+
+def _kind(values: List[Any]) -> str:
+    present = [value for value in values if value is not None]
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+        return "integer"
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        return "number"
+    if all(isinstance(value, str) for value in present):
+        return "text"
+    return "json"
+
+def _to_array(kind: str, values: List[Any]) -> np.ndarray:
+    if kind == "integer":
+        return np.array([0 if value is None else value for value in values], dtype=np.int64)
+    if kind == "number":
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    if kind == "text":
+        return np.array(["" if value is None else value for value in values], dtype=np.str_)
+    return np.array(["" if value is None else json.dumps(value) for value in values], dtype=np.str_)
+
+class ColumnBuilder:
+    """
+    Collects records field by field while their pages stream in.
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.columns: Dict[str, List[Any]] = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, item: dict):
+        record = item.get("record", item)
+        fields = record.get("fields") or {}
+        count = len(self.ids)
+        for name, value in fields.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = [None] * count
+            column.append(value)
+        self.ids.append(str(record.get("id", count)))
+        for column in self.columns.values():
+            if len(column) == count:
+                column.append(None)
+
+class ColumnarDataset:
+    """
+    A cached dataset held as one numpy array per field.
+
+    Arrays are memory-mapped from `.npy` files, so opening a dataset reads
+    only its metadata. Missing values are tracked in a boolean array per
+    field that has any.
+    """
+
+    def __init__(self, meta: dict, ids: np.ndarray, columns: Dict[str, np.ndarray], nulls: Dict[str, np.ndarray],
+                 version_dir: Optional[str] = None):
+        self.meta = meta
+        self.version_dir = version_dir
+        self.ids = ids
+        self.columns = columns
+        self.nulls = nulls
+        self.kinds = {field["name"]: field["kind"] for field in meta["fields"]}
+        self._sorted_ids: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @property
+    def modified(self) -> Optional[str]:
+        return self.meta.get("modified")
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.columns)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["ColumnarDataset"]:
+        """
+        Open the dataset cached in `directory`, or return None if there is none.
+        """
+        try:
+            with open(os.path.join(directory, "meta.json"), "r") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        version = os.path.join(directory, meta["version"])
+        ids = np.load(os.path.join(version, "_id.npy"), mmap_mode="r")
+        columns, nulls = {}, {}
+        for field in meta["fields"]:
+            columns[field["name"]] = np.load(os.path.join(version, f"{field['file']}.npy"), mmap_mode="r")
+            if field["nullable"]:
+                nulls[field["name"]] = np.load(os.path.join(version, f"{field['file']}.null.npy"), mmap_mode="r")
+        return cls(meta, ids, columns, nulls, version)
+
+    @classmethod
+    def write(cls, directory: str, builder: ColumnBuilder, modified: Optional[str]) -> "ColumnarDataset":
+        """
+        Write `builder` to a new version directory under `directory`, switch
+        meta.json over to it and delete older versions.
+        """
+        os.makedirs(directory, exist_ok=True)
+        previous = cls.load(directory)
+        version = f"v{int(previous.meta['version'][1:]) + 1 if previous else 1}"
+        version_dir = os.path.join(directory, version)
+        shutil.rmtree(version_dir, ignore_errors=True)
+        os.makedirs(version_dir)
+        np.save(os.path.join(version_dir, "_id.npy"), np.array(builder.ids, dtype=np.str_))
+        fields = []
+        for position, (name, values) in enumerate(builder.columns.items()):
+            kind = _kind(values)
+            file = f"{position}_{_UNSAFE.sub('_', name)}"
+            np.save(os.path.join(version_dir, f"{file}.npy"), _to_array(kind, values))
+            nullable = any(value is None for value in values)
+            if nullable:
+                np.save(os.path.join(version_dir, f"{file}.null.npy"), np.array([value is None for value in values]))
+            fields.append({"name": name, "kind": kind, "file": file, "nullable": nullable})
+        meta = {"version": version, "modified": modified, "records": len(builder), "fields": fields}
+        path = os.path.join(directory, "meta.json")
+        install_snapshot(write_snapshot(path, meta), path)
+        for entry in os.listdir(directory):
+            if entry != version and entry.startswith("v"):
+                shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+        return cls.load(directory)
+
+    def value(self, name: str, row: int) -> Any:
+        nulls = self.nulls.get(name)
+        if nulls is not None and nulls[row]:
+            return None
+        value = self.columns[name][row]
+        kind = self.kinds[name]
+        if kind == "integer":
+            return int(value)
+        if kind == "number":
+            return float(value)
+        if kind == "json":
+            return json.loads(str(value))
+        return str(value)
+
+    def rows(self, record_ids: List[str]) -> Tuple[np.ndarray, List[str]]:
+        """
+        Row numbers of the records with the given ids, in the order given,
+        and the ids that are not in the dataset. The ids are sorted once per
+        dataset version and looked up with a binary search.
+        """
+        if self._sorted_ids is None:
+            order = np.argsort(self.ids, kind="stable")
+            self._sorted_ids = (np.asarray(self.ids)[order], order)
+        sorted_ids, order = self._sorted_ids
+        wanted = np.asarray([str(record_id) for record_id in record_ids], dtype=np.str_)
+        positions = np.minimum(np.searchsorted(sorted_ids, wanted), max(len(sorted_ids) - 1, 0))
+        found = sorted_ids[positions] == wanted if len(sorted_ids) else np.zeros(len(wanted), dtype=bool)
+        missing = [str(record_id) for record_id in wanted[~found]]
+        return order[positions[found]], missing
+
+    def match(self, where: Optional[Dict[str, str]] = None) -> np.ndarray:
+        """
+        Row numbers of the records whose fields equal the values in `where`.
+        Raises ValueError for unknown fields.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for name, wanted in (where or {}).items():
+            if name not in self.columns:
+                raise ValueError(f"Unknown field: {name}")
+            column = self.columns[name]
+            if self.kinds[name] in ("integer", "number"):
+                try:
+                    mask &= column == float(wanted)
+                except ValueError:
+                    mask[:] = False
+            else:
+                mask &= column == wanted
+            nulls = self.nulls.get(name)
+            if nulls is not None:
+                mask &= ~nulls
+        return np.flatnonzero(mask)
+
+    def page(self, offset: int = 0, limit: int = 100, fields: Optional[List[str]] = None,
+             where: Optional[Dict[str, str]] = None) -> Tuple[int, List[dict]]:
+        """
+        Return the number of matching records and one page of them.
+        """
+        unknown = set(fields or ()) - set(self.columns)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        rows = self.match(where)
+        names = fields or self.fields
+        records = [
+            {"record": {"id": str(self.ids[row]), "fields": {name: self.value(name, row) for name in names}}}
+            for row in rows[offset:offset + limit]
+        ]
+        return len(rows), records
+
+class UnescoStore:
+    """
+    Local columnar cache of UNESCO datasets.
+
+    The first request for a dataset downloads all of its records page by
+    page and writes them to disk; afterwards it is served from the cache.
+    Every `revalidate_interval` seconds the dataset's `modified` timestamp
+    is checked upstream and the records are downloaded again only if it
+    changed. If the upstream is unreachable the cached copy is served.
+    """
+
+    def __init__(self, root: str = CACHE_DIR, revalidate_interval: float = REVALIDATE_INTERVAL, clock=time.monotonic):
+        self.root = root
+        self.revalidate_interval = revalidate_interval
+        self._clock = clock
+        self._datasets: Dict[str, ColumnarDataset] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._refreshes = SingleFlight()
+        self.downloads = 0
+        self.unchanged = 0
+        self.errors = 0
+
+    def _directory(self, dataset_id: str) -> str:
+        return os.path.join(self.root, dataset_id)
+
+    async def get(self, dataset_id: str) -> ColumnarDataset:
+        """
+        Return the cached dataset, downloading or revalidating it when due.
+        Raises ValueError for invalid ids and httpx.HTTPError when the
+        dataset is neither cached nor downloadable.
+        """
+        check_dataset_id(dataset_id)
+        dataset = self._datasets.get(dataset_id)
+        if dataset is None:
+            dataset = await asyncio.to_thread(ColumnarDataset.load, self._directory(dataset_id))
+            if dataset is not None:
+                self._datasets[dataset_id] = dataset
+        checked_at = self._checked_at.get(dataset_id)
+        if dataset is not None and checked_at is not None and self._clock() - checked_at < self.revalidate_interval:
+            return dataset
+        return await self._refreshes.do(dataset_id, lambda: self._revalidate(dataset_id))
+
+    async def _revalidate(self, dataset_id: str) -> ColumnarDataset:
+        current = self._datasets.get(dataset_id)
+        try:
+            modified = await unesco.get_modified(dataset_id)
+            if current is not None and modified is not None and current.modified == modified:
+                self.unchanged += 1
+                dataset = current
+            else:
+                dataset = await self.download(dataset_id, modified)
+        except httpx.HTTPError as e:
+            self.errors += 1
+            if current is None:
+                raise
+            print(f"Serving cached UNESCO dataset {dataset_id}: {e}")
+            dataset = current
+        self._checked_at[dataset_id] = self._clock()
+        return dataset
+
+    async def download(self, dataset_id: str, modified: Optional[str] = None) -> ColumnarDataset:
+        """
+        Download every record of a dataset and replace its cached copy.
+        """
+        builder = ColumnBuilder()
+        async for records in unesco.iter_record_pages(dataset_id):
+            for item in records:
+                builder.add(item)
+        dataset = await asyncio.to_thread(ColumnarDataset.write, self._directory(dataset_id), builder, modified)
+        self.downloads += 1
+        self._datasets[dataset_id] = dataset
+        return dataset
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "datasets": {dataset_id: len(dataset) for dataset_id, dataset in self._datasets.items()},
+            "downloads": self.downloads,
+            "unchanged": self.unchanged,
+            "errors": self.errors,
+        }
+
+store = UnescoStore()
@@ -1,14 +1,14 @@
 # Unicorn API (Fun Translations) integration
 import os
-import requests
 from dotenv import load_dotenv
+from api import http_client
 
 load_dotenv()
 
 BASE_URL = "https://api.funtranslations.com/translate/yoda.json"
 API_KEY = os.getenv("FUN_TRANSLATIONS_API_KEY")
 
-def translate_text(text: str):
+async def translate_text(text: str):
     """
     Translate text to Yoda speak using the Fun Translations API.
     """
@@ -21,6 +21,6 @@ def translate_text(text: str):
     }
     params = {"text": text}
 
-    response = requests.get(BASE_URL, headers=headers, params=params)
+    response = await http_client.client.get(BASE_URL, headers=headers, params=params)
     response.raise_for_status()
     return response.json()
@@ -1,20 +1,38 @@
-import requests
+import asyncio
+import contextlib
+import httpx
 import json
 import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+from api import data_files
+from api import single_flight
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+
+# api_keys.json is parsed once and only re-read when it changes on disk.
+_keys = data_files.DataFileRegistry([dir_path])
 
 def get_wescore_credentials():
     """
     Reads the wescore API key and secret from the api_keys.json file.
     """
-    dir_path = os.path.dirname(os.path.realpath(__file__))
-    keys_path = os.path.join(dir_path, "api_keys.json")
-    with open(keys_path, "r") as f:
-        keys = json.load(f)
-        return keys.get("wescore", {})
+    return _keys.load("api_keys.json", default={}).get("wescore", {})
 
 BASE_URL = "https://live-score-api.com/api-client"
 
-def get_live_scores():
+# Bounds of the adaptive live score poll interval, in seconds.
+MIN_POLL_INTERVAL = float(os.environ.get("WESCORE_MIN_POLL_INTERVAL", "5"))
+MAX_POLL_INTERVAL = float(os.environ.get("WESCORE_MAX_POLL_INTERVAL", "60"))
+
+# The interval grows by this factor after every poll without changes.
+POLL_BACKOFF = 1.5
+
+# Updates buffered per subscriber; a subscriber that falls further behind
+# is sent a fresh snapshot instead.
+SUBSCRIBER_QUEUE_SIZE = 100
+
+async def get_live_scores():
     """
     Fetches live scores from the live-score-api.com.
     """
@@ -27,14 +45,12 @@ def get_live_scores():
 
     url = f"{BASE_URL}/scores/live?key={API_KEY}&secret={API_SECRET}"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return await single_flight.group.get_json(url)
+    except httpx.HTTPError as e:
         print(f"Error fetching live scores: {e}")
         return None
 
-def get_all_fixtures():
+async def get_all_fixtures():
     """
     Fetches all fixtures from the live-score-api.com.
     """
@@ -47,9 +63,156 @@ def get_all_fixtures():
 
     url = f"{BASE_URL}/fixtures/matches?key={API_KEY}&secret={API_SECRET}"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return await single_flight.group.get_json(url)
+    except httpx.HTTPError as e:
         print(f"Error fetching fixtures: {e}")
         return None
+
+def live_matches(data: Any) -> Optional[List[dict]]:
+    """
+    The match list of a live scores response, or None if it is an error.
+    """
+    if not isinstance(data, dict) or "error" in data:
+        return None
+    matches = (data.get("data") or {}).get("match")
+    return matches if isinstance(matches, list) else None
+
+class LiveScorePoller:
+    """
+    Polls live scores for every subscriber at once and pushes changes.
+
+    While anyone is subscribed one background task polls the upstream,
+    diffs the matches against the previous poll by id and publishes an
+    update with only the changed and removed matches to each subscriber's
+    queue. The interval drops to `min_interval` when something changed
+    and backs off towards `max_interval` while nothing does or the
+    upstream fails. The task stops when the last subscriber leaves.
+    """
+
+    def __init__(self, min_interval: float = MIN_POLL_INTERVAL, max_interval: float = MAX_POLL_INTERVAL,
+                 clock=time.monotonic):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self._clock = clock
+        self._polls = single_flight.SingleFlight()
+        self._subscribers = set()
+        self._task: Optional[asyncio.Task] = None
+        self.latest: Any = None
+        self.matches: Dict[str, dict] = {}
+        self.version = 0
+        self.polled_at: Optional[float] = None
+        self.polls = 0
+        self.errors = 0
+
+    async def poll(self) -> Any:
+        """
+        Poll once, or join a poll already in flight, and return the raw
+        upstream response.
+        """
+        return await self._polls.do("poll", self._poll)
+
+    async def _poll(self) -> Any:
+        self.polls += 1
+        data = await get_live_scores()
+        self.polled_at = self._clock()
+        matches = live_matches(data)
+        if matches is None:
+            self.errors += 1
+            self.interval = min(self.interval * 2, self.max_interval)
+            return data
+        current = {str(match.get("id")): match for match in matches}
+        changed = [match for key, match in current.items() if self.matches.get(key) != match]
+        removed = [key for key in self.matches if key not in current]
+        self.latest = data
+        self.matches = current
+        if changed or removed:
+            self.version += 1
+            self.interval = self.min_interval
+            self._publish({"type": "update", "version": self.version, "changed": changed, "removed": removed})
+        else:
+            self.interval = min(self.interval * POLL_BACKOFF, self.max_interval)
+        return data
+
+    def snapshot(self) -> dict:
+        return {"type": "snapshot", "version": self.version, "matches": list(self.matches.values())}
+
+    def _publish(self, update: dict):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(update)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self.snapshot())
+
+    async def current(self) -> Any:
+        """
+        The latest live scores, polling first if they are older than the
+        current interval.
+        """
+        if self.latest is None or self._clock() - self.polled_at >= self.interval:
+            data = await self.poll()
+            if self.latest is None:
+                return data
+        return self.latest
+
+    async def _run(self):
+        while self._subscribers:
+            await asyncio.sleep(self.interval)
+            if not self._subscribers:
+                break
+            try:
+                await self.poll()
+            except Exception as e:
+                self.errors += 1
+                print(f"Live score poll failed: {e}")
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    @contextlib.asynccontextmanager
+    async def subscription(self) -> AsyncIterator[asyncio.Queue]:
+        """
+        Subscribe to live score changes. The queue starts with a snapshot
+        of every match, followed by updates as they are polled.
+        """
+        if self.latest is None:
+            await self.poll()
+        queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        queue.put_nowait(self.snapshot())
+        self._subscribers.add(queue)
+        self._ensure_running()
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "matches": len(self.matches),
+            "version": self.version,
+            "interval": self.interval,
+            "polls": self.polls,
+            "errors": self.errors,
+        }
+
+live_scores = LiveScorePoller()
+
+async def sse_events(poller: LiveScorePoller, heartbeat: float = 15.0) -> AsyncIterator[str]:
+    """
+    Server-Sent Events stream of a live score subscription, with a comment
+    line every `heartbeat` seconds to keep idle connections open.
+    """
+    async with poller.subscription() as queue:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            data = json.dumps(event, separators=(",", ":"))
+            yield f"id: {event['version']}\nevent: {event['type']}\ndata: {data}\n\n"
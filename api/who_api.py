@@ -1,14 +1,143 @@
-import requests
+import bisect
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+from api import response_cache
 
-def get_indicators():
+INDICATOR_URL = "https://ghoapi.azureedge.net/api/Indicator"
+
+# Seconds the indicator list is served from memory before it is refreshed.
+CACHE_TTL = 24 * 60 * 60
+
+# Fields of the GHO Indicator entity, the only ones $select accepts.
+INDICATOR_FIELDS = ("IndicatorCode", "IndicatorName", "Language")
+
+# Longest $filter expression passed on to the GHO API.
+MAX_FILTER_LENGTH = 1000
+
+_WORD = re.compile(r"\w+")
+
+def odata_params(filter: Optional[str] = None, select: Optional[str] = None, top: Optional[int] = None) -> Dict[str, str]:
+    """
+    OData query options for the GHO API. Raises ValueError for unknown
+    $select fields, overlong filters and a $top below 1.
     """
-    Get a list of all indicators from the WHO GHO OData API.
+    params = {}
+    if filter:
+        if len(filter) > MAX_FILTER_LENGTH:
+            raise ValueError(f"$filter must be at most {MAX_FILTER_LENGTH} characters")
+        params["$filter"] = filter
+    if select:
+        fields = [field.strip() for field in select.split(",") if field.strip()]
+        unknown = [field for field in fields if field not in INDICATOR_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown $select fields: {', '.join(unknown)}")
+        params["$select"] = ",".join(fields)
+    if top is not None:
+        if top < 1:
+            raise ValueError("$top must be at least 1")
+        params["$top"] = str(top)
+    return params
+
+async def get_indicators(filter: Optional[str] = None, select: Optional[str] = None, top: Optional[int] = None):
+    """
+    Get a list of indicators from the WHO GHO OData API.
+
+    `filter`, `select` and `top` are passed on as the OData $filter,
+    $select and $top options, so the upstream only returns what is asked
+    for. Each distinct query is cached. Raises ValueError if the GHO API
+    rejects the query.
     """
-    url = "https://ghoapi.azureedge.net/api/Indicator"
+    params = odata_params(filter, select, top)
     try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an exception for bad status codes
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return await response_cache.cache.get_json(INDICATOR_URL, params or None, ttl=CACHE_TTL)
+    except httpx.HTTPStatusError as e:
+        if params and e.response.status_code == 400:
+            raise ValueError(f"The WHO API rejected the query: {e.response.text[:200]}")
         print(f"Error fetching WHO indicators: {e}")
         return []
+    except httpx.HTTPError as e:
+        print(f"Error fetching WHO indicators: {e}")
+        return []
+
+class IndicatorIndex:
+    """
+    The indicator list indexed by code and by the words of its names.
+
+    Lookups by code are a dict access. Prefix searches bisect sorted lists
+    of codes and name words, so they cost O(log n + matches) however many
+    indicators there are.
+    """
+
+    def __init__(self, data: Any = None):
+        self.source = data
+        indicators = data.get("value", []) if isinstance(data, dict) else []
+        self._by_code: Dict[str, dict] = {}
+        for indicator in indicators:
+            code = indicator.get("IndicatorCode")
+            if code:
+                self._by_code[code.upper()] = indicator
+        self._codes: List[str] = sorted(self._by_code)
+        words = set()
+        for key, indicator in self._by_code.items():
+            for word in _WORD.findall((indicator.get("IndicatorName") or "").lower()):
+                words.add((word, key))
+        self._words: List[Tuple[str, str]] = sorted(words)
+
+    def __len__(self):
+        return len(self._by_code)
+
+    def get(self, code: str) -> Optional[dict]:
+        return self._by_code.get(code.upper())
+
+    def search(self, prefix: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """
+        Indicators whose code, or a word of whose name, starts with
+        `prefix`: code matches first, then name matches, each in order.
+        Every word of a multi-word prefix must match a word of the name.
+        """
+        terms = _WORD.findall(prefix.lower())
+        if not terms:
+            return {"total": 0, "results": []}
+        matches = []
+        if len(terms) == 1:
+            upper = prefix.strip().upper()
+            start = bisect.bisect_left(self._codes, upper)
+            while start < len(self._codes) and self._codes[start].startswith(upper):
+                matches.append(self._codes[start])
+                start += 1
+        named = None
+        for term in terms:
+            keys = set()
+            start = bisect.bisect_left(self._words, (term, ""))
+            while start < len(self._words) and self._words[start][0].startswith(term):
+                keys.add(self._words[start][1])
+                start += 1
+            named = keys if named is None else named & keys
+        seen = set(matches)
+        matches.extend(key for key in sorted(named, key=lambda key: (self._by_code[key].get("IndicatorName") or "").lower())
+                       if key not in seen)
+        return {"total": len(matches), "results": [self._by_code[key] for key in matches[offset:offset + limit]]}
+
+_index = IndicatorIndex()
+_index_lock = threading.Lock()
+
+async def get_indicator_index() -> IndicatorIndex:
+    """
+    The index of the cached full indicator list, rebuilt whenever the
+    cache hands out a new copy of the list. Raises httpx.HTTPError if the
+    list has never been fetched and the upstream is unavailable.
+    """
+    global _index
+    try:
+        data = await response_cache.cache.get_json(INDICATOR_URL, ttl=CACHE_TTL)
+    except httpx.HTTPError as e:
+        if _index.source is None:
+            raise
+        print(f"Serving indexed WHO indicators after a failed refresh: {e}")
+        return _index
+    with _index_lock:
+        if _index.source is not data:
+            _index = IndicatorIndex(data)
+        return _index